@@ -0,0 +1,179 @@
+import json
+import multiprocessing
+import random
+import threading
+from time import perf_counter
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connections
+from django.test.client import RequestFactory
+
+SCENARIOS = ("roulette-retrieve", "validate", "spin")
+
+
+def get_host() -> str:
+    """Return a host accepted by ALLOWED_HOSTS"""
+    host = settings.ALLOWED_HOSTS[0] if settings.ALLOWED_HOSTS else "localhost"
+    return "localhost" if host in ("*", "") or host.startswith(".") else host
+
+
+def build_environ(scenario: str, data: dict) -> dict:
+    """Return the wsgi environ of a random scenario request
+
+    Args:
+        scenario (str): scenario name, one of SCENARIOS
+        data (dict): seeded data: slugs, emails and api token
+
+    Returns:
+        dict: wsgi environ
+    """
+
+    factory = RequestFactory(
+        HTTP_HOST=get_host(), HTTP_AUTHORIZATION=f"Token {data['token']}"
+    )
+    slug = random.choice(data["slugs"])
+    email = random.choice(data["emails"])
+    body = {"email": email, "name": email, "roulette": slug}
+
+    if scenario == "roulette-retrieve":
+        request = factory.get(f"/api/roulette/{slug}/")
+    elif scenario == "validate":
+        request = factory.post(
+            "/api/participant/validate/", json.dumps(body), "application/json"
+        )
+    elif scenario == "spin":
+        body["is_extra_spin"] = False
+        request = factory.post(
+            "/api/participant/spin/", json.dumps(body), "application/json"
+        )
+    else:
+        raise ValueError(f"Invalid scenario: {scenario}")
+
+    return request.environ
+
+
+def run_requests(handler, scenario: str, data: dict, requests: int) -> dict:
+    """Send requests through the wsgi handler and measure them
+
+    Returns:
+        dict: latencies (seconds list) and errors count
+    """
+
+    latencies = []
+    errors = 0
+    for _ in range(requests):
+        environ = build_environ(scenario, data)
+        status_holder = {}
+
+        def start_response(status, headers, exc_info=None):
+            status_holder["status"] = status
+
+        start = perf_counter()
+        response = handler(environ, start_response)
+        try:
+            for _chunk in response:
+                pass
+        finally:
+            if hasattr(response, "close"):
+                response.close()
+        latencies.append(perf_counter() - start)
+
+        if not status_holder.get("status", "500").startswith("2"):
+            errors += 1
+
+    return {"latencies": latencies, "errors": errors}
+
+
+def run_worker(scenario: str, data: dict, threads: int, requests: int) -> dict:
+    """Run the scenario in threads (one wsgi handler per worker)
+
+    Returns:
+        dict: latencies (seconds list) and errors count of all threads
+    """
+
+    handler = WSGIHandler()
+    if threads == 1:
+        return run_requests(handler, scenario, data, requests)
+
+    results = []
+
+    def run_thread():
+        try:
+            results.append(run_requests(handler, scenario, data, requests))
+        finally:
+            connections.close_all()
+
+    workers = [threading.Thread(target=run_thread) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    return {
+        "latencies": [value for result in results for value in result["latencies"]],
+        "errors": sum(result["errors"] for result in results),
+    }
+
+
+def run_process_worker(args: tuple) -> dict:
+    """Process pool entry point (new database connections per process)"""
+    connections.close_all()
+    try:
+        return run_worker(*args)
+    finally:
+        connections.close_all()
+
+
+def percentile(sorted_values: list[float], percent: float) -> float:
+    """Return the percentile (nearest rank) of sorted values"""
+    if not sorted_values:
+        return 0
+    index = round(percent / 100 * (len(sorted_values) - 1))
+    return sorted_values[index]
+
+
+def run_scenario(
+    scenario: str, data: dict, threads: int, processes: int, requests: int
+) -> dict:
+    """Run a benchmark scenario and return its stats
+
+    Args:
+        scenario (str): scenario name, one of SCENARIOS
+        data (dict): seeded data: slugs, emails and api token
+        threads (int): threads per process
+        processes (int): processes (1 runs in the current process)
+        requests (int): requests per thread
+
+    Returns:
+        dict: requests, errors, seconds, throughput and latency percentiles (ms)
+    """
+
+    start = perf_counter()
+    if processes == 1:
+        results = [run_worker(scenario, data, threads, requests)]
+    else:
+        # Forked processes must not share the parent database connections
+        connections.close_all()
+        context = multiprocessing.get_context("fork")
+        with context.Pool(processes) as pool:
+            results = pool.map(
+                run_process_worker,
+                [(scenario, data, threads, requests)] * processes,
+            )
+    seconds = perf_counter() - start
+
+    latencies = sorted(
+        value for result in results for value in result["latencies"]
+    )
+    total = len(latencies)
+    return {
+        "requests": total,
+        "errors": sum(result["errors"] for result in results),
+        "seconds": round(seconds, 3),
+        "throughput_rps": round(total / seconds, 2) if seconds else 0,
+        "mean_ms": round(sum(latencies) / total * 1000, 2) if total else 0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
@@ -0,0 +1,128 @@
+import random
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from roulette import models
+
+SEED_PREFIX = "bench"
+
+
+def seed_data(
+    roulettes: int, participants: int, spins: int, batch_size: int = 5000
+) -> dict:
+    """Create benchmark data with bulk_create
+
+    Roulettes allow to spin at any time (no space between spins), so spin
+    requests are always valid.
+
+    Args:
+        roulettes (int): roulettes to create (with 3 awards each)
+        participants (int): participants to create
+        spins (int): historic spins to create (random participant and roulette)
+        batch_size (int): rows per insert query
+
+    Returns:
+        dict: seeded data: slugs, emails and api token
+    """
+
+    # Api user
+    user, _ = User.objects.get_or_create(username=f"{SEED_PREFIX}-user")
+    token, _ = Token.objects.get_or_create(user=user)
+
+    # Roulettes and awards
+    models.Roulette.objects.bulk_create(
+        [
+            models.Roulette(
+                name=f"{SEED_PREFIX} roulette {index}",
+                slug=f"{SEED_PREFIX}-roulette-{index}",
+                spins_space_hours=0,
+                spins_ads_limit=2,
+                logo="test/test-logo.webp",
+                bg_image="test/test-bg-image.webp",
+                wrong_icon="test/test-wrong-icon.webp",
+                message_no_spins="No spins",
+                message_lose="Lose",
+                message_win="Win",
+                color_spin_1="#000000",
+                color_spin_2="#111111",
+                color_spin_3="#222222",
+                color_spin_4="#333333",
+            )
+            for index in range(roulettes)
+        ],
+        batch_size=batch_size,
+    )
+    roulette_objs = list(
+        models.Roulette.objects.filter(slug__startswith=f"{SEED_PREFIX}-roulette-")
+    )
+    models.Award.objects.bulk_create(
+        [
+            models.Award(
+                roulette=roulette,
+                name=f"{SEED_PREFIX} award {index}",
+                min_spins=50 * (index + 1),
+                image="test/test.webp",
+            )
+            for roulette in roulette_objs
+            for index in range(3)
+        ],
+        batch_size=batch_size,
+    )
+
+    # Participants
+    emails = [f"{SEED_PREFIX}-{index}@example.com" for index in range(participants)]
+    models.Participant.objects.bulk_create(
+        [models.Participant(name=email, email=email) for email in emails],
+        batch_size=batch_size,
+        ignore_conflicts=True,
+    )
+    participant_ids = list(
+        models.Participant.objects.filter(email__in=emails).values_list(
+            "id", flat=True
+        )
+    )
+
+    # Historic spins, spread in the last 30 days
+    now = timezone.now()
+    roulette_ids = [roulette.id for roulette in roulette_objs]
+    for start in range(0, spins, batch_size):
+        spin_objs = models.ParticipantSpin.objects.bulk_create(
+            [
+                models.ParticipantSpin(
+                    participant_id=random.choice(participant_ids),
+                    roulette_id=random.choice(roulette_ids),
+                    is_extra_spin=random.random() < 0.2,
+                )
+                for _ in range(min(batch_size, spins - start))
+            ],
+        )
+
+        # auto_now_add ignores values passed to bulk_create: random date
+        # per spin set with bulk_update (one CASE query per batch)
+        for spin in spin_objs:
+            spin.created_at = now - timedelta(days=random.uniform(0, 30))
+        models.ParticipantSpin.objects.bulk_update(
+            [spin for spin in spin_objs if spin.id],
+            ["created_at"],
+            batch_size=batch_size,
+        )
+
+    return {
+        "slugs": [roulette.slug for roulette in roulette_objs],
+        "emails": emails,
+        "token": token.key,
+    }
+
+
+def clean_data():
+    """Delete benchmark data"""
+
+    participants = models.Participant.objects.filter(
+        email__startswith=f"{SEED_PREFIX}-"
+    )
+    participants.delete()
+    models.Roulette.objects.filter(slug__startswith=f"{SEED_PREFIX}-roulette-").delete()
+    User.objects.filter(username=f"{SEED_PREFIX}-user").delete()
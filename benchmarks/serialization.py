@@ -0,0 +1,93 @@
+from time import perf_counter
+
+from django.utils import timezone
+
+from benchmarks.runner import percentile
+from benchmarks.seed import SEED_PREFIX
+from roulette import models
+from roulette.serializers import RouletteSerializer
+from utils.media import clear_url_cache
+
+
+def get_image_variants(field_name: str, name: str) -> dict:
+    """Return image variants data of an image (avif and webp, 3 widths)"""
+
+    base_name = name.rsplit(".", 1)[0]
+    return {
+        field_name: {
+            "source": name,
+            "variants": {
+                image_format: {
+                    str(width): f"{base_name}-{width}w.{image_format}"
+                    for width in (320, 640, 1280)
+                }
+                for image_format in ("avif", "webp")
+            },
+        }
+    }
+
+
+def build_roulette(awards: int) -> models.Roulette:
+    """Return a roulette with its active awards, in memory (no queries)"""
+
+    now = timezone.now()
+    roulette = models.Roulette(
+        id=1,
+        name=f"{SEED_PREFIX} roulette",
+        slug=f"{SEED_PREFIX}-roulette",
+        logo="roulette/logo.webp",
+        bg_image="roulette/bg-image.webp",
+        wrong_icon="roulette/wrong-icon.webp",
+        image_variants={
+            **get_image_variants("logo", "roulette/logo.webp"),
+            **get_image_variants("bg_image", "roulette/bg-image.webp"),
+        },
+        created_at=now,
+        updated_at=now,
+    )
+    roulette.active_awards = [
+        models.Award(
+            id=index + 1,
+            roulette=roulette,
+            name=f"{SEED_PREFIX} award {index}",
+            image=f"awards/award-{index}.webp",
+            image_variants=get_image_variants("image", f"awards/award-{index}.webp"),
+        )
+        for index in range(awards)
+    ]
+    return roulette
+
+
+def run_serialization_benchmark(awards: int, iterations: int) -> dict:
+    """Measure the roulette serialization, resolving the media urls in
+    each iteration (cold) and from the urls cache (warm)
+
+    Args:
+        awards (int): roulette active awards
+        iterations (int): serializations per mode
+
+    Returns:
+        dict: latency mean and percentiles (ms) by mode
+    """
+
+    roulette = build_roulette(awards)
+    results = {}
+    for mode in ("cold", "warm"):
+        clear_url_cache()
+        latencies = []
+        for _ in range(iterations):
+            if mode == "cold":
+                clear_url_cache()
+            start = perf_counter()
+            RouletteSerializer(roulette).data
+            latencies.append(perf_counter() - start)
+
+        latencies.sort()
+        results[mode] = {
+            "iterations": iterations,
+            "mean_ms": round(sum(latencies) / iterations * 1000, 3),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        }
+    return results
@@ -0,0 +1,34 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from benchmarks.serialization import run_serialization_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the roulette serialization with and without cached media "
+        "urls (latency percentiles as json)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--awards", type=int, default=30)
+        parser.add_argument("--iterations", type=int, default=200)
+        parser.add_argument("--output", default="", help="Json output file path")
+
+    def handle(self, *args, **options):
+        results = {
+            "awards": options["awards"],
+            "modes": run_serialization_benchmark(
+                options["awards"], options["iterations"]
+            ),
+        }
+
+        # Save or print results
+        results_json = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(results_json)
+            self.stderr.write(f"Results saved in {options['output']}")
+        else:
+            self.stdout.write(results_json)
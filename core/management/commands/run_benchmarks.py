@@ -0,0 +1,96 @@
+import json
+import platform
+import subprocess
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from benchmarks.runner import SCENARIOS, run_scenario
+from benchmarks.seed import clean_data, seed_data
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed benchmark data and measure the participant api "
+        "(throughput and latency percentiles as json)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--roulettes", type=int, default=10)
+        parser.add_argument("--participants", type=int, default=1000)
+        parser.add_argument("--spins", type=int, default=10000)
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--processes", type=int, default=1)
+        parser.add_argument(
+            "--requests", type=int, default=100, help="Requests per thread"
+        )
+        parser.add_argument(
+            "--scenarios",
+            default=",".join(SCENARIOS),
+            help=f"Comma separated scenarios: {', '.join(SCENARIOS)}",
+        )
+        parser.add_argument("--output", default="", help="Json output file path")
+        parser.add_argument(
+            "--keep-data", action="store_true", help="Don't delete seeded data"
+        )
+
+    def handle(self, *args, **options):
+        scenarios = [name for name in options["scenarios"].split(",") if name]
+
+        # Seed data
+        clean_data()
+        self.stderr.write("Seeding benchmark data...")
+        data = seed_data(
+            options["roulettes"], options["participants"], options["spins"]
+        )
+
+        # Run scenarios
+        results = {
+            "meta": {
+                "timestamp": timezone.now().isoformat(),
+                "commit": self.__get_git_commit(),
+                "database": connection.vendor,
+                "python": platform.python_version(),
+                "roulettes": options["roulettes"],
+                "participants": options["participants"],
+                "spins": options["spins"],
+                "threads": options["threads"],
+                "processes": options["processes"],
+                "requests": options["requests"],
+            },
+            "scenarios": {},
+        }
+        try:
+            for scenario in scenarios:
+                self.stderr.write(f"Running {scenario}...")
+                results["scenarios"][scenario] = run_scenario(
+                    scenario,
+                    data,
+                    options["threads"],
+                    options["processes"],
+                    options["requests"],
+                )
+        finally:
+            if not options["keep_data"]:
+                clean_data()
+
+        # Save or print results
+        results_json = json.dumps(results, indent=2)
+        if options["output"]:
+            with open(options["output"], "w") as file:
+                file.write(results_json)
+            self.stderr.write(f"Results saved in {options['output']}")
+        else:
+            self.stdout.write(results_json)
+
+    def __get_git_commit(self) -> str:
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except Exception:
+            return ""
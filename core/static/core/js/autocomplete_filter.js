@@ -0,0 +1,35 @@
+// Setup select2 with ajax search for autocomplete list filters
+document.addEventListener("DOMContentLoaded", function () {
+  const $ = window.jQuery || window.django.jQuery
+
+  $(".autocomplete-filter").each(function () {
+    const $field = $(this)
+    if ($field.data("select2")) {
+      return
+    }
+
+    // Only send the filter param when an object is selected
+    $field.on("change", function () {
+      if ($field.val()) {
+        $field.attr("name", $field.data("lookup"))
+      } else {
+        $field.removeAttr("name")
+      }
+    })
+
+    $field.select2({
+      width: "100%",
+      allowClear: true,
+      placeholder: $field.data("placeholder"),
+      minimumInputLength: 1,
+      ajax: {
+        url: $field.data("ajax-url"),
+        dataType: "json",
+        delay: 250,
+        data: function (params) {
+          return { term: params.term, page: params.page }
+        },
+      },
+    })
+  })
+})
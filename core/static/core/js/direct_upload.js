@@ -0,0 +1,60 @@
+// Upload admin images from the browser to s3 (presigned post), the form
+// only submits the uploaded file name
+document.addEventListener("DOMContentLoaded", function () {
+  const csrfToken = document.querySelector("[name=csrfmiddlewaretoken]")
+
+  document.querySelectorAll(".direct-upload-key").forEach(function (keyInput) {
+    const fileInput = document.getElementById(keyInput.dataset.input)
+    const status = keyInput.nextElementSibling
+    if (!fileInput) {
+      return
+    }
+
+    fileInput.addEventListener("change", async function () {
+      const file = fileInput.files[0]
+      keyInput.value = ""
+      if (!file) {
+        return
+      }
+      status.textContent = "Subiendo..."
+
+      try {
+        // Request presigned post
+        const presignData = new FormData()
+        presignData.append("field", keyInput.dataset.field)
+        presignData.append("filename", file.name)
+        presignData.append("content_type", file.type)
+        const presignResponse = await fetch(keyInput.dataset.presignUrl, {
+          method: "POST",
+          headers: { "X-CSRFToken": csrfToken ? csrfToken.value : "" },
+          body: presignData,
+        })
+        const presign = await presignResponse.json()
+        if (!presignResponse.ok) {
+          throw new Error(presign.error)
+        }
+
+        // Upload file to s3
+        const uploadData = new FormData()
+        Object.entries(presign.fields).forEach(function ([name, value]) {
+          uploadData.append(name, value)
+        })
+        uploadData.append("file", file)
+        const uploadResponse = await fetch(presign.url, {
+          method: "POST",
+          body: uploadData,
+        })
+        if (!uploadResponse.ok) {
+          throw new Error("Error al subir el archivo")
+        }
+
+        // Submit only the file name
+        keyInput.value = presign.name
+        fileInput.value = ""
+        status.textContent = `Subido: ${file.name}`
+      } catch (error) {
+        status.textContent = error.message
+      }
+    })
+  })
+})
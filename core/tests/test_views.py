@@ -0,0 +1,312 @@
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.http import Http404
+from django.test import RequestFactory, TestCase
+from model_bakery import baker
+from rest_framework import status
+
+from core.tests_base.test_admin import TestAdminBase
+from core.views import serve_media
+from roulette import models
+from utils.metrics import clear_multiproc_dir, mark_process_dead, registry
+
+
+class ProfilerTestCase(TestAdminBase):
+    """Testing request profiler middleware and admin pages"""
+
+    def setUp(self):
+        super().setUp()
+
+        # Enable profiler with a temp folder
+        temp_folder = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_folder.cleanup)
+        profiler_settings = self.settings(
+            PROFILER_ENABLED=True,
+            PROFILER_DIR=temp_folder.name,
+            PROFILER_SAMPLE_RATE=0,
+            PROFILER_MAX_FILES=2,
+        )
+        profiler_settings.enable()
+        self.addCleanup(profiler_settings.disable)
+        self.profiles_folder = temp_folder.name
+
+        self.roulette = baker.make(models.Roulette)
+        self.endpoint = f"/api/roulette/{self.roulette.slug}/"
+
+    def get_profile_ids(self) -> list[str]:
+        return [
+            name[:-5]
+            for name in os.listdir(self.profiles_folder)
+            if name.endswith(".json")
+        ]
+
+    def test_return_profile(self):
+        """Validate profile report returned instead of the response"""
+
+        response = self.client.get(self.endpoint, {"_profile": "return"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/plain")
+        self.assertIn(f"GET {self.endpoint}", response.content.decode())
+        self.assertIn("queries", response.content.decode())
+
+    def test_store_profile(self):
+        """Validate profile stored (without the query string) and visible in
+        admin"""
+
+        response = self.client.get(
+            self.endpoint, {"email": "test@test.com"}, HTTP_X_PROFILE="1"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        profile_id = response["X-Profile-Id"]
+        self.assertEqual(self.get_profile_ids(), [profile_id])
+        with open(os.path.join(self.profiles_folder, f"{profile_id}.json")) as file:
+            self.assertNotIn("email=", file.read())
+
+        # Admin list and detail
+        response = self.client.get("/admin/profiles/")
+        self.assertContains(response, f"/admin/profiles/{profile_id}/")
+        response = self.client.get(f"/admin/profiles/{profile_id}/")
+        self.assertContains(response, "roulette_roulette")
+
+    def test_no_profile_non_superuser(self):
+        """Validate profile flag ignored for non superusers"""
+
+        self.client.logout()
+        response = self.client.get(self.endpoint, HTTP_X_PROFILE="1")
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertEqual(self.get_profile_ids(), [])
+
+        # Admin pages require login
+        response = self.client.get("/admin/profiles/")
+        self.assertEqual(response.status_code, 302)
+
+    def test_sample_profiles_rotation(self):
+        """Validate 1 in N requests profiled, keeping the newest files"""
+
+        with self.settings(PROFILER_SAMPLE_RATE=2):
+            for _ in range(8):
+                self.client.get(self.endpoint)
+
+        # 4 profiles sampled, 2 kept
+        self.assertEqual(len(self.get_profile_ids()), 2)
+
+
+class MetricsTestCase(TestAdminBase):
+    """Testing prometheus metrics endpoint"""
+
+    def setUp(self):
+        super().setUp()
+        self.endpoint = "/metrics"
+
+        # Enable metrics middleware and clear values
+        metrics_settings = self.settings(METRICS_ENABLED=True, METRICS_TOKEN="")
+        metrics_settings.enable()
+        self.addCleanup(metrics_settings.disable)
+        registry.reset()
+
+        self.roulette = baker.make(models.Roulette, spins_space_hours=1)
+        self.api_data = {
+            "email": "test@test.com",
+            "name": "Test Participant",
+            "roulette": self.roulette.slug,
+            "is_extra_spin": False,
+        }
+
+    def test_protected(self):
+        """Validate metrics require superuser or bearer token"""
+
+        self.client.logout()
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        with self.settings(METRICS_TOKEN="secret"):
+            response = self.client.get(
+                self.endpoint, HTTP_AUTHORIZATION="Bearer wrong"
+            )
+            self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+            response = self.client.get(
+                self.endpoint, HTTP_AUTHORIZATION="Bearer secret"
+            )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_spin_metrics(self):
+        """Validate spins, rejections and request latency counted"""
+
+        self.client.post("/api/participant/spin/", data=self.api_data)
+        self.client.post("/api/participant/spin/", data=self.api_data)
+        self.client.post("/api/participant/spin/", data={})
+
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        content = response.content.decode()
+        self.assertIn("# TYPE roulette_spins_total counter", content)
+        self.assertIn(
+            f'roulette_spins_total{{roulette="{self.roulette.slug}",extra="False"}} 1',
+            content,
+        )
+        self.assertIn('roulette_spin_rejections_total{reason="no_spins"} 1', content)
+        self.assertIn('roulette_spin_rejections_total{reason="invalid"} 1', content)
+        self.assertIn(
+            'http_request_duration_seconds_count{endpoint="participant-spin"} 3',
+            content,
+        )
+        self.assertIn('db_queries_total{endpoint="participant-spin"}', content)
+
+    def test_multiprocess_metrics(self):
+        """Validate values of all processes summed (shared folder)"""
+
+        with tempfile.TemporaryDirectory() as temp_folder:
+            with self.settings(METRICS_MULTIPROC_DIR=temp_folder):
+                registry.reset()
+
+                # Other worker values
+                other_values = {
+                    "roulette_awards_total": {json.dumps(["other"]): 2},
+                    "emails_sent_total": {json.dumps(["sent"]): 3},
+                }
+                other_path = os.path.join(temp_folder, "metrics-1-other.json")
+                with open(other_path, "w") as file:
+                    json.dump(other_values, file)
+
+                # Current worker values
+                from utils.metrics import emails_sent_total
+
+                emails_sent_total.inc(result="sent")
+                content = registry.render()
+
+        self.assertIn('roulette_awards_total{roulette="other"} 2', content)
+        self.assertIn('emails_sent_total{result="sent"} 4', content)
+
+    def test_dead_process_metrics(self):
+        """Validate values of exited processes archived (totals kept) and
+        files of previous runs removed"""
+
+        with tempfile.TemporaryDirectory() as temp_folder:
+            for name, value in [("metrics-10-a.json", 2), ("metrics-11-b.json", 3)]:
+                values = {"emails_sent_total": {json.dumps(["sent"]): value}}
+                with open(os.path.join(temp_folder, name), "w") as file:
+                    json.dump(values, file)
+
+            mark_process_dead(10, temp_folder)
+            mark_process_dead(11, temp_folder)
+            self.assertEqual(os.listdir(temp_folder), ["metrics-archive.json"])
+            with self.settings(METRICS_MULTIPROC_DIR=temp_folder):
+                registry.reset()
+                content = registry.render()
+            self.assertIn('emails_sent_total{result="sent"} 5', content)
+
+            clear_multiproc_dir(temp_folder)
+            self.assertEqual(os.listdir(temp_folder), [])
+
+    def test_unknown_roulette_not_counted(self):
+        """Validate views of missing roulettes don't add labels"""
+
+        response = self.client.get("/api/roulette/random-slug/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.client.get(f"/api/roulette/{self.roulette.slug}/")
+
+        content = self.client.get(self.endpoint).content.decode()
+        self.assertIn(
+            f'roulette_views_total{{roulette="{self.roulette.slug}"}} 1', content
+        )
+        self.assertNotIn("random-slug", content)
+
+
+class ServeMediaTestCase(TestCase):
+
+    def setUp(self):
+        self.path = "test/test.webp"
+        self.full_path = os.path.join(settings.MEDIA_ROOT, self.path)
+        self.size = os.path.getsize(self.full_path)
+
+    def get_response(self, path: str = None, **headers):
+        request = RequestFactory().get(f"/media/{self.path}", headers=headers)
+        return serve_media(request, path or self.path)
+
+    def get_content(self, response) -> bytes:
+        content = b"".join(response.streaming_content)
+        response.close()
+        return content
+
+    def test_full_file(self):
+        """Validate file with validators, revalidated (name not hashed)"""
+
+        response = self.get_response()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "image/webp")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+        self.assertEqual(response["Cache-Control"], "no-cache")
+        with open(self.full_path, "rb") as file:
+            self.assertEqual(self.get_content(response), file.read())
+
+    def test_hashed_name_immutable(self):
+        """Validate long-lived cache headers only for content hashed names"""
+
+        path = "test/0123456789abcdef0123456789abcdef.webp"
+        full_path = os.path.join(settings.MEDIA_ROOT, path)
+        shutil.copyfile(self.full_path, full_path)
+        self.addCleanup(os.remove, full_path)
+
+        response = self.get_response(path)
+        self.assertEqual(
+            response["Cache-Control"], "public, max-age=31536000, immutable"
+        )
+        response.close()
+
+    def test_not_modified(self):
+        """Validate conditional request with the file etag"""
+
+        etag = self.get_response()["ETag"]
+        response = self.get_response(If_None_Match=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_range(self):
+        """Validate partial content and not satisfiable ranges"""
+
+        response = self.get_response(Range="bytes=10-19")
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response["Content-Range"], f"bytes 10-19/{self.size}")
+        with open(self.full_path, "rb") as file:
+            self.assertEqual(self.get_content(response), file.read()[10:20])
+
+        # Last bytes
+        response = self.get_response(Range="bytes=-5")
+        self.assertEqual(len(self.get_content(response)), 5)
+
+        # Not satisfiable
+        response = self.get_response(Range=f"bytes={self.size}-")
+        self.assertEqual(
+            response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE
+        )
+
+        # Changed file (If-Range): full file
+        response = self.get_response(Range="bytes=10-19", If_Range='"other"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response.close()
+
+    def test_proxy_modes(self):
+        """Validate file delegated to nginx and apache"""
+
+        with self.settings(MEDIA_SERVE_MODE="x-accel"):
+            response = self.get_response()
+        self.assertEqual(response["X-Accel-Redirect"], f"/protected-media/{self.path}")
+        self.assertEqual(response.content, b"")
+
+        with self.settings(MEDIA_SERVE_MODE="x-sendfile"):
+            response = self.get_response()
+        self.assertEqual(response["X-Sendfile"], self.full_path)
+
+    def test_invalid_path(self):
+        """Validate files outside media folder not served"""
+
+        with self.assertRaises(Http404):
+            self.get_response("../manage.py")
+        with self.assertRaises(Http404):
+            self.get_response("test/missing.webp")
@@ -4,7 +4,9 @@ from django.http import HttpResponse
 from django.test import LiveServerTestCase
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -109,6 +111,21 @@ class TestAdminBase(TestCase):
 
         return response, url
 
+    def get_queries_count(self, endpoint: str) -> int:
+        """Get the number of sql queries required to render an admin page
+
+        Args:
+            endpoint (str): Endpoint to test inside /admin/
+
+        Returns: int: Queries count
+        """
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(endpoint)
+        self.assertEqual(response.status_code, 200)
+
+        return len(context.captured_queries)
+
     def get_results_count(self, response: HttpResponse) -> int:
         """Get results count of current page
 
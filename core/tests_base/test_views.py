@@ -1,10 +1,13 @@
 import json
+from contextlib import contextmanager
 
 from django.contrib.auth.models import User
+from django.test import override_settings
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
 
 from core.tests_base.test_admin import TestAdminBase
+from utils.instrumentation import request_measured
 
 
 class RenderingAPIClient(APIClient):
@@ -59,6 +62,41 @@ class BaseTestApiViewsMethods(APITestCase, TestAdminBase):
         self.restricted_patch = restricted_patch
         self.restricted_delete = restricted_delete
 
+    @contextmanager
+    def assert_endpoint_budget(self, metrics: tuple = ("queries",)):
+        """Validate requests made inside the block are within their endpoint
+        budget (INSTRUMENTATION_BUDGETS setting)
+
+        Args:
+            metrics (tuple): budget metrics to validate. Defaults to queries
+                (timings depend on the test machine)
+
+        Yields:
+            list: measured requests: endpoint, metrics
+        """
+
+        measured = []
+
+        def on_request_measured(endpoint, metrics, exceeded, **kwargs):
+            measured.append((endpoint, metrics, exceeded))
+
+        request_measured.connect(on_request_measured)
+        try:
+            # Request log lines captured (not printed in the tests output)
+            with override_settings(INSTRUMENTATION_ENABLED=True), self.assertLogs(
+                "instrumentation", level="INFO"
+            ):
+                yield measured
+        finally:
+            request_measured.disconnect(on_request_measured)
+
+        self.assertTrue(measured, "No instrumented requests in block")
+        for endpoint, request_metrics, exceeded in measured:
+            exceeded = {name: exceeded[name] for name in metrics if name in exceeded}
+            self.assertEqual(
+                exceeded, {}, f"'{endpoint}' over budget: {request_metrics}"
+            )
+
     def validate_invalid_method(self, method: str):
         """Validate that the given method is not allowed on the endpoint"""
 
@@ -1,3 +1,115 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib import admin
+from django.apps import apps
+from django.core.exceptions import FieldDoesNotExist, PermissionDenied, ValidationError
+from django.conf import settings
+from django.db.models import FileField
+from django.http import Http404, HttpResponse, JsonResponse
 from django.shortcuts import render
+from django.utils.crypto import constant_time_compare
+from django.views.decorators.http import require_POST
 
-# Create your views here.
\ No newline at end of file
+from utils.media import get_media_response
+from utils.metrics import registry
+from utils.profiling import get_profile_files, get_profile_stats_text, load_profile
+from utils.uploads import create_presigned_post, supports_direct_upload
+
+
+def superuser_required(view):
+    """Allow only superusers (staff login page for anonymous users)"""
+
+    @staff_member_required
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_superuser:
+            raise PermissionDenied
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+@superuser_required
+def admin_profiles(request):
+    """List stored request profiles"""
+
+    profiles = [load_profile(profile_id) for profile_id in get_profile_files()]
+    context = {
+        **admin.site.each_context(request),
+        "title": "Perfiles de peticiones",
+        "profiles": [profile for profile in profiles if profile],
+    }
+    return render(request, "core/admin_profiles.html", context)
+
+
+@superuser_required
+def admin_profile_detail(request, profile_id):
+    """Show top functions, sql queries and full stats of a request profile"""
+
+    profile = load_profile(profile_id)
+    if not profile:
+        raise Http404("Profile not found")
+
+    context = {
+        **admin.site.each_context(request),
+        "title": f"{profile['method']} {profile['path']}",
+        "profile": profile,
+        "stats_text": get_profile_stats_text(profile_id),
+    }
+    return render(request, "core/admin_profile_detail.html", context)
+
+
+def metrics(request):
+    """Prometheus metrics (METRICS_TOKEN bearer token or superuser session)"""
+
+    authorization = request.headers.get("Authorization", "")
+    token = authorization.removeprefix("Bearer ").strip()
+    valid_token = settings.METRICS_TOKEN and constant_time_compare(
+        token, settings.METRICS_TOKEN
+    )
+    if not valid_token and not request.user.is_superuser:
+        raise PermissionDenied
+
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+def serve_media(request, path, document_root=None, show_indexes=False):
+    """Serve local media files (MEDIA_SERVE_MODE): from python with ranges
+    and conditional requests, or delegated to the front proxy"""
+
+    return get_media_response(request, path, document_root or settings.MEDIA_ROOT)
+
+
+@staff_member_required
+@require_POST
+def admin_presign_upload(request):
+    """Return a presigned s3 post to upload an admin image from the browser
+
+    Post data: field ("app_label.model_name.field_name"), filename and
+    content_type.
+    """
+
+    try:
+        app_label, model_name, field_name = request.POST.get("field", "").split(".")
+        model = apps.get_model(app_label, model_name)
+        model_field = model._meta.get_field(field_name)
+    except (ValueError, LookupError, FieldDoesNotExist):
+        return JsonResponse({"error": "Invalid field"}, status=400)
+
+    # Only users that can edit the model
+    if not request.user.has_perm(f"{app_label}.change_{model_name}"):
+        raise PermissionDenied
+    if not isinstance(model_field, FileField) or not supports_direct_upload(
+        model_field
+    ):
+        return JsonResponse({"error": "Direct uploads not available"}, status=400)
+
+    try:
+        post = create_presigned_post(
+            model_field,
+            request.POST.get("filename", ""),
+            request.POST.get("content_type", ""),
+        )
+    except ValidationError as error:
+        return JsonResponse({"error": error.messages[0]}, status=400)
+    return JsonResponse(post)
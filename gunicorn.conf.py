@@ -0,0 +1,50 @@
+# Gunicorn settings (loaded from the working directory)
+import os
+
+from dotenv import load_dotenv
+
+# Same .env files as the django settings (not loaded in the master process)
+load_dotenv()
+load_dotenv(f".env.{os.getenv('ENV')}")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:80")
+
+# Shared metrics folder (METRICS_MULTIPROC_DIR setting: django is not set
+# up in the master process)
+metrics_dir = os.getenv("METRICS_MULTIPROC_DIR", "")
+
+
+def on_starting(server):
+    """Remove the metrics files of the previous run"""
+
+    if metrics_dir:
+        from utils.metrics import clear_multiproc_dir
+
+        clear_multiproc_dir(metrics_dir)
+
+
+def child_exit(server, worker):
+    """Archive the metrics of exited workers (their totals are kept)"""
+
+    if metrics_dir:
+        from utils.metrics import mark_process_dead
+
+        mark_process_dead(worker.pid, metrics_dir)
+
+
+def post_worker_init(worker):
+    """Warm the caches of each new worker before it accepts requests
+
+    Runs after the fork, once the application is loaded (django is not set
+    up yet in post_fork). Concurrent workers compute each shared value once.
+    """
+
+    from django.conf import settings
+    from django.core.management import call_command
+
+    if not settings.WARM_CACHES_ON_START:
+        return
+    try:
+        call_command("warm_caches")
+    except Exception:
+        worker.log.exception("Cache warm-up failed")
@@ -1,5 +1,13 @@
 """
-ASGI config for project project.
+ASGI config for project project: server-sent events only.
+
+The events streams (project.urls_events) are long-lived async connections,
+served by their own process, e.g.:
+
+    gunicorn -k uvicorn.workers.UvicornWorker --bind 0.0.0.0:81 project.asgi:application
+
+The rest of the app keeps running with WSGI (project.wsgi), events reach
+this process through the shared broker (EVENTS_BROKER=file).
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
@@ -12,5 +20,6 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
+os.environ.setdefault("ROOT_URLCONF", "project.urls_events")
 
 application = get_asgi_application()
@@ -0,0 +1,40 @@
+import fcntl
+import os
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.core.cache.backends.filebased import FileBasedCache
+
+
+class FileCache(FileBasedCache):
+    """File based cache with atomic add and incr (shared by the workers of
+    the server)
+
+    Django's file cache checks the key and then writes it: two workers could
+    both add a cache lock, or lose a namespace version increment. Here they
+    run under an exclusive lock of the cache folder (flock, released by the
+    system if the worker dies). Reads don't lock: files are replaced
+    atomically.
+    """
+
+    lock_name = "cache.lock"
+
+    @contextmanager
+    def lock(self):
+        """Hold the exclusive lock of the cache folder"""
+
+        self._createdir()
+        with open(os.path.join(self._dir, self.lock_name), "a") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        with self.lock():
+            return super().add(key, value, timeout, version)
+
+    def incr(self, key, delta=1, version=None):
+        with self.lock():
+            return super().incr(key, delta, version)
@@ -0,0 +1,131 @@
+import random
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+
+from django.conf import settings
+
+# Reads of the current block go to the replicas (safe reads only)
+replica_reads = ContextVar("replica_reads", default=False)
+
+# Reads of the current request pinned to the primary: "write" after a
+# write, "session" after a recent write of the client (sticky cookie).
+# None outside pin_after_write blocks (e.g. commands and worker threads,
+# nothing would reset their pin)
+primary_pinned = ContextVar("primary_pinned", default=None)
+
+# Apps always read from the primary: authentication of the request (e.g.
+# sessions of clients that just logged in, not replicated yet)
+PRIMARY_APPS = {"auth", "authtoken", "contenttypes", "sessions"}
+
+
+def get_replica_db() -> str:
+    """Return a random replica alias, "default" if there are no replicas
+    or the current request is pinned to the primary"""
+    if not settings.DB_REPLICA_ALIASES or primary_pinned.get():
+        return "default"
+    return random.choice(settings.DB_REPLICA_ALIASES)
+
+
+class use_replica(ContextDecorator):
+    """Send the reads of the block (or decorated function) to the replicas
+
+    Only for safe reads that accept replication lag (e.g. roulette config,
+    exports and reports). Reads after a write in the same request still
+    go to the primary.
+    """
+
+    def __enter__(self):
+        self.token = replica_reads.set(True)
+        return self
+
+    def __exit__(self, *exc):
+        replica_reads.reset(self.token)
+        return False
+
+
+class use_primary(use_replica):
+    """Send the reads of the block to the primary, even inside a
+    use_replica block (e.g. values cached until the next commit)"""
+
+    def __enter__(self):
+        self.token = replica_reads.set(False)
+        return self
+
+
+class pin_after_write(ContextDecorator):
+    """Pin the reads of the block (e.g. a request) to the primary after its
+    first write, so it reads its own writes
+
+    Attributes:
+        wrote (bool): if the block wrote, set on exit
+    """
+
+    def __init__(self, sticky: bool = False):
+        """
+        Args:
+            sticky (bool): reads pinned from the start (recent write of
+                the client)
+        """
+        self.sticky = sticky
+        self.wrote = False
+
+    def __enter__(self):
+        self.token = primary_pinned.set("session" if self.sticky else "")
+        return self
+
+    def __exit__(self, *exc):
+        self.wrote = primary_pinned.get() == "write"
+        primary_pinned.reset(self.token)
+        return False
+
+
+class ReplicaRouter:
+    """Route writes to the primary and the reads of use_replica blocks
+    to the replicas (DB_REPLICAS)
+
+    After a write, the reads of the request (and of the session, for
+    DB_STICKY_SECONDS, see PrimaryStickyMiddleware) go to the primary, so
+    clients read their own writes.
+    """
+
+    def db_for_read(self, model, **hints):
+        if not replica_reads.get() or model._meta.app_label in PRIMARY_APPS:
+            return "default"
+        return get_replica_db()
+
+    def db_for_write(self, model, **hints):
+        # Only inside pin_after_write blocks
+        if primary_pinned.get() is not None:
+            primary_pinned.set("write")
+        return "default"
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas are copies of the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas are migrated by the replication
+        return db == "default"
+
+
+class PrimaryStickyMiddleware:
+    """Pin the reads of a client to the primary for DB_STICKY_SECONDS
+    after it writes (cookie), while the replicas catch up"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        sticky = settings.DB_STICKY_COOKIE in request.COOKIES
+        with pin_after_write(sticky) as pin:
+            response = self.get_response(request)
+
+        if pin.wrote and settings.DB_REPLICA_ALIASES:
+            response.set_cookie(
+                settings.DB_STICKY_COOKIE,
+                "1",
+                max_age=settings.DB_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
@@ -34,6 +34,61 @@ EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 EMAIL_USE_SSL = os.getenv("EMAIL_USE_SSL")
 FRONTEND_URL = os.getenv("FRONTEND_URL")
 DB_USE_SQLITE = os.getenv("DB_USE_SQLITE") == "True"
+ADMIN_EXACT_COUNT_LIMIT = int(os.getenv("ADMIN_EXACT_COUNT_LIMIT", 10000))
+ADMIN_COUNT_CACHE_SECONDS = int(os.getenv("ADMIN_COUNT_CACHE_SECONDS", 300))
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+EXPORT_GZIP = os.getenv("EXPORT_GZIP") == "True"
+EMAIL_CANONICALIZE_ALIASES = os.getenv("EMAIL_CANONICALIZE_ALIASES") == "True"
+INSTRUMENTATION_ENABLED = os.getenv("INSTRUMENTATION_ENABLED") == "True"
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED") == "True"
+PROFILER_SAMPLE_RATE = int(os.getenv("PROFILER_SAMPLE_RATE", 0))
+PROFILER_MAX_FILES = int(os.getenv("PROFILER_MAX_FILES", 100))
+PROFILER_TOP_FUNCTIONS = int(os.getenv("PROFILER_TOP_FUNCTIONS", 40))
+PROFILER_DIR = os.getenv("PROFILER_DIR", os.path.join(BASE_DIR, "profiles"))
+METRICS_ENABLED = os.getenv("METRICS_ENABLED") == "True"
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR", "")
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", 1))
+EVENTS_BROKER = os.getenv("EVENTS_BROKER", "file")
+EVENTS_BROKER_DIR = os.getenv("EVENTS_BROKER_DIR", os.path.join(BASE_DIR, "events"))
+EVENTS_BROKER_MAX_BYTES = int(os.getenv("EVENTS_BROKER_MAX_BYTES", 1024 * 1024))
+EVENTS_POLL_SECONDS = float(os.getenv("EVENTS_POLL_SECONDS", 0.5))
+EVENTS_QUEUE_SIZE = int(os.getenv("EVENTS_QUEUE_SIZE", 100))
+EVENTS_KEEPALIVE_SECONDS = int(os.getenv("EVENTS_KEEPALIVE_SECONDS", 15))
+EVENTS_STREAM_SECONDS = int(os.getenv("EVENTS_STREAM_SECONDS", 300))
+EVENTS_RETRY_MS = int(os.getenv("EVENTS_RETRY_MS", 5000))
+WINNERS_FEED_SIZE = int(os.getenv("WINNERS_FEED_SIZE", 20))
+WINNERS_CACHE_SECONDS = int(os.getenv("WINNERS_CACHE_SECONDS", 300))
+HISTORY_PAGE_SIZE = int(os.getenv("HISTORY_PAGE_SIZE", 20))
+HISTORY_MAX_PAGE_SIZE = int(os.getenv("HISTORY_MAX_PAGE_SIZE", 100))
+IMAGE_VARIANT_WIDTHS = [
+    int(width) for width in os.getenv("IMAGE_VARIANT_WIDTHS", "320,640,1280").split(",")
+]
+IMAGE_VARIANT_FORMATS = os.getenv("IMAGE_VARIANT_FORMATS", "avif,webp").split(",")
+IMAGE_VARIANT_QUALITY = int(os.getenv("IMAGE_VARIANT_QUALITY", 80))
+IMAGE_VARIANTS_ASYNC = os.getenv("IMAGE_VARIANTS_ASYNC", "True") == "True"
+IMAGE_VARIANTS_WORKERS = int(os.getenv("IMAGE_VARIANTS_WORKERS", 2))
+MEDIA_SERVE_MODE = os.getenv("MEDIA_SERVE_MODE", "debug")
+MEDIA_ACCEL_PREFIX = os.getenv("MEDIA_ACCEL_PREFIX", "/protected-media/")
+MEDIA_URL_CACHE_SIZE = int(os.getenv("MEDIA_URL_CACHE_SIZE", 10000))
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "file")
+CACHE_LOCATION = os.getenv("CACHE_LOCATION", "")
+CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "roulette")
+CACHE_TIMEOUT = int(os.getenv("CACHE_TIMEOUT", 300))
+CACHE_LOCK_SECONDS = int(os.getenv("CACHE_LOCK_SECONDS", 10))
+CACHE_LOCK_WAIT_SECONDS = float(os.getenv("CACHE_LOCK_WAIT_SECONDS", 5))
+CACHE_LOCK_POLL_SECONDS = float(os.getenv("CACHE_LOCK_POLL_SECONDS", 0.05))
+ROULETTE_CACHE_SECONDS = int(os.getenv("ROULETTE_CACHE_SECONDS", 60))
+ROULETTE_RESOLVER_SECONDS = int(os.getenv("ROULETTE_RESOLVER_SECONDS", 30))
+ROULETTE_RESOLVER_SIZE = int(os.getenv("ROULETTE_RESOLVER_SIZE", 1000))
+WARM_CACHES_ON_START = os.getenv("WARM_CACHES_ON_START", "True") == "True"
+WARM_CACHES_WORKERS = int(os.getenv("WARM_CACHES_WORKERS", 4))
+DB_REPLICAS = [name for name in os.getenv("DB_REPLICAS", "").split(",") if name]
+DB_STICKY_SECONDS = int(os.getenv("DB_STICKY_SECONDS", 10))
+DB_STICKY_COOKIE = os.getenv("DB_STICKY_COOKIE", "db_primary")
+DIRECT_UPLOADS = os.getenv("DIRECT_UPLOADS") == "True"
+DIRECT_UPLOAD_MAX_BYTES = int(os.getenv("DIRECT_UPLOAD_MAX_BYTES", 20 * 1024 * 1024))
+DIRECT_UPLOAD_EXPIRES_SECONDS = int(os.getenv("DIRECT_UPLOAD_EXPIRES_SECONDS", 600))
 
 
 print(f"DEBUG: {DEBUG}")
@@ -57,6 +112,7 @@ INSTALLED_APPS = [
     "corsheaders",
     "rest_framework",
     "rest_framework.authtoken",
+    "django_filters",
     "jazzmin",
     # Django apps
     "django.contrib.admin",
@@ -68,8 +124,14 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Request metrics (opt-in with INSTRUMENTATION_ENABLED)
+    "utils.instrumentation.InstrumentationMiddleware",
+    # Prometheus metrics (opt-in with METRICS_ENABLED)
+    "utils.metrics.MetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    # Reads pinned to the primary after a write (read replicas)
+    "project.db_routers.PrimaryStickyMiddleware",
     # Manage static files
     "whitenoise.middleware.WhiteNoiseMiddleware",
     # Cors
@@ -77,11 +139,14 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    # Request profiler for superusers (opt-in with PROFILER_ENABLED)
+    "utils.profiling.ProfilerMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
-ROOT_URLCONF = "project.urls"
+# Events entry point (project.asgi) sets its own urls
+ROOT_URLCONF = os.getenv("ROOT_URLCONF", "project.urls")
 
 TEMPLATES = [
     {
@@ -136,6 +201,60 @@ else:
         }
     }
 
+# Read replicas (DB_REPLICAS): hosts of the primary engine, or database
+# files with sqlite (e.g. a copy of the primary to test locally). Tests
+# use the primary (mirror).
+for index, replica in enumerate(DB_REPLICAS, start=1):
+    replica_database = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+    if replica_database["ENGINE"] == "django.db.backends.sqlite3":
+        replica_database["NAME"] = os.path.join(BASE_DIR, replica)
+    else:
+        replica_database["HOST"] = replica
+    DATABASES[f"replica_{index}"] = replica_database
+
+DB_REPLICA_ALIASES = [alias for alias in DATABASES if alias != "default"]
+
+# Tests: a separate sqlite replica (not migrated), only routed to by the
+# tests that add it to DB_REPLICA_ALIASES
+if IS_TESTING:
+    DATABASES["replica_test"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": os.path.join(BASE_DIR, "testing_replica.sqlite3"),
+    }
+DATABASE_ROUTERS = ["project.db_routers.ReplicaRouter"]
+
+
+# Cache
+# "file" (default): shared by the workers of the server (local stand-in for
+# memcached / redis, atomic add and incr with a file lock), "memcached" /
+# "redis": CACHE_LOCATION server, shared by several servers (pymemcache /
+# redis packages required), "locmem": per process, only for a single worker
+# (cache locks and invalidations don't reach other workers)
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "project.cache_backends.FileCache",
+    "memcached": "django.core.cache.backends.memcached.PyMemcacheCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+if CACHE_BACKEND in ("memcached", "redis") and not CACHE_LOCATION:
+    CACHE_BACKEND = "file"
+# Tests: per process cache (not kept between runs)
+if IS_TESTING:
+    CACHE_BACKEND = "locmem"
+if not CACHE_LOCATION:
+    CACHE_LOCATION = (
+        os.path.join(BASE_DIR, "cache") if CACHE_BACKEND == "file" else "roulette"
+    )
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": CACHE_LOCATION,
+        "KEY_PREFIX": CACHE_KEY_PREFIX,
+        "TIMEOUT": CACHE_TIMEOUT,
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -237,6 +356,14 @@ JAZZMIN_SETTINGS = {
         #     "icon": "fas fa-comments",
         #     "permissions": ["books.view_book"]
         # }]
+        "roulette": [
+            {
+                "name": "Perfiles de peticiones",
+                "url": "admin-profiles",
+                "icon": "fas fa-stopwatch",
+                "permissions": ["auth.view_user"],
+            }
+        ],
     },
     # Custom icons for side menu apps/models
     # See https://fontawesome.com/icons?d=gallery&m=free
@@ -366,6 +493,7 @@ else:
     # Local development (Windows or local server)
     STATIC_ROOT = os.path.join(BASE_DIR, "staticfiles")
     MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+    DEFAULT_FILE_STORAGE = "project.storage_backends.LocalMediaStorage"
 
     # Static files (CSS, JavaScript, Images)
     STATIC_URL = "/static/"
@@ -388,6 +516,33 @@ REST_FRAMEWORK = {
     ),
 }
 
+# Request instrumentation budgets per endpoint (url name)
+# Metrics: queries, db_ms, serializer_ms, total_ms
+INSTRUMENTATION_BUDGETS = {
+    "roulette-list": {"queries": 4, "total_ms": 300},
+    "roulette-detail": {"queries": 4, "total_ms": 200},
+    "roulette-winners": {"queries": 4, "total_ms": 100},
+    "participant-validate": {"queries": 10, "total_ms": 200},
+    "participant-spin": {"queries": 14, "total_ms": 300},
+    "participant-history": {"queries": 6, "total_ms": 100},
+}
+
+# Logging
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "instrumentation": {
+            "handlers": ["console"],
+            "level": os.getenv("INSTRUMENTATION_LOG_LEVEL", "INFO"),
+            "propagate": False,
+        },
+    },
+}
+
 # Global datetime format
 DATE_FORMAT = "d/b/Y"
 TIME_FORMAT = "H:i"
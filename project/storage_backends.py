@@ -1,19 +1,90 @@
+import hashlib
+import os
+import re
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
 from storages.backends.s3boto3 import S3Boto3Storage
 
+# Content hashed files never change: cache them for one year
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+# Other files (e.g. saved before content hashed names) are revalidated
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+# Content hashed (or random unique) file names, e.g. "<32 hex chars>.png"
+HASHED_NAME_PATTERN = re.compile(r"[0-9a-f]{32}(\.\w+)?")
+
+
+def get_cache_control(name: str) -> str:
+    """Return the Cache-Control header of a media file: immutable only if
+    its name is a content hash"""
+
+    if HASHED_NAME_PATTERN.fullmatch(os.path.basename(name)):
+        return IMMUTABLE_CACHE_CONTROL
+    return REVALIDATE_CACHE_CONTROL
+
+
+class ContentHashedNameMixin:
+    """Name saved files by their content hash, e.g. "awards/<hash>.png"
+
+    Identical uploads are saved once (the existing file name is returned),
+    and names change when the content changes, so files can be cached
+    forever.
+    """
+
+    hash_length = 32
+
+    def get_content_hash(self, content) -> str:
+        sha256 = hashlib.sha256()
+        if content.seekable():
+            content.seek(0)
+        for chunk in content.chunks():
+            sha256.update(chunk)
+        if content.seekable():
+            content.seek(0)
+        return sha256.hexdigest()[: self.hash_length]
+
+    def get_hashed_name(self, name: str, content) -> str:
+        folder, file_name = os.path.split(name)
+        extension = os.path.splitext(file_name)[1].lower()
+        return os.path.join(folder, f"{self.get_content_hash(content)}{extension}")
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, "chunks"):
+            content = File(content, name)
+
+        # Same content already saved
+        name = self.get_hashed_name(name, content)
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length=max_length)
+
 
 class StaticStorage(S3Boto3Storage):
     location = 'static'
     default_acl = 'public-read'
 
 
-class PublicMediaStorage(S3Boto3Storage):
+class PublicMediaStorage(ContentHashedNameMixin, S3Boto3Storage):
     location = 'media'
     default_acl = 'public-read'
     file_overwrite = False
 
+    def get_object_parameters(self, name):
+        parameters = super().get_object_parameters(name)
+        parameters["CacheControl"] = get_cache_control(name)
+        return parameters
+
 
 class PrivateMediaStorage(S3Boto3Storage):
     location = 'private'
     default_acl = 'private'
     file_overwrite = False
     custom_domain = False
+
+
+class LocalMediaStorage(ContentHashedNameMixin, FileSystemStorage):
+    pass
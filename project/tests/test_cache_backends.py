@@ -0,0 +1,63 @@
+import tempfile
+import threading
+from time import sleep
+from unittest.mock import patch
+
+from django.core.cache.backends.filebased import FileBasedCache
+from django.test import SimpleTestCase
+
+from project.cache_backends import FileCache
+
+
+class FileCacheTestCase(SimpleTestCase):
+    """Validate atomic add and incr of the file cache (workers sharing the
+    cache folder)"""
+
+    def setUp(self):
+        temp_folder = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_folder.cleanup)
+        self.location = temp_folder.name
+
+    def run_workers(self, target, workers: int = 2) -> list:
+        """Run target with its own cache (like other processes) in threads,
+        returning their results"""
+
+        results = []
+
+        def run():
+            results.append(target(FileCache(self.location, {})))
+
+        threads = [threading.Thread(target=run) for _ in range(workers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    def slow(self, method):
+        """Patch a FileBasedCache method to wait after it (race window
+        between reading and writing the key)"""
+
+        original = getattr(FileBasedCache, method)
+
+        def slow_method(*args, **kwargs):
+            result = original(*args, **kwargs)
+            sleep(0.1)
+            return result
+
+        return patch.object(FileBasedCache, method, slow_method)
+
+    def test_add(self):
+        """Validate a key added by one worker only"""
+
+        with self.slow("has_key"):
+            results = self.run_workers(lambda cache: cache.add("lock", 1))
+        self.assertEqual(sorted(results), [False, True])
+
+    def test_incr(self):
+        """Validate concurrent increments not lost"""
+
+        FileCache(self.location, {}).set("version", 0)
+        with self.slow("get"):
+            self.run_workers(lambda cache: cache.incr("version"))
+        self.assertEqual(FileCache(self.location, {}).get("version"), 2)
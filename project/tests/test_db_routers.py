@@ -0,0 +1,117 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connections
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from model_bakery import baker
+from rest_framework import status
+
+from project import db_routers
+from roulette import models
+from roulette.exports import get_export_queryset
+
+
+class ReplicaRouterTestCase(TestCase):
+    """Validate reads routed to a real replica database (separate sqlite
+    database, with its own rows)"""
+
+    databases = {"default", "replica_test"}
+
+    @classmethod
+    def setUpClass(cls):
+        # Replicas are not migrated: tables of the tested reads
+        with connections["replica_test"].schema_editor() as editor:
+            editor.create_model(models.Roulette)
+            editor.create_model(models.Award)
+        cls.addClassCleanup(cls.drop_replica_tables)
+        super().setUpClass()
+
+    @classmethod
+    def drop_replica_tables(cls):
+        with connections["replica_test"].schema_editor() as editor:
+            editor.delete_model(models.Award)
+            editor.delete_model(models.Roulette)
+
+    def setUp(self):
+        cache.clear()
+        replica_settings = self.settings(DB_REPLICA_ALIASES=["replica_test"])
+        replica_settings.enable()
+        self.addCleanup(replica_settings.disable)
+
+        self.router = db_routers.ReplicaRouter()
+        self.client.force_login(baker.make(User, is_superuser=True))
+        self.roulette = baker.make(models.Roulette, name="Primary")
+        models.Roulette.objects.using("replica_test").create(
+            name="Replica", slug="replica"
+        )
+        self.api_data = {
+            "email": "test@test.com",
+            "name": "Test Participant",
+            "roulette": self.roulette.slug,
+        }
+
+    def get_slugs(self) -> list[str]:
+        return list(
+            models.Roulette.objects.order_by("id").values_list("slug", flat=True)
+        )
+
+    def get_api_slugs(self) -> list[str]:
+        response = self.client.get("/api/roulette/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item["slug"] for item in response.json()["data"]["results"]]
+
+    def test_routing(self):
+        """Validate safe reads to replicas, writes and later reads to primary"""
+
+        self.assertEqual(self.get_slugs(), ["primary"])
+        with db_routers.use_replica():
+            self.assertEqual(self.get_slugs(), ["replica"])
+
+            # Writes outside requests don't pin the reads (e.g. threads)
+            baker.make(models.Roulette, name="Other")
+            self.assertEqual(self.get_slugs(), ["replica"])
+
+            # Reads of the block pinned after its first write
+            with db_routers.pin_after_write() as pin:
+                self.assertEqual(self.get_slugs(), ["replica"])
+                baker.make(models.Roulette, name="Pinned")
+                self.assertEqual(self.get_slugs(), ["primary", "other", "pinned"])
+            self.assertTrue(pin.wrote)
+            self.assertEqual(self.get_slugs(), ["replica"])
+
+        # Authentication always from the primary
+        with db_routers.use_replica():
+            self.assertEqual(self.router.db_for_read(User), "default")
+
+        self.assertTrue(self.router.allow_migrate("default", "roulette"))
+        self.assertFalse(self.router.allow_migrate("replica_test", "roulette"))
+
+    def test_roulette_views(self):
+        """Validate roulettes listed from the replica, and cached roulettes
+        computed from the primary"""
+
+        self.assertEqual(self.get_api_slugs(), ["replica"])
+
+        with CaptureQueriesContext(connections["replica_test"]) as queries:
+            response = self.client.get(f"/api/roulette/{self.roulette.slug}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 0)
+
+    def test_sticky_primary(self):
+        """Validate client reads pinned to primary after a write"""
+
+        # Validate writes the participant: sticky cookie
+        response = self.client.post("/api/participant/validate/", self.api_data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        cookie = response.cookies[settings.DB_STICKY_COOKIE]
+        self.assertEqual(cookie["max-age"], settings.DB_STICKY_SECONDS)
+
+        # Roulettes read from the primary while sticky
+        self.assertEqual(self.get_api_slugs(), ["primary"])
+
+    def test_export_replica(self):
+        """Validate exports read from a replica"""
+
+        queryset = get_export_queryset("spins", [self.roulette.id])
+        self.assertEqual(queryset.db, "replica_test")
@@ -1,10 +1,13 @@
+import re
+
 from django.contrib import admin
 from django.views.generic import RedirectView
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework import routers
 
+from core import views as core_views
 from roulette import views as roulette_views
 
 # Setup drf router
@@ -17,7 +20,21 @@ router.register(
 )
 
 urlpatterns = [
+    # Admin custom pages
+    path("admin/profiles/", core_views.admin_profiles, name="admin-profiles"),
+    path(
+        "admin/profiles/<str:profile_id>/",
+        core_views.admin_profile_detail,
+        name="admin-profile-detail",
+    ),
+    path(
+        "admin/uploads/presign/",
+        core_views.admin_presign_upload,
+        name="admin-presign-upload",
+    ),
     path("admin/", admin.site.urls),
+    # Prometheus metrics
+    path("metrics", core_views.metrics, name="metrics"),
     # Redirects
     path("", RedirectView.as_view(url="/admin/"), name="home-redirect-admin"),
     path(
@@ -29,5 +46,20 @@ urlpatterns = [
     path("api/", include(router.urls)),
 ]
 
+# Local media: only in debug by default, always with a production serve mode
 if not settings.AWS_STORAGE:
-    urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    if settings.MEDIA_SERVE_MODE == "debug":
+        urlpatterns += static(
+            settings.MEDIA_URL,
+            document_root=settings.MEDIA_ROOT,
+            view=core_views.serve_media,
+        )
+    else:
+        media_prefix = re.escape(settings.MEDIA_URL.lstrip("/"))
+        urlpatterns += [
+            re_path(
+                rf"^{media_prefix}(?P<path>.*)$",
+                core_views.serve_media,
+                name="media",
+            ),
+        ]
@@ -0,0 +1,13 @@
+# Server-sent events urls: served with ASGI (project.asgi), the rest of the
+# app is served with WSGI (project.wsgi)
+from django.urls import path
+
+from roulette import views as roulette_views
+
+urlpatterns = [
+    path(
+        "api/roulette/<slug:slug>/events/",
+        roulette_views.roulette_events,
+        name="roulette-events",
+    ),
+]
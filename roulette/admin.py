@@ -1,18 +1,45 @@
+from django.conf import settings
 from django.contrib import admin
+from django.core.exceptions import PermissionDenied
+from django.shortcuts import get_object_or_404, render
+from django.urls import path, reverse
+from django.utils.html import format_html
 from roulette import models
+from roulette.forms import SimulationForm
+from roulette.simulations import simulate_roulette
+from roulette.exports import EXPORT_FIELDS, EXPORT_FORMATS, get_export_response
+from utils.admin_filters import AutocompleteFilter
+from utils.paginators import EstimatedCountPaginator
+from utils.uploads import DirectUploadModelForm
+
+
+def get_export_action(kind: str, export_format: str):
+    """Return an admin action that exports the selected roulettes data"""
+
+    def export_action(modeladmin, request, queryset):
+        roulette_ids = list(queryset.values_list("id", flat=True))
+        return get_export_response(
+            kind, export_format, roulette_ids, compress=settings.EXPORT_GZIP
+        )
+
+    export_action.__name__ = f"export_{kind}_{export_format}"
+    export_action.short_description = f"Exportar {kind} ({export_format.upper()})"
+    return export_action
 
 
 @admin.register(models.Roulette)
 class RouletteAdmin(admin.ModelAdmin):
+    form = DirectUploadModelForm
     list_display = (
         "name",
         "subtitle",
         "spins_space_hours",
         "spins_ads_limit",
+        "award_engine",
         "created_at",
         "updated_at",
     )
-    list_filter = ("created_at", "updated_at")
+    list_filter = ("award_engine", "created_at", "updated_at")
     search_fields = (
         "name",
         "subtitle",
@@ -21,21 +48,79 @@ class RouletteAdmin(admin.ModelAdmin):
         "message_lose",
         "message_win",
     )
-    readonly_fields = ("slug", "created_at", "updated_at")
+    readonly_fields = ("slug", "simulation_link", "created_at", "updated_at")
+    actions = [
+        get_export_action(kind, export_format)
+        for kind in EXPORT_FIELDS
+        for export_format in EXPORT_FORMATS
+    ]
+
+    @admin.display(description="Simulación de pagos")
+    def simulation_link(self, obj):
+        if not obj.pk:
+            return "-"
+        url = reverse("admin:roulette_roulette_simulation", args=[obj.pk])
+        return format_html('<a href="{}">Simular premios y costos</a>', url)
+
+    def get_urls(self):
+        urls = [
+            path(
+                "<int:roulette_id>/simulation/",
+                self.admin_site.admin_view(self.simulation_view),
+                name="roulette_roulette_simulation",
+            ),
+        ]
+        return urls + super().get_urls()
+
+    def simulation_view(self, request, roulette_id):
+        """Simulate the awards and cost per day of a roulette (parameters and
+        configuration to try in the query string)"""
+
+        roulette = get_object_or_404(models.Roulette, pk=roulette_id)
+        if not self.has_view_permission(request, roulette):
+            raise PermissionDenied
+
+        results = None
+        form = SimulationForm(request.GET or None)
+        if form.is_valid():
+            try:
+                results = simulate_roulette(roulette, **form.get_simulation_kwargs())
+            except ValueError as error:
+                form.add_error(None, str(error))
+
+        context = {
+            **self.admin_site.each_context(request),
+            "opts": self.model._meta,
+            "title": f"Simulación de pagos: {roulette.name}",
+            "roulette": roulette,
+            "form": form,
+            "results": results,
+        }
+        return render(request, "admin/roulette/roulette/simulation.html", context)
 
 
 @admin.register(models.Award)
 class AwardAdmin(admin.ModelAdmin):
+    form = DirectUploadModelForm
     list_display = (
         "name",
         "roulette",
         'min_spins',
+        "probability",
+        "cost",
+        "stock",
         "active",
         "created_at",
         "updated_at",
     )
     list_filter = ("roulette", "active", "created_at", "updated_at")
+    list_select_related = ("roulette",)
     search_fields = ("name", "description")
+    autocomplete_fields = ("roulette",)
+
+    def get_queryset(self, request):
+        # Award.__str__ uses the roulette name (autocomplete results)
+        return super().get_queryset(request).select_related("roulette")
 
 
 @admin.register(models.Participant)
@@ -51,6 +136,8 @@ class ParticipantAdmin(admin.ModelAdmin):
         "updated_at",
     )
     search_fields = ("name", "email")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ("created_at", "updated_at")
 
 
@@ -64,24 +151,37 @@ class ParticipantSpinAdmin(admin.ModelAdmin):
         "updated_at",
     )
     list_filter = (
-        "participant",
+        ("participant", AutocompleteFilter),
         "roulette",
         "is_extra_spin",
         "created_at",
         "updated_at",
     )
+    list_select_related = ("participant", "roulette")
     search_fields = ("participant__name", "participant__email", "roulette__name")
+    autocomplete_fields = ("participant", "roulette")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ("created_at", "updated_at")
 
 
 @admin.register(models.ParticipantAward)
 class ParticipantAwardAdmin(admin.ModelAdmin):
     list_display = ("participant", "award", "created_at", "updated_at")
-    list_filter = ("participant", "award__roulette", "created_at", "updated_at")
+    list_filter = (
+        ("participant", AutocompleteFilter),
+        "award__roulette",
+        "created_at",
+        "updated_at",
+    )
+    list_select_related = ("participant", "award__roulette")
     search_fields = (
         "participant__name",
         "participant__email",
         "award__name",
         "award__roulette__name",
     )
+    autocomplete_fields = ("participant", "award")
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ("created_at", "updated_at")
@@ -5,3 +5,6 @@ class RouletteConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'roulette'
     verbose_name = 'Rouleta'
+
+    def ready(self):
+        from roulette import signals  # noqa: F401
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.db.models import F, Q
+
+from roulette import models
+from utils.cache import get_cache_key, get_or_compute, invalidate_namespace
+
+# Awards with units left (empty stock: unlimited)
+IN_STOCK = Q(stock__isnull=True) | Q(stock__gt=0)
+
+
+def get_award_ladder_cache_key(roulette: models.Roulette) -> str:
+    return get_cache_key(models.Award, "ladder", roulette.id)
+
+
+def get_award_ladder(
+    roulette: models.Roulette, cached: bool = True
+) -> list[models.Award]:
+    """Return the roulette active awards in stock, in spin order (cached
+    until the awards change or one runs out of stock)
+
+    Args:
+        roulette (Roulette): roulette of the awards
+        cached (bool): read the cache, False for a fresh query (e.g. spins:
+            never grant awards deactivated or edited in another worker)
+
+    Returns:
+        list[Award]: active awards, related to the given roulette
+    """
+
+    def compute():
+        return list(
+            models.Award.objects.filter(roulette=roulette, active=True)
+            .filter(IN_STOCK)
+            .order_by("id")
+        )
+
+    if cached:
+        awards = get_or_compute(
+            get_award_ladder_cache_key(roulette),
+            compute,
+            settings.ROULETTE_CACHE_SECONDS,
+        )
+    else:
+        awards = compute()
+
+    # Roulette not cached with the awards (spins counter changes)
+    for award in awards:
+        award.roulette = roulette
+    return awards
+
+
+def take_award(award: models.Award) -> bool:
+    """Take one unit of the award stock (unlimited if stock is empty)
+
+    Lock-free conditional decrement (UPDATE ... WHERE stock > 0): the
+    database serializes concurrent spins on the row, so the stock never
+    goes below zero. The award ladder is invalidated when the award runs
+    out (or its cached stock is stale).
+
+    Args:
+        award (Award): award to grant (e.g. from the cached ladder)
+
+    Returns:
+        bool: if a unit was taken
+    """
+
+    if award.stock is None:
+        return True
+
+    taken = models.Award.objects.filter(pk=award.pk, stock__gt=0).update(
+        stock=F("stock") - 1
+    )
+    if taken:
+        award.stock -= 1
+    if not taken or award.stock <= 0:
+        invalidate_namespace(models.Award)
+    return bool(taken)
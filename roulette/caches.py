@@ -0,0 +1,113 @@
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Exists, OuterRef, Prefetch
+from django.shortcuts import get_object_or_404
+
+from roulette import models, serializers
+from roulette.awards import IN_STOCK
+from utils.cache import get_cache_key, get_namespace_version, get_or_compute
+from utils.emails import render_email
+
+
+def get_roulettes_queryset():
+    """Return roulettes with their active awards (in stock) prefetched"""
+    return models.Roulette.objects.prefetch_related(
+        Prefetch(
+            "awards",
+            queryset=models.Award.objects.filter(IN_STOCK, active=True),
+            to_attr="active_awards",
+        )
+    )
+
+
+def get_roulette_cache_key(slug: str) -> str:
+    """Roulette payload key, expired when the roulette or any award changes"""
+    awards_version = get_namespace_version(models.Award)
+    return get_cache_key(models.Roulette, slug, f"awards-v{awards_version}")
+
+
+def get_roulette_data(slug: str) -> dict:
+    """Return the cached roulette payload (config and active awards)
+
+    Spins counter updates don't expire it: the counter is refreshed after
+    ROULETTE_CACHE_SECONDS.
+
+    Raises:
+        Http404: roulette not found (not cached)
+    """
+
+    def compute():
+        roulette = get_object_or_404(get_roulettes_queryset(), slug=slug)
+        return dict(serializers.RouletteSerializer(roulette).data)
+
+    return get_or_compute(
+        get_roulette_cache_key(slug), compute, settings.ROULETTE_CACHE_SECONDS
+    )
+
+
+def warm_roulette(roulette: models.Roulette) -> dict:
+    """Cache the roulette payload (spins read the award ladder fresh: not
+    warmed)
+
+    Returns:
+        dict: roulette slug and milliseconds of the payload cache
+    """
+
+    timings = {"roulette": roulette.slug}
+    try:
+        start = perf_counter()
+        get_roulette_data(roulette.slug)
+        timings["payload_ms"] = round((perf_counter() - start) * 1000, 2)
+    finally:
+        connections.close_all()
+    return timings
+
+
+def warm_templates() -> float:
+    """Compile the email templates (cached by the template loader)
+
+    Returns:
+        float: milliseconds
+    """
+
+    start = perf_counter()
+    render_email("", [], "", "", key_items={"": ""}, extra_image=True)
+    return round((perf_counter() - start) * 1000, 2)
+
+
+def warm_caches(workers: int = 4) -> dict:
+    """Pre-render the caches of all active roulettes (with active awards)
+    in parallel, and the process caches: db connection and templates
+
+    Safe to run concurrently (e.g. by each server worker): values are
+    computed once (single-flight) and the other runs read them.
+
+    Args:
+        workers (int): roulettes warmed in parallel
+
+    Returns:
+        dict: milliseconds of the connection, templates and each roulette
+    """
+
+    start = perf_counter()
+    connection_start = perf_counter()
+    connections["default"].ensure_connection()
+    results = {
+        "connection_ms": round((perf_counter() - connection_start) * 1000, 2),
+        "templates_ms": warm_templates(),
+    }
+
+    active_awards = models.Award.objects.filter(roulette=OuterRef("pk"), active=True)
+    roulettes = list(
+        models.Roulette.objects.filter(Exists(active_awards)).only("id", "slug")
+    )
+    with ThreadPoolExecutor(
+        max_workers=max(workers, 1), thread_name_prefix="warm-caches"
+    ) as executor:
+        results["roulettes"] = list(executor.map(warm_roulette, roulettes))
+
+    results["total_ms"] = round((perf_counter() - start) * 1000, 2)
+    return results
@@ -0,0 +1,146 @@
+import math
+import random
+
+from django.conf import settings
+from django.db.models import F
+
+from roulette import models
+from roulette.awards import get_award_ladder
+from utils.cache import get_cache_key, get_or_compute
+from utils.sampling import AliasTable
+
+
+class AwardEngine:
+    """Decide the awards a spin wins (selected per roulette, award_engine)"""
+
+    def get_candidates(
+        self, roulette: models.Roulette, awards: list[models.Award] = None
+    ) -> list[models.Award]:
+        """Return the awards won by the spin, in preference order (the
+        first one in stock is granted)
+
+        Args:
+            roulette (Roulette): spin roulette
+            awards (list[Award]): award ladder to use (active, in stock, e.g.
+                simulated), None: the current roulette awards
+
+        Returns:
+            list[Award]: won awards, empty if the spin loses
+        """
+        raise NotImplementedError
+
+    def award_granted(self, roulette: models.Roulette, award: models.Award):
+        """Update the roulette after granting an award (in the spin
+        transaction)"""
+
+
+class ThresholdEngine(AwardEngine):
+    """Win the awards reached by the roulette spins counter (min_spins)"""
+
+    def get_candidates(self, roulette, awards=None):
+        # Current awards (not cached): never grant awards deactivated or
+        # edited in another worker
+        if awards is None:
+            awards = get_award_ladder(roulette, cached=False)
+        return [award for award in awards if roulette.spins_counter >= award.min_spins]
+
+    def award_granted(self, roulette, award):
+        # Reduce roulette spins counter (atomic update)
+        models.Roulette.objects.filter(pk=roulette.pk).update(
+            spins_counter=F("spins_counter") - award.min_spins
+        )
+        roulette.spins_counter -= award.min_spins
+
+
+class WeightedEngine(AwardEngine):
+    """Win one award (or none) by the award probabilities
+
+    Each spin samples a Walker alias table of the roulette awards and the
+    losing outcome (1 - sum of probabilities, none if they add up to 1 or
+    more: weights are normalized), in O(1) regardless of the number of
+    awards. Tables of the current awards are cached per roulette until the
+    awards change (Award namespace version).
+    """
+
+    def __init__(self, rng: random.Random = None):
+        """
+        Args:
+            rng (random.Random): random generator, seeded in tests
+        """
+        self.rng = rng or random.Random()
+
+    def get_outcomes(self, awards: list[models.Award]) -> tuple:
+        """Return the spin outcomes (awards, None: lose) and their weights
+
+        Returns:
+            tuple: (list of outcomes, list of weights), empty if no award
+                can be won
+        """
+
+        outcomes = [award for award in awards if award.probability > 0]
+        weights = [award.probability for award in outcomes]
+        if not outcomes:
+            return outcomes, weights
+
+        # Exact sum (e.g. 0.6 + 0.3 + 0.1 is 1, never lose)
+        lose_weight = 1 - math.fsum(weights)
+        if lose_weight > 0:
+            outcomes.append(None)
+            weights.append(lose_weight)
+        return outcomes, weights
+
+    def build_table(self, awards: list[models.Award]) -> tuple:
+        """Return the outcomes (awards, None: lose) of the given awards and
+        their alias table
+
+        Returns:
+            tuple: (list of outcomes, AliasTable), (outcomes, None) if no
+                award can be won
+        """
+
+        outcomes, weights = self.get_outcomes(awards)
+        if not outcomes:
+            return outcomes, None
+        return outcomes, AliasTable(weights)
+
+    def get_table(self, roulette: models.Roulette) -> tuple:
+        """Return the outcomes and alias table of the current roulette
+        awards (cached until the awards change: edits, deactivations and
+        awards out of stock invalidate the Award namespace)
+
+        Returns:
+            tuple: (list of outcomes, AliasTable), (outcomes, None) if no
+                award can be won
+        """
+
+        return get_or_compute(
+            get_cache_key(models.Award, "alias-table", roulette.id),
+            lambda: self.build_table(get_award_ladder(roulette, cached=False)),
+            settings.ROULETTE_CACHE_SECONDS,
+        )
+
+    def get_candidates(self, roulette, awards=None):
+        if awards is None:
+            outcomes, table = self.get_table(roulette)
+        else:
+            outcomes, table = self.build_table(awards)
+        if table is None:
+            return []
+        award = outcomes[table.sample(self.rng)]
+        if award is None:
+            return []
+
+        # Roulette not cached with the awards (spins counter changes)
+        award.roulette = roulette
+        return [award]
+
+
+AWARD_ENGINES = {
+    "threshold": ThresholdEngine(),
+    "weighted": WeightedEngine(),
+}
+
+
+def get_award_engine(roulette: models.Roulette) -> AwardEngine:
+    """Return the award engine of the roulette (threshold by default)"""
+    return AWARD_ENGINES.get(roulette.award_engine, AWARD_ENGINES["threshold"])
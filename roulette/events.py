@@ -0,0 +1,216 @@
+import asyncio
+import json
+import os
+import threading
+from time import monotonic, sleep
+
+from django.conf import settings
+
+
+def mask_name(name: str) -> str:
+    """Return a public version of a participant name
+
+    Args:
+        name (str): participant full name, e.g. "Juan Perez"
+
+    Returns:
+        str: first name and initials, e.g. "Juan P."
+    """
+
+    words = name.split()
+    if not words:
+        return ""
+    if len(words) == 1:
+        return f"{words[0][0]}***"
+    initials = " ".join(f"{word[0].upper()}." for word in words[1:])
+    return f"{words[0]} {initials}"
+
+
+def format_event(event: dict) -> str:
+    """Return the event in server-sent events format"""
+    return f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+class EventHub:
+    """In-process fan-out of roulette events to the connected clients
+
+    Each client has its own bounded queue in the event loop of its
+    connection. Idle clients only cost their queue, and slow clients
+    lose their oldest events instead of blocking the others.
+    """
+
+    def __init__(self):
+        self.subscribers = {}
+        self.lock = threading.Lock()
+
+    def subscribe(self, slug: str) -> asyncio.Queue:
+        """Register a client of the roulette in the running event loop"""
+
+        queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+        loop = asyncio.get_running_loop()
+        with self.lock:
+            self.subscribers.setdefault(slug, set()).add((loop, queue))
+        get_broker().start()
+        return queue
+
+    def unsubscribe(self, slug: str, queue: asyncio.Queue):
+        with self.lock:
+            subscribers = self.subscribers.get(slug, set())
+            subscribers.difference_update(
+                [item for item in subscribers if item[1] is queue]
+            )
+            if not subscribers:
+                self.subscribers.pop(slug, None)
+
+    def count(self, slug: str) -> int:
+        """Return the connected clients of the roulette"""
+        with self.lock:
+            return len(self.subscribers.get(slug, ()))
+
+    def dispatch(self, event: dict):
+        """Send the event to the roulette clients (thread safe)"""
+
+        with self.lock:
+            subscribers = list(self.subscribers.get(event["roulette"], ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self.put, queue, event)
+            except RuntimeError:
+                # Event loop already closed
+                self.unsubscribe(event["roulette"], queue)
+
+    @staticmethod
+    def put(queue: asyncio.Queue, event: dict):
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+
+class LocalBroker:
+    """Deliver events to the clients of the current process only"""
+
+    def publish(self, event: dict):
+        hub.dispatch(event)
+
+    def start(self):
+        pass
+
+
+class FileBroker:
+    """Deliver events to the clients of all processes (e.g. gunicorn workers)
+
+    Stand-in for a real message broker: events are appended to a shared
+    file (EVENTS_BROKER_DIR) and each process tails it in a background
+    thread. The file is truncated when it exceeds EVENTS_BROKER_MAX_BYTES,
+    events written while a process is reading it can be lost.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.thread = None
+        self.pid = None
+
+    def get_file_path(self) -> str:
+        return os.path.join(settings.EVENTS_BROKER_DIR, "events.jsonl")
+
+    def publish(self, event: dict):
+        os.makedirs(settings.EVENTS_BROKER_DIR, exist_ok=True)
+        line = f"{json.dumps(event)}\n".encode()
+        file = os.open(
+            self.get_file_path(), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644
+        )
+        try:
+            if os.fstat(file).st_size > settings.EVENTS_BROKER_MAX_BYTES:
+                os.ftruncate(file, 0)
+            os.write(file, line)
+        finally:
+            os.close(file)
+
+    def start(self):
+        """Start the listener thread of the current process"""
+
+        with self.lock:
+            # New thread after fork (threads are not inherited)
+            if self.pid == os.getpid() and self.thread.is_alive():
+                return
+            self.pid = os.getpid()
+            self.thread = threading.Thread(target=self.listen, daemon=True)
+            self.thread.start()
+
+    def listen(self):
+        """Dispatch the new lines of the events file"""
+
+        file_path = self.get_file_path()
+        position = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+        while True:
+            sleep(settings.EVENTS_POLL_SECONDS)
+            try:
+                size = os.path.getsize(file_path)
+            except OSError:
+                continue
+
+            # File truncated: read from start
+            if size < position:
+                position = 0
+            if size == position:
+                continue
+
+            with open(file_path, "rb") as file:
+                file.seek(position)
+                data = file.read(size - position)
+
+            # Only complete lines, the rest is read in the next loop
+            end = data.rfind(b"\n") + 1
+            position += end
+            for line in data[:end].splitlines():
+                try:
+                    hub.dispatch(json.loads(line))
+                except (ValueError, KeyError):
+                    continue
+
+
+hub = EventHub()
+local_broker = LocalBroker()
+file_broker = FileBroker()
+
+
+def get_broker():
+    """Return the broker selected with EVENTS_BROKER ("local" or "file")"""
+    if settings.EVENTS_BROKER == "file":
+        return file_broker
+    return local_broker
+
+
+def publish_event(slug: str, event_type: str, data: dict):
+    """Send an event to the clients of a roulette
+
+    Args:
+        slug (str): roulette slug
+        event_type (str): "config" or "winner"
+        data (dict): json serializable event data
+    """
+    get_broker().publish({"roulette": slug, "type": event_type, "data": data})
+
+
+async def stream_events(slug: str):
+    """Yield the roulette events in server-sent events format
+
+    Comments are sent every EVENTS_KEEPALIVE_SECONDS to keep the connection
+    open, and the stream ends after EVENTS_STREAM_SECONDS (the browser
+    reconnects), so abandoned connections are released.
+    """
+
+    queue = hub.subscribe(slug)
+    end_time = monotonic() + settings.EVENTS_STREAM_SECONDS
+    try:
+        yield f"retry: {settings.EVENTS_RETRY_MS}\n\n"
+        while (remaining := end_time - monotonic()) > 0:
+            timeout = min(settings.EVENTS_KEEPALIVE_SECONDS, remaining)
+            try:
+                event = await asyncio.wait_for(queue.get(), timeout)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_event(event)
+    finally:
+        hub.unsubscribe(slug, queue)
@@ -0,0 +1,189 @@
+import csv
+import json
+import zlib
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from project.db_routers import get_replica_db
+from roulette import models
+
+# Columns (values_list fields) of each export kind
+EXPORT_FIELDS = {
+    "participants": (
+        "id",
+        "name",
+        "email",
+        "created_at",
+    ),
+    "spins": (
+        "id",
+        "roulette__slug",
+        "participant__name",
+        "participant__email",
+        "is_extra_spin",
+        "created_at",
+    ),
+    "awards": (
+        "id",
+        "award__roulette__slug",
+        "award__name",
+        "participant__name",
+        "participant__email",
+        "created_at",
+    ),
+}
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+
+class Echo:
+    """File-like object that returns the written value (for csv.writer)"""
+
+    def write(self, value):
+        return value
+
+
+def get_export_queryset(kind: str, roulette_ids: list[int]):
+    """Return the export queryset of the roulettes as values_list
+
+    Args:
+        kind (str): export kind, one of EXPORT_FIELDS keys
+        roulette_ids (list[int]): roulettes to export
+
+    Returns:
+        QuerySet: values_list queryset ordered by id
+    """
+
+    if kind == "participants":
+        participant_ids = models.ParticipantSpin.objects.filter(
+            roulette_id__in=roulette_ids
+        ).values("participant_id")
+        queryset = models.Participant.objects.filter(id__in=participant_ids)
+    elif kind == "spins":
+        queryset = models.ParticipantSpin.objects.filter(roulette_id__in=roulette_ids)
+    elif kind == "awards":
+        queryset = models.ParticipantAward.objects.filter(
+            award__roulette_id__in=roulette_ids
+        )
+    else:
+        raise ValueError(f"Invalid export kind: {kind}")
+
+    # Read from a replica (streamed after the request)
+    queryset = queryset.using(get_replica_db())
+    return queryset.order_by("id").values_list(*EXPORT_FIELDS[kind])
+
+
+def iter_export_rows(kind: str, roulette_ids: list[int], chunk_size: int = None):
+    """Yield export rows without loading the full queryset in memory
+
+    Args:
+        kind (str): export kind, one of EXPORT_FIELDS keys
+        roulette_ids (list[int]): roulettes to export
+        chunk_size (int): rows fetched from the database per chunk
+
+    Yields:
+        tuple: row values
+    """
+
+    chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+    queryset = get_export_queryset(kind, roulette_ids)
+    yield from queryset.iterator(chunk_size=chunk_size)
+
+
+def iter_export_csv(kind: str, rows) -> str:
+    """Yield csv lines (header first) from export rows"""
+
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_FIELDS[kind])
+    for row in rows:
+        yield writer.writerow(
+            [
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in row
+            ]
+        )
+
+
+def iter_export_jsonl(kind: str, rows) -> str:
+    """Yield json lines from export rows"""
+
+    fields = EXPORT_FIELDS[kind]
+    for row in rows:
+        yield json.dumps(dict(zip(fields, row)), default=str) + "\n"
+
+
+def iter_gzip(chunks) -> bytes:
+    """Compress text chunks on the fly as a gzip stream"""
+
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        data = compressor.compress(chunk.encode())
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def iter_export(
+    kind: str,
+    export_format: str,
+    roulette_ids: list[int],
+    compress: bool = False,
+    chunk_size: int = None,
+):
+    """Return an iterator with the export file content
+
+    Args:
+        kind (str): export kind, one of EXPORT_FIELDS keys
+        export_format (str): export format, one of EXPORT_FORMATS keys
+        roulette_ids (list[int]): roulettes to export
+        compress (bool): gzip the content on the fly
+        chunk_size (int): rows fetched from the database per chunk
+
+    Returns:
+        Iterator[str | bytes]: text chunks, or bytes if compress is True
+    """
+
+    rows = iter_export_rows(kind, roulette_ids, chunk_size)
+    if export_format == "csv":
+        chunks = iter_export_csv(kind, rows)
+    elif export_format == "jsonl":
+        chunks = iter_export_jsonl(kind, rows)
+    else:
+        raise ValueError(f"Invalid export format: {export_format}")
+
+    if compress:
+        return iter_gzip(chunks)
+    return chunks
+
+
+def get_export_response(
+    kind: str, export_format: str, roulette_ids: list[int], compress: bool = False
+) -> StreamingHttpResponse:
+    """Return a streaming download response with the export file
+
+    Args:
+        kind (str): export kind, one of EXPORT_FIELDS keys
+        export_format (str): export format, one of EXPORT_FORMATS keys
+        roulette_ids (list[int]): roulettes to export
+        compress (bool): gzip the content on the fly
+
+    Returns:
+        StreamingHttpResponse: file download response
+    """
+
+    file_name = f"{kind}-{timezone.now():%Y%m%d-%H%M%S}.{export_format}"
+    content_type = EXPORT_FORMATS[export_format]
+    if compress:
+        file_name += ".gz"
+        content_type = "application/gzip"
+
+    response = StreamingHttpResponse(
+        iter_export(kind, export_format, roulette_ids, compress),
+        content_type=content_type,
+    )
+    response["Content-Disposition"] = f'attachment; filename="{file_name}"'
+    return response
@@ -0,0 +1,22 @@
+from django.db.models import Exists, OuterRef
+from django_filters import rest_framework as filters
+
+from roulette import models
+
+
+class RouletteFilter(filters.FilterSet):
+    name = filters.CharFilter(field_name="name", lookup_expr="istartswith")
+    active = filters.BooleanFilter(method="filter_active")
+
+    class Meta:
+        model = models.Roulette
+        fields = ["name", "active"]
+
+    def filter_active(self, queryset, name, value):
+        """Filter roulettes with (or without) active awards"""
+        active_awards = models.Award.objects.filter(
+            roulette=OuterRef("pk"), active=True
+        )
+        if value:
+            return queryset.filter(Exists(active_awards))
+        return queryset.exclude(Exists(active_awards))
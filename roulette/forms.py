@@ -0,0 +1,85 @@
+from django import forms
+
+from roulette import models
+from roulette.simulations import ROULETTE_OVERRIDES, SIMULATION_DEFAULTS
+
+
+class SimulationForm(forms.Form):
+    """Payout simulation parameters (admin page)"""
+
+    participants = forms.IntegerField(
+        min_value=1,
+        max_value=10_000_000,
+        initial=SIMULATION_DEFAULTS["participants"],
+        label="Participantes",
+    )
+    days = forms.IntegerField(
+        min_value=1, max_value=365, initial=SIMULATION_DEFAULTS["days"], label="Días"
+    )
+    runs = forms.IntegerField(
+        min_value=1,
+        max_value=1000,
+        initial=SIMULATION_DEFAULTS["runs"],
+        label="Simulaciones",
+    )
+    visit_rate = forms.FloatField(
+        min_value=0,
+        max_value=1,
+        initial=SIMULATION_DEFAULTS["visit_rate"],
+        label="Probabilidad de girar",
+        help_text="Por participante, en cada espacio entre giros.",
+    )
+    ad_rate = forms.FloatField(
+        min_value=0,
+        max_value=1,
+        initial=SIMULATION_DEFAULTS["ad_rate"],
+        label="Probabilidad de ver anuncios",
+        help_text="Por cada giro extra (anuncio) disponible.",
+    )
+    seed = forms.IntegerField(
+        required=False, min_value=0, label="Semilla", help_text="Opcional."
+    )
+
+    # Configuration to try (empty: current roulette configuration)
+    spins_space_hours = forms.FloatField(
+        required=False,
+        min_value=0,
+        label="Espacio entre giros (horas)",
+        help_text="Opcional, en lugar del actual.",
+    )
+    spins_ads_limit = forms.IntegerField(
+        required=False,
+        min_value=0,
+        label="Límite de giros (ads)",
+        help_text="Opcional, en lugar del actual.",
+    )
+    award_engine = forms.ChoiceField(
+        required=False,
+        choices=[
+            ("", "Actual"),
+            *models.Roulette._meta.get_field("award_engine").choices,
+        ],
+        label="Motor de premios",
+    )
+    awards = forms.JSONField(
+        required=False,
+        label="Premios",
+        help_text=(
+            'Opcional, cambios por premio, e.g. [{"id": 1, "stock": 10}, '
+            '{"name": "Nuevo", "min_spins": 50, "cost": 5}]. Sin "id": premio '
+            'nuevo, "active": false lo quita.'
+        ),
+        widget=forms.Textarea(attrs={"rows": 3}),
+    )
+
+    def get_simulation_kwargs(self) -> dict:
+        """Return the simulate_roulette arguments: parameters and the given
+        overrides"""
+
+        kwargs = dict(self.cleaned_data)
+        overrides = {}
+        for name in (*ROULETTE_OVERRIDES, "awards"):
+            value = kwargs.pop(name)
+            if value not in (None, ""):
+                overrides[name] = value
+        return {**kwargs, "overrides": overrides}
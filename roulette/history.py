@@ -0,0 +1,141 @@
+import base64
+import heapq
+import json
+from datetime import datetime
+from itertools import islice
+
+from django.db.models import Q
+
+from roulette import models
+
+# Items order at the same date: awards before spins
+HISTORY_KINDS = ("award", "spin")
+
+
+def encode_cursor(item: dict) -> str:
+    """Return the opaque cursor of a history item (date, kind, id)"""
+    data = [item["created_at"].isoformat(), item["type"], item["id"]]
+    return base64.urlsafe_b64encode(json.dumps(data).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, str, int]:
+    """Return date, kind and id of the cursor
+
+    Raises:
+        ValueError: invalid cursor
+    """
+
+    try:
+        created_at, kind, item_id = json.loads(base64.urlsafe_b64decode(cursor))
+        created_at = datetime.fromisoformat(created_at)
+        item_id = int(item_id)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if kind not in HISTORY_KINDS:
+        raise ValueError("Invalid cursor")
+    return created_at, kind, item_id
+
+
+def get_history_key(item: dict) -> tuple:
+    """Sort key, history is sorted descending: newest first"""
+    return item["created_at"], -HISTORY_KINDS.index(item["type"]), item["id"]
+
+
+def filter_after_cursor(queryset, kind: str, cursor: tuple):
+    """Filter the items after the cursor (keyset), in history order
+
+    Args:
+        queryset (QuerySet): spins or awards of the participant
+        kind (str): queryset items kind ("spin" or "award")
+        cursor (tuple): decoded cursor: date, kind, id
+
+    Returns:
+        QuerySet: items after the cursor
+    """
+
+    if not cursor:
+        return queryset
+
+    created_at, cursor_kind, cursor_id = cursor
+    rank = HISTORY_KINDS.index(kind)
+    cursor_rank = HISTORY_KINDS.index(cursor_kind)
+    if rank > cursor_rank:
+        return queryset.filter(created_at__lte=created_at)
+    if rank < cursor_rank:
+        return queryset.filter(created_at__lt=created_at)
+    return queryset.filter(
+        Q(created_at__lt=created_at) | Q(created_at=created_at, id__lt=cursor_id)
+    )
+
+
+def iter_spins(participant, roulette, cursor: tuple, limit: int):
+    """Yield the participant spins in history order"""
+
+    queryset = models.ParticipantSpin.objects.filter(
+        participant=participant, roulette=roulette
+    )
+    queryset = filter_after_cursor(queryset, "spin", cursor)
+    rows = queryset.order_by("-created_at", "-id").values(
+        "id", "created_at", "is_extra_spin"
+    )
+    for row in rows[:limit]:
+        yield {"type": "spin", **row}
+
+
+def iter_awards(participant, roulette, cursor: tuple, limit: int):
+    """Yield the participant awards in history order"""
+
+    queryset = models.ParticipantAward.objects.filter(
+        participant=participant, award__roulette=roulette
+    )
+    queryset = filter_after_cursor(queryset, "award", cursor)
+    rows = queryset.order_by("-created_at", "-id").values(
+        "id", "created_at", "award_id", "award__name"
+    )
+    for row in rows[:limit]:
+        yield {
+            "type": "award",
+            "id": row["id"],
+            "created_at": row["created_at"],
+            "award": {"id": row["award_id"], "name": row["award__name"]},
+        }
+
+
+def get_history_page(
+    participant, roulette, cursor: str = None, limit: int = 20
+) -> tuple[list[dict], str]:
+    """Return a page of the participant spins and awards, newest first
+
+    Keyset pagination on (created_at, id): each stream only reads the
+    rows after the cursor (no count or offset), and both streams are
+    merged lazily until the page is complete.
+
+    Args:
+        participant (Participant): participant
+        roulette (Roulette): roulette of the spins and awards
+        cursor (str): cursor of the last item of the previous page
+        limit (int): page size
+
+    Returns:
+        tuple[list[dict], str]: page items, cursor of the next page
+            (None in the last page)
+
+    Raises:
+        ValueError: invalid cursor
+    """
+
+    decoded_cursor = decode_cursor(cursor) if cursor else None
+
+    # Extra item to detect next page
+    streams = [
+        iter_spins(participant, roulette, decoded_cursor, limit + 1),
+        iter_awards(participant, roulette, decoded_cursor, limit + 1),
+    ]
+    merged = heapq.merge(*streams, key=get_history_key, reverse=True)
+    items = list(islice(merged, limit + 1))
+
+    next_cursor = None
+    if len(items) > limit:
+        items = items[:limit]
+        next_cursor = encode_cursor(items[-1])
+    return items, next_cursor
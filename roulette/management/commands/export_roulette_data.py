@@ -0,0 +1,62 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from roulette import models
+from roulette.exports import EXPORT_FIELDS, EXPORT_FORMATS, iter_export
+
+
+class Command(BaseCommand):
+    help = "Export participants, spins or awards of a roulette as csv or jsonl"
+
+    def add_arguments(self, parser):
+        parser.add_argument("slug", help="Roulette slug")
+        parser.add_argument(
+            "--kind", choices=list(EXPORT_FIELDS.keys()), default="participants"
+        )
+        parser.add_argument(
+            "--format",
+            dest="export_format",
+            choices=list(EXPORT_FORMATS.keys()),
+            default="csv",
+        )
+        parser.add_argument(
+            "--gzip", action="store_true", help="Compress output with gzip"
+        )
+        parser.add_argument(
+            "--output", default="-", help="Output file path (default: stdout)"
+        )
+        parser.add_argument(
+            "--chunk-size", type=int, default=None, help="Rows fetched per query"
+        )
+
+    def handle(self, *args, **options):
+        roulette = models.Roulette.objects.filter(slug=options["slug"]).first()
+        if not roulette:
+            raise CommandError(f"Roulette '{options['slug']}' not found")
+
+        chunks = iter_export(
+            options["kind"],
+            options["export_format"],
+            [roulette.id],
+            compress=options["gzip"],
+            chunk_size=options["chunk_size"],
+        )
+
+        # Write to stdout (gzip as raw bytes)
+        output = options["output"]
+        if output == "-":
+            if options["gzip"]:
+                for chunk in chunks:
+                    sys.stdout.buffer.write(chunk)
+                sys.stdout.buffer.flush()
+            else:
+                for chunk in chunks:
+                    self.stdout.write(chunk, ending="")
+            return
+
+        # Write to file
+        with open(output, "wb") as file:
+            for chunk in chunks:
+                file.write(chunk if options["gzip"] else chunk.encode())
+        self.stderr.write(f"Export saved in {output}")
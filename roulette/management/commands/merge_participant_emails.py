@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from roulette import models
+from roulette.participants import merge_duplicate_participants
+
+
+class Command(BaseCommand):
+    help = (
+        "Normalize participants emails and merge duplicated participants "
+        "(spins and awards are moved to the oldest participant)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size", type=int, default=1000, help="Participants per query"
+        )
+        parser.add_argument(
+            "--canonicalize-aliases",
+            action="store_true",
+            default=None,
+            help="Remove provider aliases (e.g. f.oo+tag@gmail.com -> foo@gmail.com)",
+        )
+
+    def handle(self, *args, **options):
+        updated_count, merged_count = merge_duplicate_participants(
+            models.Participant,
+            models.ParticipantSpin,
+            models.ParticipantAward,
+            chunk_size=options["chunk_size"],
+            canonicalize_aliases=options["canonicalize_aliases"],
+            log=self.stdout.write,
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done: {updated_count} emails updated, "
+                f"{merged_count} participants merged"
+            )
+        )
@@ -0,0 +1,124 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from roulette import models
+from roulette.engines import AWARD_ENGINES
+from roulette.simulations import SIMULATION_DEFAULTS, simulate_roulette
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate the spins and awards of a roulette (Monte Carlo): awards and "
+        "cost per day, with its current awards and award engine or the given "
+        "configuration"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("slug", help="Roulette slug")
+        parser.add_argument(
+            "--participants",
+            type=int,
+            default=SIMULATION_DEFAULTS["participants"],
+            help="Audience size",
+        )
+        parser.add_argument(
+            "--days", type=int, default=SIMULATION_DEFAULTS["days"], help="Days"
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=SIMULATION_DEFAULTS["runs"],
+            help="Simulations (distributions)",
+        )
+        parser.add_argument(
+            "--visit-rate",
+            type=float,
+            default=SIMULATION_DEFAULTS["visit_rate"],
+            help="Probability of a participant spinning in each spin window",
+        )
+        parser.add_argument(
+            "--ad-rate",
+            type=float,
+            default=SIMULATION_DEFAULTS["ad_rate"],
+            help="Probability of a participant watching each ad (extra spin)",
+        )
+        parser.add_argument("--seed", type=int, help="Random seed")
+        parser.add_argument(
+            "--spins-space-hours",
+            type=float,
+            help="Spins space to try instead of the current one",
+        )
+        parser.add_argument(
+            "--spins-ads-limit",
+            type=int,
+            help="Extra spins (ads) limit to try instead of the current one",
+        )
+        parser.add_argument(
+            "--award-engine",
+            choices=list(AWARD_ENGINES),
+            help="Award engine to try instead of the current one",
+        )
+        parser.add_argument(
+            "--awards",
+            help=(
+                'Award changes to try (json), e.g. \'[{"id": 1, "stock": 10}, '
+                '{"min_spins": 50, "cost": 5}]\': new awards without id, '
+                '"active": false removes an award'
+            ),
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the results as json"
+        )
+
+    def handle(self, *args, **options):
+        roulette = models.Roulette.objects.filter(slug=options["slug"]).first()
+        if not roulette:
+            raise CommandError(f"Roulette not found: {options['slug']}")
+
+        overrides = {
+            name: options[name]
+            for name in ["spins_space_hours", "spins_ads_limit", "award_engine"]
+            if options[name] is not None
+        }
+        if options["awards"]:
+            try:
+                overrides["awards"] = json.loads(options["awards"])
+            except ValueError:
+                raise CommandError("Invalid awards json")
+
+        try:
+            results = simulate_roulette(
+                roulette,
+                participants=options["participants"],
+                days=options["days"],
+                runs=options["runs"],
+                visit_rate=options["visit_rate"],
+                ad_rate=options["ad_rate"],
+                seed=options["seed"],
+                overrides=overrides,
+            )
+        except ValueError as error:
+            raise CommandError(str(error))
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for name in ["spins_per_day", "awards_per_day", "cost_per_day", "total_cost"]:
+            values = results[name]
+            self.stdout.write(
+                f"{name}: mean {values['mean']}, p5 {values['p5']}, "
+                f"p50 {values['p50']}, p95 {values['p95']}"
+            )
+        for award in results["awards"]:
+            self.stdout.write(
+                f"{award['name']}: {award['wins']['mean']} wins "
+                f"(p95 {award['wins']['p95']})"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done: {results['runs']} runs of {results['days']} days in "
+                f"{results['total_ms']} ms (award rate {results['award_rate']})"
+            )
+        )
@@ -0,0 +1,43 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from roulette.caches import warm_caches
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-render the roulette payloads and email templates of the active "
+        "roulettes (run at deploy or when a server worker starts)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.WARM_CACHES_WORKERS,
+            help="Roulettes warmed in parallel",
+        )
+        parser.add_argument(
+            "--json", action="store_true", help="Print the timings as json"
+        )
+
+    def handle(self, *args, **options):
+        results = warm_caches(options["workers"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        for timings in results["roulettes"]:
+            self.stdout.write(
+                f"{timings['roulette']}: payload {timings['payload_ms']} ms"
+            )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done: {len(results['roulettes'])} roulettes warmed in "
+                f"{results['total_ms']} ms (connection {results['connection_ms']} ms, "
+                f"templates {results['templates_ms']} ms)"
+            )
+        )
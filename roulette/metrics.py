@@ -0,0 +1,19 @@
+from utils.metrics import Counter
+
+validations_total = Counter(
+    "roulette_validations_total",
+    "Participant validations by roulette and result",
+    ("roulette", "result"),
+)
+spins_total = Counter(
+    "roulette_spins_total", "Spins by roulette and type", ("roulette", "extra")
+)
+spin_rejections_total = Counter(
+    "roulette_spin_rejections_total", "Rejected spins by reason", ("reason",)
+)
+awards_total = Counter(
+    "roulette_awards_total", "Awards granted by roulette", ("roulette",)
+)
+roulette_views_total = Counter(
+    "roulette_views_total", "Roulette config retrieved by roulette", ("roulette",)
+)
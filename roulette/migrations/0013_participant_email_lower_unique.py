@@ -0,0 +1,93 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:21
+
+from django.db import migrations, models, transaction
+from django.db.models.functions import Lower
+import django.db.models.functions.text
+
+
+def merge_duplicate_participants(apps, schema_editor):
+    """Lowercase emails and merge case-insensitive duplicates into the
+    oldest participant (self-contained: later changes of the app code
+    don't change this migration)"""
+
+    Participant = apps.get_model("roulette", "Participant")
+    ParticipantSpin = apps.get_model("roulette", "ParticipantSpin")
+    ParticipantAward = apps.get_model("roulette", "ParticipantAward")
+
+    last_id = 0
+    while True:
+        chunk = list(
+            Participant.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "email")[:1000]
+        )
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+
+        for participant_id, email in chunk:
+            normalized_email = email.strip().lower()
+            participants = Participant.objects.annotate(
+                email_lower=Lower("email")
+            ).filter(email_lower=normalized_email)
+
+            # Merged into an older participant in this chunk
+            if not Participant.objects.filter(id=participant_id).exists():
+                continue
+
+            keeper_id = (
+                participants.filter(id__lt=participant_id)
+                .order_by("id")
+                .values_list("id", flat=True)
+                .first()
+            )
+            duplicate_ids = [participant_id]
+            if not keeper_id:
+                keeper_id = participant_id
+                duplicate_ids = list(
+                    participants.filter(id__gt=participant_id).values_list(
+                        "id", flat=True
+                    )
+                )
+
+            with transaction.atomic():
+                ParticipantSpin.objects.filter(participant_id__in=duplicate_ids).update(
+                    participant_id=keeper_id
+                )
+                ParticipantAward.objects.filter(
+                    participant_id__in=duplicate_ids
+                ).update(participant_id=keeper_id)
+                Participant.objects.filter(id__in=duplicate_ids).delete()
+                if keeper_id == participant_id and email != normalized_email:
+                    Participant.objects.filter(id=participant_id).update(
+                        email=normalized_email
+                    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roulette', '0012_roulette_google_ads_code'),
+    ]
+
+    operations = [
+        # Temporary index to find duplicates while merging
+        migrations.AddIndex(
+            model_name='participant',
+            index=models.Index(django.db.models.functions.text.Lower('email'), name='participant_email_lower_tmp'),
+        ),
+        migrations.RunPython(merge_duplicate_participants, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='participant',
+            name='email',
+            field=models.EmailField(help_text='Se guarda en minúsculas (único sin importar mayúsculas).', max_length=254, verbose_name='Email'),
+        ),
+        migrations.RemoveIndex(
+            model_name='participant',
+            name='participant_email_lower_tmp',
+        ),
+        migrations.AddConstraint(
+            model_name='participant',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='participant_email_lower_unique'),
+        ),
+    ]
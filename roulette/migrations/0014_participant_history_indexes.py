@@ -0,0 +1,21 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roulette', '0013_participant_email_lower_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='participantaward',
+            index=models.Index(fields=['participant', 'created_at', 'id'], name='award_participant_history_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='participantspin',
+            index=models.Index(fields=['participant', 'roulette', 'created_at', 'id'], name='spin_participant_history_idx'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 4.2.7 on 2026-10-19 11:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roulette', '0014_participant_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='award',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Versiones reducidas (webp/avif) generadas al subir la imagen.', verbose_name='Variantes de imagen'),
+        ),
+        migrations.AddField(
+            model_name='roulette',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, help_text='Versiones reducidas (webp/avif) generadas al subir las imágenes.', verbose_name='Variantes de imágenes'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roulette', '0015_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='award',
+            name='stock',
+            field=models.PositiveIntegerField(blank=True, help_text='Unidades disponibles del premio. Vacío: ilimitado.', null=True, verbose_name='Stock'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 4.2.7 on 2026-10-19 12:53
+
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roulette', '0016_award_stock'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='award',
+            name='probability',
+            field=models.FloatField(default=0, help_text='Probabilidad de ganar el premio en cada giro, de 0 a 1 (e.g. 0.05). Solo con el motor de premios por probabilidad.', validators=[django.core.validators.MinValueValidator(0), django.core.validators.MaxValueValidator(1)], verbose_name='Probabilidad'),
+        ),
+        migrations.AddField(
+            model_name='roulette',
+            name='award_engine',
+            field=models.CharField(choices=[('threshold', 'Mínimo de giros'), ('weighted', 'Probabilidad por premio')], default='threshold', help_text='Mínimo de giros: se gana el primer premio alcanzado por el contador de giros. Probabilidad por premio: cada giro gana un premio según su probabilidad.', max_length=20, verbose_name='Motor de premios'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.7 on 2026-10-19 13:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('roulette', '0017_award_engines'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='award',
+            name='cost',
+            field=models.DecimalField(decimal_places=2, default=0, help_text='Costo de cada unidad del premio (simulaciones de pagos).', max_digits=10, verbose_name='Costo'),
+        ),
+    ]
@@ -1,6 +1,10 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.text import slugify
 
+from utils.emails import normalize_email
+
 
 class Roulette(models.Model):
     # general
@@ -30,6 +34,18 @@ class Roulette(models.Model):
         verbose_name="Límite de giros (ads)",
         help_text="e.g. 2 (girar 2 veces extra, en base al Espacio entre giros)",
     )
+    award_engine = models.CharField(
+        max_length=20,
+        choices=[
+            ("threshold", "Mínimo de giros"),
+            ("weighted", "Probabilidad por premio"),
+        ],
+        default="threshold",
+        verbose_name="Motor de premios",
+        help_text="Mínimo de giros: se gana el primer premio alcanzado por el "
+        "contador de giros. Probabilidad por premio: cada giro gana un premio "
+        "según su probabilidad.",
+    )
     spins_counter = models.IntegerField(
         default=0,
         verbose_name="Contador de giros",
@@ -74,6 +90,14 @@ class Roulette(models.Model):
         max_length=7, verbose_name="Color 4", help_text="Hex color code, e.g., #FFFFFF"
     )
 
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name="Variantes de imágenes",
+        help_text="Versiones reducidas (webp/avif) generadas al subir las imágenes.",
+    )
+
     # dates
     created_at = models.DateTimeField(
         auto_now_add=True, verbose_name="Fecha de creación"
@@ -82,6 +106,9 @@ class Roulette(models.Model):
         auto_now=True, verbose_name="Fecha de actualización"
     )
 
+    # Images with responsive variants
+    image_variant_fields = ["logo", "bg_image", "wrong_icon"]
+
     class Meta:
         verbose_name = "Ruleta"
         verbose_name_plural = "Rouletas"
@@ -108,12 +135,39 @@ class Award(models.Model):
         verbose_name="Mínimo de giros",
         help_text="Mínimo de giros requeridos para ser elegible para este premio.",
     )
+    probability = models.FloatField(
+        default=0,
+        validators=[MinValueValidator(0), MaxValueValidator(1)],
+        verbose_name="Probabilidad",
+        help_text="Probabilidad de ganar el premio en cada giro, de 0 a 1 "
+        "(e.g. 0.05). Solo con el motor de premios por probabilidad.",
+    )
     image = models.ImageField(upload_to="awards/", verbose_name="Imagen del premio")
+    cost = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        default=0,
+        verbose_name="Costo",
+        help_text="Costo de cada unidad del premio (simulaciones de pagos).",
+    )
+    stock = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        verbose_name="Stock",
+        help_text="Unidades disponibles del premio. Vacío: ilimitado.",
+    )
     active = models.BooleanField(
         default=True,
         verbose_name="Activo",
         help_text="Si está activo, el premio se mostrará en la ruleta.",
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name="Variantes de imagen",
+        help_text="Versiones reducidas (webp/avif) generadas al subir la imagen.",
+    )
 
     # dates
     created_at = models.DateTimeField(
@@ -123,6 +177,9 @@ class Award(models.Model):
         auto_now=True, verbose_name="Fecha de actualización"
     )
 
+    # Images with responsive variants
+    image_variant_fields = ["image"]
+
     class Meta:
         verbose_name = "Premio"
         verbose_name_plural = "Premios"
@@ -131,12 +188,22 @@ class Award(models.Model):
         return f"{self.name} ({self.roulette.name})"
 
 
+class ParticipantQuerySet(models.QuerySet):
+
+    def filter_email(self, email: str):
+        """Filter participants by normalized email (case insensitive, backed
+        by the functional unique index)"""
+        return self.alias(email_lower=Lower("email")).filter(
+            email_lower=normalize_email(email)
+        )
+
+
 class Participant(models.Model):
     id = models.AutoField(primary_key=True, verbose_name="ID")
     name = models.CharField(max_length=255, verbose_name="Nombre")
     email = models.EmailField(
-        unique=True,
         verbose_name="Email",
+        help_text="Se guarda en minúsculas (único sin importar mayúsculas).",
     )
 
     # dates
@@ -147,13 +214,27 @@ class Participant(models.Model):
         auto_now=True, verbose_name="Fecha de actualización"
     )
 
+    objects = ParticipantQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Participante"
         verbose_name_plural = "Participantes"
+        constraints = [
+            models.UniqueConstraint(
+                Lower("email"), name="participant_email_lower_unique"
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.email})"
 
+    def save(self, *args, **kwargs):
+        # Store normalized email (participant identity)
+        self.email = normalize_email(self.email)
+
+        # Save the model
+        super().save(*args, **kwargs)
+
 
 class ParticipantSpin(models.Model):
     id = models.AutoField(primary_key=True, verbose_name="ID")
@@ -178,14 +259,27 @@ class ParticipantSpin(models.Model):
     class Meta:
         verbose_name = "Giro de Participante"
         verbose_name_plural = "Giros de Participantes"
+        indexes = [
+            # Participant history (keyset) and last spin lookups
+            models.Index(
+                fields=["participant", "roulette", "created_at", "id"],
+                name="spin_participant_history_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.participant.name} ({self.created_at})"
     
     def save(self, *args, **kwargs):
-        # Increase spins counter
-        self.roulette.spins_counter += 1
-        self.roulette.save()
+        # Increase spins counter (atomic update, and in the loaded roulette)
+        Roulette.objects.filter(pk=self.roulette_id).update(
+            spins_counter=models.F("spins_counter") + 1
+        )
+        if "spins_counter" in self.roulette.get_deferred_fields():
+            # Not loaded (e.g. resolved roulettes): read the updated value
+            self.roulette.refresh_from_db(fields=["spins_counter"])
+        else:
+            self.roulette.spins_counter += 1
 
         # Save the model
         super().save(*args, **kwargs)
@@ -209,6 +303,13 @@ class ParticipantAward(models.Model):
     class Meta:
         verbose_name = "Premio de Participante"
         verbose_name_plural = "Premios de Participantes"
+        indexes = [
+            # Participant history (keyset)
+            models.Index(
+                fields=["participant", "created_at", "id"],
+                name="award_participant_history_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.participant.name} won {self.award.name}"
@@ -0,0 +1,123 @@
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from utils.emails import normalize_email
+
+
+def merge_participant(
+    participant_model, spin_model, award_model, duplicate_id: int, keeper_id: int
+):
+    """Move spins and awards of a duplicated participant and delete it
+
+    Args:
+        participant_model (Model): Participant model (or historical model)
+        spin_model (Model): ParticipantSpin model (or historical model)
+        award_model (Model): ParticipantAward model (or historical model)
+        duplicate_id (int): participant to remove
+        keeper_id (int): participant that keeps the data
+
+    Returns:
+        bool: if the duplicate was deleted (False if already merged)
+    """
+
+    with transaction.atomic():
+        spin_model.objects.filter(participant_id=duplicate_id).update(
+            participant_id=keeper_id
+        )
+        award_model.objects.filter(participant_id=duplicate_id).update(
+            participant_id=keeper_id
+        )
+        deleted_count, _ = participant_model.objects.filter(id=duplicate_id).delete()
+    return deleted_count > 0
+
+
+def merge_duplicate_participants(
+    participant_model,
+    spin_model,
+    award_model,
+    chunk_size: int = 1000,
+    canonicalize_aliases: bool = None,
+    log=None,
+) -> tuple[int, int]:
+    """Normalize participants emails and merge the duplicated ones
+
+    Participants are processed by id in chunks, so the oldest participant
+    of each email keeps the spins and awards of its duplicates.
+    Works with historical models (migrations) and with the current models.
+
+    Args:
+        participant_model (Model): Participant model (or historical model)
+        spin_model (Model): ParticipantSpin model (or historical model)
+        award_model (Model): ParticipantAward model (or historical model)
+        chunk_size (int): participants loaded per query
+        canonicalize_aliases (bool): remove provider aliases from emails.
+            Defaults to EMAIL_CANONICALIZE_ALIASES setting
+        log (callable): optional function to print progress messages
+
+    Returns:
+        tuple[int, int]: updated emails count, merged participants count
+    """
+
+    updated_count = 0
+    merged_count = 0
+    last_id = 0
+    while True:
+        chunk = list(
+            participant_model.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", "email")[:chunk_size]
+        )
+        if not chunk:
+            break
+        last_id = chunk[-1][0]
+
+        for participant_id, email in chunk:
+            normalized_email = normalize_email(email, canonicalize_aliases)
+            participants = participant_model.objects.annotate(
+                email_lower=Lower("email")
+            ).filter(email_lower=normalized_email)
+
+            # Older participant already normalized: merge into it
+            keeper_id = (
+                participants.filter(id__lt=participant_id)
+                .order_by("id")
+                .values_list("id", flat=True)
+                .first()
+            )
+            if keeper_id:
+                # Already merged if the keeper was processed in this chunk
+                merged_count += merge_participant(
+                    participant_model,
+                    spin_model,
+                    award_model,
+                    participant_id,
+                    keeper_id,
+                )
+                continue
+
+            # Newer participants with the same email: merge into current
+            duplicate_ids = participants.filter(id__gt=participant_id).values_list(
+                "id", flat=True
+            )
+            for duplicate_id in list(duplicate_ids):
+                merged_count += merge_participant(
+                    participant_model,
+                    spin_model,
+                    award_model,
+                    duplicate_id,
+                    participant_id,
+                )
+
+            if email != normalized_email:
+                participant_model.objects.filter(id=participant_id).update(
+                    email=normalized_email
+                )
+                updated_count += 1
+
+        if log:
+            log(
+                f"Processed participants until id {last_id}: "
+                f"{updated_count} updated, {merged_count} merged"
+            )
+
+    return updated_count, merged_count
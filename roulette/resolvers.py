@@ -0,0 +1,84 @@
+import threading
+from time import monotonic
+
+from django.conf import settings
+
+from roulette import models
+
+# Roulette fields used by the participant rules (no texts, images or
+# spins counter, which is loaded when accessed), in model order (from_db)
+ROULETTE_RULE_FIELDS = (
+    "id",
+    "name",
+    "slug",
+    "spins_space_hours",
+    "spins_ads_limit",
+    "award_engine",
+)
+
+
+class RouletteResolver:
+    """Resolve roulette slugs with a small per-process cache
+
+    Rule fields are cached for ROULETTE_RESOLVER_SECONDS and each call
+    returns a new instance (requests don't share mutable objects). The
+    cache of the current process is cleared when a roulette changes.
+    """
+
+    def __init__(self):
+        self.items = {}
+        self.lock = threading.Lock()
+
+    def get_values(self, slug: str) -> tuple:
+        now = monotonic()
+        item = self.items.get(slug)
+        if item and item[0] > now:
+            return item[1]
+
+        values = (
+            models.Roulette.objects.filter(slug=slug)
+            .values_list(*ROULETTE_RULE_FIELDS)
+            .first()
+        )
+        if values is None:
+            return None
+        with self.lock:
+            # Drop the oldest roulette when full
+            if len(self.items) >= settings.ROULETTE_RESOLVER_SIZE:
+                self.items.pop(next(iter(self.items)), None)
+            self.items[slug] = (now + settings.ROULETTE_RESOLVER_SECONDS, values)
+        return values
+
+    def resolve(self, slug: str) -> models.Roulette:
+        """Return the roulette (rule fields only), None if not found"""
+        values = self.get_values(slug)
+        if values is None:
+            return None
+        return models.Roulette.from_db("default", ROULETTE_RULE_FIELDS, values)
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
+roulette_resolver = RouletteResolver()
+
+
+def resolve_roulette(slug: str, memo: dict = None) -> models.Roulette:
+    """Return the roulette of the slug, None if not found
+
+    Args:
+        slug (str): roulette slug
+        memo (dict): roulettes already resolved in the request, by slug
+            (e.g. serializer context "roulettes"), updated
+
+    Returns:
+        Roulette: roulette with its rule fields loaded
+    """
+
+    if memo is not None and slug in memo:
+        return memo[slug]
+    roulette = roulette_resolver.resolve(slug)
+    if memo is not None and roulette is not None:
+        memo[slug] = roulette
+    return roulette
@@ -1,88 +1,129 @@
 from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 
 from rest_framework import serializers
 from rest_framework.fields import SerializerMethodField
 
-from roulette import models
+from roulette import history, models
+from roulette.awards import IN_STOCK, take_award
+from roulette.engines import get_award_engine
+from roulette.resolvers import resolve_roulette
+from utils.emails import normalize_email
+from utils.images import get_srcset
+from utils.serializers import MediaUrlModelSerializer
 
 
-class AwardSerializer(serializers.ModelSerializer):
+class ImageVariantsSerializerMixin(serializers.Serializer):
+    """Add "srcset": responsive variants of the images, by field and format"""
+
+    srcset = SerializerMethodField()
+
+    def get_srcset(self, obj):
+        return get_srcset(
+            obj.image_variants,
+            obj._meta.get_field(obj.image_variant_fields[0]).storage,
+        )
+
+
+class AwardSerializer(ImageVariantsSerializerMixin, MediaUrlModelSerializer):
     class Meta:
         model = models.Award
-        fields = ["id", "name", "description", "image"]
+        fields = ["id", "name", "description", "image", "srcset"]
 
 
-class RouletteSerializer(serializers.ModelSerializer):
+class RouletteSerializer(ImageVariantsSerializerMixin, MediaUrlModelSerializer):
 
     awards = SerializerMethodField()
 
     class Meta:
         model = models.Roulette
-        fields = "__all__"
+        exclude = ["image_variants"]
 
     def get_awards(self, obj):
-        # return only active awards
-        active_awards = obj.awards.filter(active=True)
+        # return only active awards (prefetched in views)
+        active_awards = getattr(obj, "active_awards", None)
+        if active_awards is None:
+            active_awards = obj.awards.filter(IN_STOCK, active=True)
         return AwardSerializer(active_awards, many=True).data
 
 
+class RouletteSlugField(serializers.SlugRelatedField):
+    """Roulette by slug, from the resolver cache and memoized in the
+    serializer context ("roulettes"), shared with nested serializers"""
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault("queryset", models.Roulette.objects.all())
+        super().__init__(slug_field="slug", **kwargs)
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail("invalid")
+        roulette = resolve_roulette(data, self.context.setdefault("roulettes", {}))
+        if roulette is None:
+            self.fail("does_not_exist", slug_name=self.slug_field, value=data)
+        return roulette
+
+
 class ParticipantValidateSerializer(serializers.Serializer):
     email = serializers.EmailField()
     name = serializers.CharField()
-    roulette = serializers.SlugRelatedField(
-        queryset=models.Roulette.objects.all(), slug_field="slug"
-    )
+    roulette = RouletteSlugField()
+
+    def validate_email(self, value):
+        return normalize_email(value)
 
     def validate(self, data):
         """Validate if participant can spin and return response data"""
 
+        roulette = data["roulette"]
+        now = timezone.now()
+
         # Default response
         data["can_spin"] = True
         data["can_spin_ads"] = True
+        data["next_spin_at"] = None
+        data["extra_spins_remaining"] = roulette.spins_ads_limit
+        data["server_time"] = now
 
         # Participant logic
-        participants = models.Participant.objects.filter(email=data["email"])
-        if participants.exists():
-            participant = participants.first()
-            data["participant"] = participant  # pass to create()
-            participant_spins = models.ParticipantSpin.objects.filter(
-                participant=participant, roulette=data["roulette"]
-            ).order_by("-created_at")
-
-            # Allow to spin if not have any spin
-            if not participant_spins.exists():
-                return data
-
-            roulette = data["roulette"]
-
-            # Regular spin limit
-            last_regular_spin = participant_spins.filter(is_extra_spin=False).order_by(
-                "-created_at"
-            )
-
-            if not last_regular_spin.exists():
-                print("no last regular spin")
-                return data
-            
-            # Get last regular spin
-            last_regular_spin = last_regular_spin.first()
+        participant = models.Participant.objects.filter_email(data["email"]).first()
+        if not participant:
+            return data
+        data["participant"] = participant  # pass to create()
+
+        # Allow to spin if not have any regular spin
+        participant_spins = models.ParticipantSpin.objects.filter(
+            participant=participant, roulette=roulette
+        )
+        last_regular_spin = (
+            participant_spins.filter(is_extra_spin=False)
+            .order_by("-created_at")
+            .only("created_at")
+            .first()
+        )
+        if not last_regular_spin:
+            return data
 
-            # Calculate time to spin regular and check if if user can spin
-            time_to_spin_next = last_regular_spin.created_at + timedelta(
-                hours=roulette.spins_space_hours
+        # Calculate time to spin regular and check if if user can spin
+        time_to_spin_next = last_regular_spin.created_at + timedelta(
+            hours=roulette.spins_space_hours
+        )
+        if time_to_spin_next > now:
+            data["can_spin"] = False
+            data["next_spin_at"] = time_to_spin_next
+
+            # Calculate number of extra spins in space time
+            num_extra_spins_in_space_time = participant_spins.filter(
+                is_extra_spin=True,
+                created_at__gte=last_regular_spin.created_at,
+            ).count()
+            data["extra_spins_remaining"] = max(
+                roulette.spins_ads_limit - num_extra_spins_in_space_time, 0
             )
-            if time_to_spin_next > timezone.now():
-                data["can_spin"] = False
-                
-                # Calculate number of extra spins in space time
-                num_extra_spins_in_space_time = participant_spins.filter(
-                    is_extra_spin=True,
-                    created_at__gte=last_regular_spin.created_at,
-                ).count()
-                
-                if num_extra_spins_in_space_time >= roulette.spins_ads_limit:
-                    data["can_spin_ads"] = False
+            if data["extra_spins_remaining"] == 0:
+                data["can_spin_ads"] = False
 
         return data
 
@@ -110,9 +151,7 @@ class ParticipantValidateSerializer(serializers.Serializer):
 class ParticipantSpinSerializer(serializers.Serializer):
     email = serializers.EmailField()
     name = serializers.CharField()
-    roulette = serializers.SlugRelatedField(
-        queryset=models.Roulette.objects.all(), slug_field="slug"
-    )
+    roulette = RouletteSlugField()
     is_extra_spin = serializers.BooleanField()
 
     def validate(self, data):
@@ -127,7 +166,8 @@ class ParticipantSpinSerializer(serializers.Serializer):
                 "email": data["email"],
                 "name": data["name"],
                 "roulette": data["roulette"].slug,
-            }
+            },
+            context=self.context,
         )
         if not validate_serializer.is_valid():
             raise serializers.ValidationError(validate_serializer.errors)
@@ -141,39 +181,63 @@ class ParticipantSpinSerializer(serializers.Serializer):
         if not data["is_extra_spin"] and not validated_data["can_spin"]:
             raise serializers.ValidationError("You can't regular spin")
 
-        # Calculate if user win a award based in roulette data
-        roulette_total_spins = data["roulette"].spins_counter
-        roulette_awards = models.Award.objects.filter(
-            roulette=data["roulette"],
-            active=True,
-        )
-        for award in roulette_awards:
-            if roulette_total_spins >= award.min_spins:
-                data["award"] = award
-                break
+        # Calculate if user win a award with the roulette award engine
+        # (granted in create if in stock), current roulette awards
+        roulette = data["roulette"]
+        data["award_candidates"] = get_award_engine(roulette).get_candidates(roulette)
+        if data["award_candidates"]:
+            data["award"] = data["award_candidates"][0]
 
         return data
 
     def create(self, validated_data):
 
-        # Register spin in database
-        models.ParticipantSpin.objects.create(
-            participant=validated_data["participant"],
-            roulette=validated_data["roulette"],
-            is_extra_spin=validated_data["is_extra_spin"],
-        )
-
-        award = validated_data.get("award")
-        if award:
-            # Register award if user win
-            models.ParticipantAward.objects.create(
+        with transaction.atomic():
+            # Register spin in database
+            models.ParticipantSpin.objects.create(
                 participant=validated_data["participant"],
-                award=award,
+                roulette=validated_data["roulette"],
+                is_extra_spin=validated_data["is_extra_spin"],
+            )
+
+            # First reached award with stock left
+            award = next(
+                (
+                    award
+                    for award in validated_data["award_candidates"]
+                    if take_award(award)
+                ),
+                None,
             )
+            validated_data["award"] = award
+            if award:
+                # Register award if user win
+                models.ParticipantAward.objects.create(
+                    participant=validated_data["participant"],
+                    award=award,
+                )
 
-            # Reduce roulette spins counter
-            validated_data["roulette"].spins_counter -= award.min_spins
-            validated_data["roulette"].save()
+                roulette = validated_data["roulette"]
+                get_award_engine(roulette).award_granted(roulette, award)
 
         # Return validated data
         return validated_data
+
+
+class ParticipantHistorySerializer(serializers.Serializer):
+    email = serializers.EmailField()
+    roulette = RouletteSlugField()
+    cursor = serializers.CharField(required=False)
+    limit = serializers.IntegerField(
+        required=False, min_value=1, max_value=settings.HISTORY_MAX_PAGE_SIZE
+    )
+
+    def validate_email(self, value):
+        return normalize_email(value)
+
+    def validate_cursor(self, value):
+        try:
+            history.decode_cursor(value)
+        except ValueError:
+            raise serializers.ValidationError("Invalid cursor")
+        return value
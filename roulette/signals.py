@@ -0,0 +1,78 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from roulette import events, models, winners
+from roulette.resolvers import roulette_resolver
+from utils import images
+from utils.cache import invalidate_namespace
+
+
+def publish_config_changed(roulette: models.Roulette):
+    """Notify roulette clients to reload its config (after commit)"""
+    data = {"roulette": roulette.slug, "updated_at": roulette.updated_at.isoformat()}
+    transaction.on_commit(partial(events.publish_event, roulette.slug, "config", data))
+
+
+def schedule_image_variants(instance):
+    """Generate the variants of changed images (after commit)"""
+
+    image_variants = instance.image_variants or {}
+    for field_name in instance.image_variant_fields:
+        field_file = getattr(instance, field_name)
+        current = image_variants.get(field_name)
+        source = current["source"] if current else ""
+        if field_file.name != source:
+            transaction.on_commit(partial(images.schedule_image_variants, instance))
+            return
+
+
+@receiver(post_save, sender=models.Roulette)
+def roulette_saved(sender, instance, update_fields=None, **kwargs):
+    # Spins counter updates are not config changes
+    if update_fields and set(update_fields) <= {"spins_counter"}:
+        return
+    invalidate_namespace(models.Roulette)
+    roulette_resolver.clear()
+    schedule_image_variants(instance)
+    publish_config_changed(instance)
+
+
+@receiver(post_delete, sender=models.Roulette)
+def roulette_deleted(sender, instance, **kwargs):
+    invalidate_namespace(models.Roulette)
+    roulette_resolver.clear()
+
+
+@receiver(post_save, sender=models.Award)
+def award_saved(sender, instance, **kwargs):
+    invalidate_namespace(models.Award)
+    schedule_image_variants(instance)
+    publish_config_changed(instance.roulette)
+
+
+@receiver(post_delete, sender=models.Award)
+def award_deleted(sender, instance, **kwargs):
+    invalidate_namespace(models.Award)
+    publish_config_changed(instance.roulette)
+
+
+def publish_winner(slug: str, data: dict):
+    winners.clear_winners(slug)
+    events.publish_event(slug, "winner", data)
+
+
+@receiver(post_save, sender=models.ParticipantAward)
+def participant_award_created(sender, instance, created=False, **kwargs):
+    if not created:
+        return
+    data = winners.get_winner_data(instance)
+    transaction.on_commit(partial(publish_winner, instance.award.roulette.slug, data))
+
+
+@receiver(post_delete, sender=models.ParticipantAward)
+def participant_award_deleted(sender, instance, **kwargs):
+    slug = instance.award.roulette.slug
+    transaction.on_commit(partial(winners.clear_winners, slug))
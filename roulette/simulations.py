@@ -0,0 +1,476 @@
+import copy
+import math
+from time import perf_counter
+
+import numpy as np
+from django.core.exceptions import ValidationError
+
+from roulette import models
+from roulette.awards import get_award_ladder
+from roulette.engines import (
+    AWARD_ENGINES,
+    ThresholdEngine,
+    WeightedEngine,
+    get_award_engine,
+)
+
+# Default simulation parameters (command and admin page)
+SIMULATION_DEFAULTS = {
+    "participants": 10000,
+    "days": 30,
+    "runs": 100,
+    "visit_rate": 0.2,
+    "ad_rate": 0.3,
+}
+
+# Simulated spin windows (runs x windows) limit, to answer within seconds
+MAX_CELLS = 5_000_000
+
+# Roulette settings and award fields that can be overridden, to try
+# configurations before launching them
+ROULETTE_OVERRIDES = ("spins_space_hours", "spins_ads_limit", "award_engine")
+AWARD_OVERRIDES = ("name", "min_spins", "probability", "stock", "cost", "active")
+
+
+def summarize(values: np.ndarray) -> dict:
+    """Return the mean and percentiles (5, 50, 95) of the values"""
+
+    p5, p50, p95 = np.percentile(values, [5, 50, 95])
+    return {
+        "mean": round(float(np.mean(values)), 2),
+        "p5": round(float(p5), 2),
+        "p50": round(float(p50), 2),
+        "p95": round(float(p95), 2),
+    }
+
+
+def apply_overrides(
+    roulette: models.Roulette, awards: list[models.Award], overrides: dict
+) -> tuple[models.Roulette, list[models.Award]]:
+    """Return copies of the roulette and its award ladder with the given
+    configuration (nothing is saved)
+
+    Args:
+        roulette (Roulette): simulated roulette
+        awards (list[Award]): roulette award ladder
+        overrides (dict): roulette settings (ROULETTE_OVERRIDES) and
+            "awards": award fields (AWARD_OVERRIDES) by award, existing
+            awards by "id" ("active": false removes them) and new awards
+            without it, e.g. [{"id": 1, "stock": 10}, {"min_spins": 50}]
+
+    Returns:
+        tuple: (Roulette, list of Award), new awards at the end of the
+            ladder with negative ids
+
+    Raises:
+        ValueError: unknown setting, field or award, or invalid value
+    """
+
+    overrides = dict(overrides)
+    award_overrides = overrides.pop("awards", None) or []
+    if not isinstance(award_overrides, list) or not all(
+        isinstance(fields, dict) for fields in award_overrides
+    ):
+        raise ValueError("Award overrides must be a list of objects")
+    unknown = set(overrides) - set(ROULETTE_OVERRIDES)
+    if unknown:
+        raise ValueError(f"Unknown roulette settings: {', '.join(sorted(unknown))}")
+    award_engine = overrides.get("award_engine", roulette.award_engine)
+    if award_engine not in AWARD_ENGINES:
+        raise ValueError(f"Unknown award engine: {award_engine}")
+    roulette = copy.copy(roulette)
+    for name, value in overrides.items():
+        setattr(roulette, name, value)
+
+    ladder = {award.id: copy.copy(award) for award in awards}
+    for index, fields in enumerate(award_overrides, start=1):
+        fields = dict(fields)
+        award_id = fields.pop("id", None)
+        if award_id is None:
+            award_id = -index
+            ladder[award_id] = models.Award(
+                id=award_id, roulette=roulette, name=f"Premio {index}", min_spins=0
+            )
+        elif award_id not in ladder:
+            raise ValueError(f"Award not in the ladder: {award_id}")
+
+        unknown = set(fields) - set(AWARD_OVERRIDES)
+        if unknown:
+            raise ValueError(f"Unknown award fields: {', '.join(sorted(unknown))}")
+        for name, value in fields.items():
+            try:
+                # Form field bounds too (e.g. positive stock, not checked by
+                # the model field in every database)
+                field = models.Award._meta.get_field(name)
+                value = field.formfield().clean(field.clean(value, ladder[award_id]))
+            except ValidationError as error:
+                raise ValueError(f"Invalid award {name}: {value}") from error
+            setattr(ladder[award_id], name, value)
+
+    awards = [
+        award
+        for award in ladder.values()
+        if award.active and (award.stock is None or award.stock > 0)
+    ]
+    return roulette, awards
+
+
+def get_window_days(roulette: models.Roulette, days: int) -> np.ndarray:
+    """Return the day of each spin window of the roulette
+
+    Participants get a regular spin (and spins_ads_limit extra spins) per
+    window of spins_space_hours.
+
+    Raises:
+        ValueError: no spins space (unlimited regular spins, like the spin
+            rules), can't be simulated by window
+    """
+
+    hours = roulette.spins_space_hours
+    if hours <= 0:
+        raise ValueError(
+            "Roulettes without spins space (unlimited regular spins) can't be "
+            "simulated: override the spins space hours"
+        )
+    windows = math.ceil(days * 24 / hours)
+    return (np.arange(windows) * hours // 24).astype(np.int64)
+
+
+def simulate_spins(
+    rng: np.random.Generator,
+    roulette: models.Roulette,
+    participants: int,
+    windows: int,
+    runs: int,
+    visit_rate: float,
+    ad_rate: float,
+) -> np.ndarray:
+    """Return the roulette spins of each run and window
+
+    Participants are not simulated one by one: the ones spinning in a
+    window follow a binomial distribution (visit_rate), and so do their
+    extra spins (ad_rate of each of the spins_ads_limit ads).
+
+    Returns:
+        np.ndarray: spins, shape (runs, windows)
+    """
+
+    visitors = rng.binomial(participants, visit_rate, size=(runs, windows))
+    extra_spins = rng.binomial(visitors * roulette.spins_ads_limit, ad_rate)
+    return visitors + extra_spins
+
+
+def get_threshold_segment(
+    engine: ThresholdEngine,
+    state: models.Roulette,
+    ladder: list[models.Award],
+    indexes: dict,
+    stock: np.ndarray,
+    spin: int,
+    max_spins: int,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, bool]:
+    """Return the wins of the threshold engine with a fixed ladder (the
+    awards in stock), from state.spins_counter after the given spin, until
+    an award runs out or max_spins
+
+    Each iteration asks the engine for the next win and computes the run of
+    wins of the same award that follows in closed form (consecutive spins,
+    counter moved by 1 - min_spins each), so the cost doesn't grow with the
+    number of wins. A counter repeated at the start of an iteration is a
+    cycle: its wins are repeated with numpy strides.
+
+    Args:
+        stock (np.ndarray): units left by award index (inf: unlimited)
+
+    Returns:
+        tuple: spin numbers, award indexes and counters after each win, and
+            if the last win took the last unit of an award
+    """
+
+    counter = state.spins_counter
+    positions = {award.id: position for position, award in enumerate(ladder)}
+    min_spins = min(award.min_spins for award in ladder)
+    won = np.zeros(len(stock))
+    spins, winners, counters = [], [], []
+    wins_count = 0
+    seen = {}
+    while True:
+        # Cycle: same counter as a previous iteration, repeat its wins
+        if counter in seen:
+            start, start_spin = seen[counter]
+            cycle_spins, cycle_winners, cycle_counters = (
+                np.concatenate(values)[start:] for values in (spins, winners, counters)
+            )
+            period = spin - start_spin
+
+            # Repeats up to max_spins or the first award out of stock
+            limit = int(np.maximum((max_spins - cycle_spins) // period, 0).sum())
+            exhausted = False
+            for index in np.unique(cycle_winners):
+                left = stock[index] - won[index]
+                if math.isinf(left):
+                    continue
+                award_wins = np.flatnonzero(cycle_winners == index)
+                repeat, position = divmod(int(left) - 1, len(award_wins))
+                award_limit = repeat * len(cycle_winners) + award_wins[position] + 1
+                if award_limit <= limit:
+                    limit, exhausted = award_limit, True
+
+            repeat, position = np.divmod(np.arange(limit), len(cycle_winners))
+            spins.append(cycle_spins[position] + (repeat + 1) * period)
+            winners.append(cycle_winners[position])
+            counters.append(cycle_counters[position])
+            break
+        seen[counter] = (wins_count, spin)
+
+        # Spins until an award is reached, first candidate granted
+        wait = max(min_spins - counter, 0)
+        if spin + wait >= max_spins:
+            exhausted = False
+            break
+        state.spins_counter = counter + wait
+        award = engine.get_candidates(state, ladder)[0]
+        index = indexes[award.id]
+        counter += wait
+        spin += wait
+
+        # Same award won while it's the first one reached: counter down to
+        # its min_spins, or up to the min_spins of a previous award
+        step = 1 - award.min_spins
+        previous = [other.min_spins for other in ladder[: positions[award.id]]]
+        if step < 0:
+            run = (counter - award.min_spins) // -step + 1
+        elif step > 0 and previous:
+            run = (min(previous) - counter + step - 1) // step
+        else:
+            run = math.inf
+        run = int(min(run, stock[index] - won[index], max_spins - spin))
+
+        offsets = np.arange(1, run + 1)
+        spins.append(spin + offsets)
+        winners.append(np.full(run, index))
+        counters.append(counter + step * offsets)
+        wins_count += run
+        spin += run
+        counter += step * run
+        won[index] += run
+        if won[index] >= stock[index] or spin >= max_spins:
+            exhausted = won[index] >= stock[index]
+            break
+
+    if not spins:
+        empty = np.zeros(0, dtype=np.int64)
+        return empty, empty, empty, False
+    spins, winners, counters = (
+        np.concatenate(values) for values in (spins, winners, counters)
+    )
+    return spins, winners, counters, exhausted
+
+
+def get_threshold_schedule(
+    engine: ThresholdEngine,
+    roulette: models.Roulette,
+    awards: list[models.Award],
+    max_spins: int,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Return the spin numbers (1 based) and award indexes of the wins of
+    the threshold engine, up to max_spins spins
+
+    The spins counter is deterministic, so the wins are computed once for
+    all runs, by segments of the same ladder: a new segment starts when an
+    award runs out of stock (see get_threshold_segment).
+    """
+
+    stock = np.array(
+        [math.inf if award.stock is None else award.stock for award in awards],
+        dtype=float,
+    )
+    indexes = {award.id: index for index, award in enumerate(awards)}
+    state = models.Roulette(id=roulette.id, spins_counter=roulette.spins_counter)
+
+    spins, winners = [], []
+    spin = 0
+    while spin < max_spins:
+        ladder = [award for index, award in enumerate(awards) if stock[index] > 0]
+        if not ladder:
+            break
+
+        segment_spins, segment_winners, counters, exhausted = get_threshold_segment(
+            engine, state, ladder, indexes, stock, spin, max_spins
+        )
+        spins.append(segment_spins)
+        winners.append(segment_winners)
+        stock -= np.bincount(segment_winners, minlength=len(awards))
+        if not exhausted:
+            break
+        spin = int(segment_spins[-1])
+        state.spins_counter = int(counters[-1])
+
+    if not spins:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.concatenate(spins), np.concatenate(winners)
+
+
+def simulate_threshold(
+    engine: ThresholdEngine,
+    roulette: models.Roulette,
+    awards: list[models.Award],
+    spins_by_day: np.ndarray,
+) -> np.ndarray:
+    """Return the awards won by day of each run, threshold engine
+
+    Returns:
+        np.ndarray: wins, shape (runs, days, awards)
+    """
+
+    total_spins = np.cumsum(spins_by_day, axis=1)
+    spins, winners = get_threshold_schedule(
+        engine, roulette, awards, int(total_spins.max(initial=0))
+    )
+
+    wins = np.zeros((*spins_by_day.shape, len(awards)), dtype=np.int64)
+    for index in range(len(awards)):
+        award_wins = np.searchsorted(spins[winners == index], total_spins, "right")
+        wins[..., index] = np.diff(award_wins, axis=1, prepend=0)
+    return wins
+
+
+def simulate_weighted(
+    rng: np.random.Generator,
+    engine: WeightedEngine,
+    awards: list[models.Award],
+    spins_by_day: np.ndarray,
+) -> np.ndarray:
+    """Return the awards won by day of each run, weighted engine
+
+    Spins outcomes are drawn by day (multinomial) with the engine weights.
+    Awards out of stock stop being won (the other outcomes are not
+    normalized again in the rest of the day).
+
+    Returns:
+        np.ndarray: wins, shape (runs, days, awards)
+    """
+
+    wins = np.zeros((*spins_by_day.shape, len(awards)), dtype=np.int64)
+    outcomes, weights = engine.get_outcomes(awards)
+    if not outcomes:
+        return wins
+
+    weights = np.asarray(weights) / math.fsum(weights)
+    draws = rng.multinomial(spins_by_day, weights)
+    for column, award in enumerate(outcomes):
+        if award is None:
+            continue
+        index = awards.index(award)
+        award_wins = np.cumsum(draws[..., column], axis=1)
+        if award.stock is not None:
+            award_wins = np.minimum(award_wins, award.stock)
+        wins[..., index] = np.diff(award_wins, axis=1, prepend=0)
+    return wins
+
+
+def simulate_roulette(
+    roulette: models.Roulette,
+    participants: int = SIMULATION_DEFAULTS["participants"],
+    days: int = SIMULATION_DEFAULTS["days"],
+    runs: int = SIMULATION_DEFAULTS["runs"],
+    visit_rate: float = SIMULATION_DEFAULTS["visit_rate"],
+    ad_rate: float = SIMULATION_DEFAULTS["ad_rate"],
+    seed: int = None,
+    overrides: dict = None,
+) -> dict:
+    """Simulate the roulette spins and awards (Monte Carlo, vectorized)
+
+    Uses the roulette configuration, award engine and award ladder (active
+    awards in stock, current spins counter), like the live spin path, with
+    the given overrides.
+
+    Args:
+        roulette (Roulette): roulette to simulate
+        participants (int): audience size
+        days (int): simulated days
+        runs (int): simulations, for the distributions
+        visit_rate (float): probability of a participant spinning in each
+            spin window (spins_space_hours)
+        ad_rate (float): probability of a participant watching each ad
+            (extra spin) after spinning
+        seed (int): random generator seed (reproducible results)
+        overrides (dict): roulette settings and awards to try instead of
+            the current ones (see apply_overrides)
+
+    Returns:
+        dict: distributions (mean and percentiles) of spins, awards and
+            cost by day, total cost and wins by award
+
+    Raises:
+        ValueError: simulation too large (runs x spin windows), roulette
+            without spins space or invalid overrides
+    """
+
+    start = perf_counter()
+    awards = get_award_ladder(roulette)
+    if overrides:
+        roulette, awards = apply_overrides(roulette, awards, overrides)
+    window_days = get_window_days(roulette, days)
+    if runs * len(window_days) > MAX_CELLS:
+        raise ValueError(
+            f"Simulation too large: {runs} runs x {len(window_days)} spin windows "
+            f"(max {MAX_CELLS})"
+        )
+
+    rng = np.random.default_rng(seed)
+    spins = simulate_spins(
+        rng, roulette, participants, len(window_days), runs, visit_rate, ad_rate
+    )
+
+    # Spins by day: cumulative spins of the last window of each day
+    day_ends = np.searchsorted(window_days, np.arange(1, days + 1)) - 1
+    spins_by_day = np.diff(
+        np.cumsum(spins, axis=1)[:, day_ends], axis=1, prepend=0
+    )
+
+    engine = get_award_engine(roulette)
+    if isinstance(engine, WeightedEngine):
+        wins = simulate_weighted(rng, engine, awards, spins_by_day)
+    else:
+        wins = simulate_threshold(engine, roulette, awards, spins_by_day)
+
+    costs = np.array([float(award.cost) for award in awards])
+    awards_by_day = wins.sum(axis=2)
+    cost_by_day = wins @ costs
+    award_wins = wins.sum(axis=1)
+
+    return {
+        "roulette": roulette.slug,
+        "award_engine": roulette.award_engine,
+        "spins_space_hours": roulette.spins_space_hours,
+        "spins_ads_limit": roulette.spins_ads_limit,
+        "participants": participants,
+        "days": days,
+        "runs": runs,
+        "spins_per_day": summarize(spins_by_day),
+        "awards_per_day": summarize(awards_by_day),
+        "cost_per_day": summarize(cost_by_day),
+        "total_cost": summarize(cost_by_day.sum(axis=1)),
+        "award_rate": round(
+            float(awards_by_day.sum() / max(spins_by_day.sum(), 1)), 6
+        ),
+        "awards": [
+            {
+                "id": award.id,
+                "name": award.name,
+                "min_spins": award.min_spins,
+                "probability": award.probability,
+                "stock": award.stock,
+                "cost": float(award.cost),
+                "wins": summarize(award_wins[:, index]),
+                "sold_out_rate": (
+                    None
+                    if award.stock is None
+                    else round(float(np.mean(award_wins[:, index] >= award.stock)), 4)
+                ),
+            }
+            for index, award in enumerate(awards)
+        ],
+        "total_ms": round((perf_counter() - start) * 1000, 2),
+    }
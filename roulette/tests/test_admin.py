@@ -1,4 +1,12 @@
+from botocore.stub import Stubber
+from django.contrib import admin
+from django.core.cache import cache
+from django.test import override_settings
+from model_bakery import baker
+
 from core.tests_base.test_admin import TestAdminBase
+from project.storage_backends import PublicMediaStorage
+from roulette import models
 
 
 class RouletteAdminTestCase(TestAdminBase):
@@ -13,6 +21,68 @@ class RouletteAdminTestCase(TestAdminBase):
 
         self.submit_search_bar(self.endpoint)
 
+    def test_export_action(self):
+        """Validate export action streams selected roulettes data"""
+
+        roulette = baker.make(models.Roulette)
+        spins = baker.make(models.ParticipantSpin, roulette=roulette, _quantity=3)
+        baker.make(models.ParticipantSpin)
+
+        response = self.client.post(
+            self.endpoint,
+            {"action": "export_spins_csv", "_selected_action": [roulette.id]},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment;", response["Content-Disposition"])
+
+        # Header and one row per roulette spin
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), len(spins) + 1)
+        self.assertTrue(lines[0].startswith("id,roulette__slug"))
+
+    def test_simulation_page(self):
+        """Validate payout simulation page (form, results and configuration
+        to try)"""
+
+        roulette = baker.make(models.Roulette, spins_space_hours=0)
+        award = baker.make(models.Award, roulette=roulette, min_spins=10)
+        endpoint = f"{self.endpoint}{roulette.id}/simulation/"
+        params = {
+            "participants": 1000,
+            "days": 7,
+            "runs": 10,
+            "visit_rate": 0.5,
+            "ad_rate": 0.2,
+        }
+
+        response = self.client.get(f"{self.endpoint}{roulette.id}/change/")
+        self.assertContains(response, endpoint)
+
+        response = self.client.get(endpoint)
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context["results"])
+
+        # Unlimited regular spins: spins space required
+        response = self.client.get(endpoint, params)
+        self.assertIsNone(response.context["results"])
+        self.assertContains(response, "unlimited regular spins")
+
+        response = self.client.get(
+            endpoint,
+            {
+                **params,
+                "spins_space_hours": 24,
+                "awards": f'[{{"id": {award.id}, "stock": 3}}, {{"min_spins": 50}}]',
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Premios por día")
+        results = response.context["results"]
+        self.assertEqual(results["days"], 7)
+        self.assertEqual(results["spins_space_hours"], 24)
+        self.assertEqual([item["stock"] for item in results["awards"]], [3, None])
+
 
 class AwardAdminTestCase(TestAdminBase):
     """Testing award admin"""
@@ -26,6 +96,15 @@ class AwardAdminTestCase(TestAdminBase):
 
         self.submit_search_bar(self.endpoint)
 
+    def test_list_fixed_queries(self):
+        """Validate no extra queries per row (roulette name in list)"""
+
+        baker.make(models.Award, _quantity=2)
+        queries_count = self.get_queries_count(self.endpoint)
+
+        baker.make(models.Award, _quantity=10)
+        self.assertEqual(self.get_queries_count(self.endpoint), queries_count)
+
 
 class ParticipantAdminTestCase(TestAdminBase):
     """Testing participant admin"""
@@ -33,12 +112,47 @@ class ParticipantAdminTestCase(TestAdminBase):
     def setUp(self):
         super().setUp()
         self.endpoint = "/admin/roulette/participant/"
+        cache.clear()
 
     def test_search_bar(self):
         """Validate search bar working"""
 
         self.submit_search_bar(self.endpoint)
 
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=3)
+    def test_count_cached_above_limit(self):
+        """Validate results count is cached when above the exact limit"""
+
+        baker.make(models.Participant, _quantity=5)
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.context["cl"].result_count, 5)
+
+        # Cached count in next requests
+        baker.make(models.Participant, _quantity=2)
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.context["cl"].result_count, 5)
+
+    @override_settings(ADMIN_EXACT_COUNT_LIMIT=3)
+    def test_count_exact_below_limit(self):
+        """Validate results count is exact when below the exact limit"""
+
+        baker.make(models.Participant, _quantity=2)
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.context["cl"].result_count, 2)
+
+        baker.make(models.Participant, _quantity=1)
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.context["cl"].result_count, 3)
+
+    def test_no_full_result_count(self):
+        """Validate unfiltered count is not calculated when searching"""
+
+        baker.make(models.Participant, name="test participant")
+        baker.make(models.Participant, name="other participant")
+        response = self.client.get(self.endpoint, {"q": "test"})
+        self.assertEqual(response.context["cl"].result_count, 1)
+        self.assertIsNone(response.context["cl"].full_result_count)
+
 
 class ParticipantSpinAdminTestCase(TestAdminBase):
     """Testing participant spin admin"""
@@ -52,6 +166,62 @@ class ParticipantSpinAdminTestCase(TestAdminBase):
 
         self.submit_search_bar(self.endpoint)
 
+    def test_list_fixed_queries(self):
+        """Validate no extra queries per row (participant and roulette in list)"""
+
+        baker.make(models.ParticipantSpin, _quantity=2)
+        queries_count = self.get_queries_count(self.endpoint)
+
+        baker.make(models.ParticipantSpin, _quantity=10)
+        self.assertEqual(self.get_queries_count(self.endpoint), queries_count)
+
+    def test_participant_filter_no_full_list(self):
+        """Validate participant filter only renders the selected participant"""
+
+        participants = baker.make(models.Participant, _quantity=3)
+        for participant in participants:
+            baker.make(models.ParticipantSpin, participant=participant)
+
+        # No participants listed in filter without selection
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "autocomplete-filter")
+        self.assertNotContains(response, 'data-name="participant__id__exact"')
+
+        # Only selected participant listed in filter
+        selected = participants[0]
+        response = self.client.get(
+            self.endpoint, {"participant__id__exact": selected.id}
+        )
+        self.assertEqual(self.get_results_count(response), 1)
+        self.assertContains(
+            response, f'data-name="participant__id__exact" value="{selected.id}"'
+        )
+        for participant in participants[1:]:
+            self.assertNotContains(
+                response,
+                f'data-name="participant__id__exact" value="{participant.id}"',
+            )
+
+    def test_participant_autocomplete(self):
+        """Validate participant filter search endpoint"""
+
+        participant = baker.make(models.Participant, name="Autocomplete Test")
+        response = self.client.get(
+            "/admin/autocomplete/",
+            {
+                "app_label": "roulette",
+                "model_name": "participantspin",
+                "field_name": "participant",
+                "term": "Autocomplete",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+        self.assertEqual(
+            results, [{"id": str(participant.id), "text": str(participant)}]
+        )
+
 
 class ParticipantAwardAdminTestCase(TestAdminBase):
     """Testing participant award admin"""
@@ -64,3 +234,130 @@ class ParticipantAwardAdminTestCase(TestAdminBase):
         """Validate search bar working"""
 
         self.submit_search_bar(self.endpoint)
+
+    def test_list_fixed_queries(self):
+        """Validate no extra queries per row (participant and award in list)"""
+
+        baker.make(models.ParticipantAward, _quantity=2)
+        queries_count = self.get_queries_count(self.endpoint)
+
+        baker.make(models.ParticipantAward, _quantity=10)
+        self.assertEqual(self.get_queries_count(self.endpoint), queries_count)
+
+
+class DirectUploadTestCase(TestAdminBase):
+    """Test award images uploaded from the browser to s3 (presigned post)"""
+
+    def setUp(self):
+        super().setUp()
+
+        # Award images in a test s3 bucket (no requests: stubbed client)
+        self.storage = PublicMediaStorage(
+            bucket_name="test-bucket",
+            access_key="test",
+            secret_key="test",
+            region_name="us-east-1",
+        )
+        image_field = models.Award._meta.get_field("image")
+        self.addCleanup(setattr, image_field, "storage", image_field.storage)
+        image_field.storage = self.storage
+
+        settings = self.settings(DIRECT_UPLOADS=True)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+        self.endpoint = "/admin/uploads/presign/"
+        self.roulette = baker.make(models.Roulette)
+
+    def get_award_form(self, image_key: str):
+        model_admin = admin.site._registry[models.Award]
+        request = self.client.get("/admin/").wsgi_request
+        form_class = model_admin.get_form(request)
+        return form_class(
+            data={
+                "roulette": self.roulette.id,
+                "name": "Cup",
+                "description": "",
+                "min_spins": 10,
+                "probability": 0,
+                "cost": 0,
+                "active": True,
+                "image_key": image_key,
+            }
+        )
+
+    def test_presign_upload(self):
+        """Validate presigned post with unique key under the field folder"""
+
+        response = self.client.post(
+            self.endpoint,
+            {
+                "field": "roulette.award.image",
+                "filename": "Cup.PNG",
+                "content_type": "image/png",
+            },
+        )
+        self.assertEqual(response.status_code, 200)
+        post = response.json()
+        self.assertRegex(post["name"], r"^awards/uploads/[0-9a-f]{32}\.png$")
+        self.assertIn("test-bucket", post["url"])
+        self.assertEqual(post["fields"]["key"], f"media/{post['name']}")
+        self.assertEqual(post["fields"]["Content-Type"], "image/png")
+        self.assertIn("policy", post["fields"])
+
+    def test_presign_invalid_data(self):
+        """Validate presign errors: invalid field, no s3 field, not image"""
+
+        data = {"field": "roulette.award.image", "content_type": "text/plain"}
+        invalid_fields = [
+            "roulette.award",
+            "roulette.award.name",
+            "roulette.roulette.logo",
+        ]
+        for field in invalid_fields:
+            response = self.client.post(self.endpoint, {**data, "field": field})
+            self.assertEqual(response.status_code, 400)
+
+        response = self.client.post(self.endpoint, data)
+        self.assertEqual(response.json(), {"error": "Only images can be uploaded"})
+
+    def test_admin_widget(self):
+        """Validate award form with direct upload widget"""
+
+        response = self.client.get("/admin/roulette/award/add/")
+        self.assertContains(response, 'name="image_key"')
+        self.assertContains(response, "core/js/direct_upload.js")
+
+    def test_form_uploaded_image(self):
+        """Validate uploaded image checked with the object head only"""
+
+        with Stubber(self.storage.connection.meta.client) as stubber:
+            stubber.add_response(
+                "head_object",
+                {"ContentLength": 1000, "ContentType": "image/webp"},
+                {"Bucket": "test-bucket", "Key": "media/awards/uploads/cup.webp"},
+            )
+            form = self.get_award_form("awards/uploads/cup.webp")
+            self.assertTrue(form.is_valid(), form.errors)
+            award = form.save()
+            stubber.assert_no_pending_responses()
+
+        self.assertEqual(award.image.name, "awards/uploads/cup.webp")
+
+    def test_form_invalid_upload(self):
+        """Validate missing, not image and outside folder uploads"""
+
+        with Stubber(self.storage.connection.meta.client) as stubber:
+            stubber.add_client_error("head_object", http_status_code=404)
+            stubber.add_response(
+                "head_object", {"ContentLength": 1000, "ContentType": "text/html"}
+            )
+            for image_key in [
+                "awards/uploads/missing.webp",
+                "awards/uploads/page.html",
+                "roulette/logos/../../cup.webp",
+            ]:
+                form = self.get_award_form(image_key)
+                self.assertFalse(form.is_valid())
+                self.assertIn("image", form.errors)
+            stubber.assert_no_pending_responses()
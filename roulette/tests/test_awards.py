@@ -0,0 +1,56 @@
+import threading
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import TransactionTestCase, override_settings
+from model_bakery import baker
+
+from roulette import models
+from roulette.awards import take_award
+
+
+@override_settings(IMAGE_VARIANTS_ASYNC=False, IMAGE_VARIANT_FORMATS=[])
+class AwardStockTestCase(TransactionTestCase):
+    """Validate award stock under concurrent spins"""
+
+    def setUp(self):
+        cache.clear()
+        self.roulette = baker.make(models.Roulette)
+        self.award = baker.make(
+            models.Award, roulette=self.roulette, min_spins=0, stock=5
+        )
+
+    def test_take_award_concurrent(self):
+        """Validate only the units in stock are taken by concurrent spins,
+        all of them using the same (stale) award stock"""
+
+        threads_count = 20
+        barrier = threading.Barrier(threads_count)
+        results = []
+
+        def take(award):
+            barrier.wait()
+            try:
+                results.append(take_award(award))
+            finally:
+                connections.close_all()
+
+        threads = [
+            threading.Thread(target=take, args=[models.Award.objects.get()])
+            for _ in range(threads_count)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(results.count(True), 5)
+        self.award.refresh_from_db()
+        self.assertEqual(self.award.stock, 0)
+
+    def test_take_award_unlimited(self):
+        """Validate awards without stock are always taken (no queries)"""
+
+        self.award.stock = None
+        with self.assertNumQueries(0):
+            self.assertTrue(take_award(self.award))
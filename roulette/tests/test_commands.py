@@ -0,0 +1,420 @@
+import os
+import csv
+import gzip
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+import numpy as np
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from model_bakery import baker
+
+from benchmarks.seed import clean_data, seed_data
+from roulette import models
+from roulette.caches import get_roulette_cache_key
+from roulette.engines import ThresholdEngine
+from roulette.simulations import get_threshold_schedule
+
+
+class ExportRouletteDataTestCase(TestCase):
+    """Testing export_roulette_data command"""
+
+    def setUp(self):
+        self.roulette = baker.make(models.Roulette, name="Export Roulette")
+        self.other_roulette = baker.make(models.Roulette, name="Other Roulette")
+        self.award = baker.make(models.Award, roulette=self.roulette)
+
+        # Spins and awards in both roulettes
+        self.participants = baker.make(models.Participant, _quantity=3)
+        for participant in self.participants:
+            baker.make(
+                models.ParticipantSpin, participant=participant, roulette=self.roulette
+            )
+        baker.make(
+            models.ParticipantAward, participant=self.participants[0], award=self.award
+        )
+        baker.make(models.ParticipantSpin, roulette=self.other_roulette)
+
+    def call_export(self, *args) -> str:
+        """Run export command and return stdout"""
+        out = StringIO()
+        call_command("export_roulette_data", self.roulette.slug, *args, stdout=out)
+        return out.getvalue()
+
+    def test_export_participants_csv(self):
+        """Validate only roulette participants exported"""
+
+        rows = list(csv.reader(StringIO(self.call_export("--kind", "participants"))))
+        self.assertEqual(rows[0], ["id", "name", "email", "created_at"])
+        emails = sorted(row[2] for row in rows[1:])
+        self.assertEqual(emails, sorted(p.email for p in self.participants))
+
+    def test_export_spins_jsonl(self):
+        """Validate spins exported as json lines"""
+
+        output = self.call_export("--kind", "spins", "--format", "jsonl")
+        rows = [json.loads(line) for line in output.splitlines()]
+        self.assertEqual(len(rows), 3)
+        for row in rows:
+            self.assertEqual(row["roulette__slug"], self.roulette.slug)
+
+    def test_export_awards_gzip(self):
+        """Validate gzip compressed export to file"""
+
+        with tempfile.TemporaryDirectory() as temp_folder:
+            output_path = os.path.join(temp_folder, "awards.csv.gz")
+            call_command(
+                "export_roulette_data",
+                self.roulette.slug,
+                "--kind",
+                "awards",
+                "--gzip",
+                "--output",
+                output_path,
+                "--chunk-size",
+                "1",
+                stderr=StringIO(),
+            )
+            with gzip.open(output_path, "rt") as file:
+                rows = list(csv.reader(file))
+
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1][2], self.award.name)
+
+    def test_invalid_roulette(self):
+        """Validate error when roulette not found"""
+
+        with self.assertRaises(CommandError):
+            call_command("export_roulette_data", "invalid-roulette")
+
+
+class MergeParticipantEmailsTestCase(TestCase):
+    """Testing merge_participant_emails command"""
+
+    def setUp(self):
+        self.roulette = baker.make(models.Roulette)
+        self.award = baker.make(models.Award, roulette=self.roulette)
+
+        # Same gmail account with aliases (stored before normalization)
+        self.keeper = baker.make(models.Participant, email="foo@gmail.com")
+        self.duplicates = baker.make(models.Participant, _quantity=2)
+        models.Participant.objects.filter(id=self.duplicates[0].id).update(
+            email="F.oo+promo@gmail.com"
+        )
+        models.Participant.objects.filter(id=self.duplicates[1].id).update(
+            email="fo.o@googlemail.com"
+        )
+        self.other = baker.make(models.Participant, email="bar@gmail.com")
+
+        for participant in [self.keeper, *self.duplicates, self.other]:
+            baker.make(
+                models.ParticipantSpin, participant=participant, roulette=self.roulette
+            )
+        baker.make(
+            models.ParticipantAward, participant=self.duplicates[1], award=self.award
+        )
+
+    @override_settings(EMAIL_CANONICALIZE_ALIASES=True)
+    def test_merge_duplicates(self):
+        """Validate duplicates merged into the oldest participant"""
+
+        call_command("merge_participant_emails", "--chunk-size", "1", stdout=StringIO())
+
+        self.assertEqual(
+            list(models.Participant.objects.order_by("id")),
+            [self.keeper, self.other],
+        )
+        self.assertEqual(
+            models.ParticipantSpin.objects.filter(participant=self.keeper).count(), 3
+        )
+        self.assertEqual(
+            models.ParticipantAward.objects.get().participant_id, self.keeper.id
+        )
+
+    @override_settings(EMAIL_CANONICALIZE_ALIASES=True)
+    def test_merged_count(self):
+        """Validate only deleted duplicates counted (newer duplicate merged
+        before its own turn in the chunk)"""
+
+        models.Participant.objects.filter(id=self.keeper.id).update(
+            email="F.oo@gmail.com"
+        )
+        models.Participant.objects.filter(id=self.duplicates[0].id).update(
+            email="foo@gmail.com"
+        )
+        models.Participant.objects.filter(id=self.duplicates[1].id).delete()
+
+        out = StringIO()
+        call_command("merge_participant_emails", stdout=out)
+
+        self.assertIn("1 participants merged", out.getvalue())
+        self.assertEqual(
+            list(models.Participant.objects.order_by("id")),
+            [self.keeper, self.other],
+        )
+
+    def test_no_aliases_merge(self):
+        """Validate aliases kept when canonicalization is disabled"""
+
+        call_command("merge_participant_emails", stdout=StringIO())
+
+        self.assertEqual(models.Participant.objects.count(), 4)
+        emails = set(models.Participant.objects.values_list("email", flat=True))
+        self.assertIn("f.oo+promo@gmail.com", emails)
+
+
+class RunBenchmarksTestCase(TransactionTestCase):
+    """Testing run_benchmarks command (wsgi handler closes connections,
+    so data must be committed)"""
+
+    def test_benchmark_report(self):
+        """Validate benchmark json report and seeded data cleanup"""
+
+        out = StringIO()
+        call_command(
+            "run_benchmarks",
+            "--roulettes=2",
+            "--participants=5",
+            "--spins=20",
+            "--threads=1",
+            "--processes=1",
+            "--requests=3",
+            stdout=out,
+            stderr=StringIO(),
+        )
+        results = json.loads(out.getvalue())
+
+        self.assertEqual(
+            list(results["scenarios"].keys()), ["roulette-retrieve", "validate", "spin"]
+        )
+        for stats in results["scenarios"].values():
+            self.assertEqual(stats["requests"], 3)
+            self.assertEqual(stats["errors"], 0)
+            self.assertGreater(stats["throughput_rps"], 0)
+            self.assertLessEqual(stats["p50_ms"], stats["p99_ms"])
+
+        # Seeded data deleted
+        self.assertEqual(models.Roulette.objects.count(), 0)
+        self.assertEqual(models.Participant.objects.count(), 0)
+
+    def test_seed_spins_dates(self):
+        """Validate seeded spins spread in the last 30 days (date per spin)"""
+
+        seed_data(roulettes=1, participants=5, spins=50, batch_size=20)
+        self.addCleanup(clean_data)
+
+        spins = models.ParticipantSpin.objects.all()
+        dates = list(spins.values_list("created_at", flat=True))
+        self.assertEqual(len(dates), 50)
+        self.assertGreater(len(set(dates)), 40)
+        self.assertLess(timezone.now() - min(dates), timedelta(days=30))
+
+
+class BenchmarkSerializationTestCase(TestCase):
+    """Testing benchmark_serialization command"""
+
+    def test_benchmark_report(self):
+        """Validate cold and warm urls cache results"""
+
+        out = StringIO()
+        call_command(
+            "benchmark_serialization", "--awards=3", "--iterations=2", stdout=out
+        )
+        results = json.loads(out.getvalue())
+
+        self.assertEqual(results["awards"], 3)
+        self.assertEqual(list(results["modes"].keys()), ["cold", "warm"])
+        for stats in results["modes"].values():
+            self.assertEqual(stats["iterations"], 2)
+            self.assertLessEqual(stats["p50_ms"], stats["p99_ms"])
+
+
+@override_settings(IMAGE_VARIANTS_ASYNC=False, IMAGE_VARIANT_FORMATS=[])
+class WarmCachesTestCase(TransactionTestCase):
+    """Testing warm_caches command (roulettes warmed in threads, so data
+    must be committed)"""
+
+    def setUp(self):
+        cache.clear()
+        self.roulette = baker.make(models.Roulette, logo="test/test-logo.webp")
+        baker.make(
+            models.Award, roulette=self.roulette, image="test/test.webp", min_spins=1
+        )
+        self.inactive_roulette = baker.make(models.Roulette)
+
+    def test_warm_caches(self):
+        """Validate active roulettes payloads cached"""
+
+        out = StringIO()
+        call_command("warm_caches", "--json", "--workers=2", stdout=out)
+        results = json.loads(out.getvalue())
+
+        self.assertEqual(
+            [item["roulette"] for item in results["roulettes"]], [self.roulette.slug]
+        )
+        self.assertIsNotNone(cache.get(get_roulette_cache_key(self.roulette.slug)))
+        self.assertIsNone(
+            cache.get(get_roulette_cache_key(self.inactive_roulette.slug))
+        )
+
+        # Concurrent run reads the cached values
+        out = StringIO()
+        call_command("warm_caches", stdout=out)
+        self.assertIn("Done: 1 roulettes warmed", out.getvalue())
+
+
+class SimulateRouletteTestCase(TestCase):
+    """Testing simulate_roulette command (Monte Carlo payouts)"""
+
+    def setUp(self):
+        cache.clear()
+
+        # One regular spin per participant and day (no ads)
+        self.roulette = baker.make(
+            models.Roulette, spins_space_hours=24, spins_ads_limit=0
+        )
+        self.award = baker.make(
+            models.Award, roulette=self.roulette, min_spins=10, cost=2
+        )
+
+    def call_simulate(self, *args) -> dict:
+        """Run simulate command (100 participants, always spinning) and
+        return the json results"""
+        out = StringIO()
+        call_command(
+            "simulate_roulette",
+            self.roulette.slug,
+            "--participants=100",
+            "--days=3",
+            "--runs=5",
+            "--visit-rate=1",
+            "--json",
+            *args,
+            stdout=out,
+        )
+        return json.loads(out.getvalue())
+
+    def test_simulate_threshold(self):
+        """Validate awards of the spins counter rules: won at spins 11, 21,
+        ..., 291 (29 awards in 300 spins)"""
+
+        results = self.call_simulate()
+        self.assertEqual(results["spins_per_day"]["mean"], 100)
+        self.assertEqual(results["awards_per_day"]["mean"], 9.67)
+        self.assertEqual(results["total_cost"]["mean"], 58)
+        self.assertEqual(results["awards"][0]["wins"]["p50"], 29)
+        self.assertIsNone(results["awards"][0]["sold_out_rate"])
+
+    def test_simulate_stock(self):
+        """Validate awards out of stock not won (next award won instead)"""
+
+        self.award.stock = 5
+        self.award.save()
+        other_award = baker.make(
+            models.Award, roulette=self.roulette, min_spins=100, cost=10
+        )
+
+        results = self.call_simulate()
+        wins = {award["id"]: award for award in results["awards"]}
+        self.assertEqual(wins[self.award.id]["wins"]["mean"], 5)
+        self.assertEqual(wins[self.award.id]["sold_out_rate"], 1)
+        self.assertEqual(wins[other_award.id]["wins"]["mean"], 2)
+
+    def test_threshold_schedule_large_stock(self):
+        """Validate wins computed by runs, not one by one: engine calls
+        don't grow with the stock"""
+
+        self.award.min_spins = 2
+        self.award.stock = 1_000_000
+        other_award = baker.make(
+            models.Award, roulette=self.roulette, min_spins=2, stock=500_000
+        )
+        awards = [self.award, other_award]
+
+        engine = ThresholdEngine()
+        with patch.object(
+            engine, "get_candidates", wraps=engine.get_candidates
+        ) as candidates_mock:
+            spins, winners = get_threshold_schedule(
+                engine, self.roulette, awards, 5_000_000
+            )
+        self.assertLessEqual(candidates_mock.call_count, 5)
+
+        # Won every 2 spins (3, 5, ...), the next award after the first one
+        # runs out, no wins after both run out
+        self.assertEqual(np.bincount(winners).tolist(), [1_000_000, 500_000])
+        self.assertEqual(spins[:3].tolist(), [3, 5, 7])
+        self.assertEqual(spins[999_999], 2_000_001)
+        self.assertEqual(spins[-1], 3_000_001)
+
+    def test_simulate_weighted(self):
+        """Validate awards by probability, reproducible with a seed"""
+
+        self.roulette.award_engine = "weighted"
+        self.roulette.save()
+        self.award.probability = 0.5
+        self.award.save()
+
+        results = self.call_simulate("--seed=1")
+        self.assertAlmostEqual(results["award_rate"], 0.5, delta=0.05)
+        results.pop("total_ms")
+        other_results = self.call_simulate("--seed=1")
+        other_results.pop("total_ms")
+        self.assertEqual(results, other_results)
+
+    def test_invalid_simulation(self):
+        """Validate errors: roulette not found and simulation too large"""
+
+        with self.assertRaises(CommandError):
+            call_command("simulate_roulette", "invalid-roulette", stdout=StringIO())
+
+        self.roulette.spins_space_hours = 0.01
+        self.roulette.save()
+        with self.assertRaises(CommandError):
+            self.call_simulate("--runs=1000")
+
+        # Unlimited regular spins, invalid overrides
+        self.roulette.spins_space_hours = 0
+        self.roulette.save()
+        with self.assertRaisesMessage(CommandError, "unlimited regular spins"):
+            self.call_simulate()
+        with self.assertRaises(CommandError):
+            self.call_simulate("--spins-space-hours=24", '--awards=[{"id": 0}]')
+        with self.assertRaises(CommandError):
+            self.call_simulate("--spins-space-hours=24", '--awards=[{"stock": -1}]')
+
+    def test_simulate_overrides(self):
+        """Validate configuration to try: settings, changed and new awards
+        (nothing saved)"""
+
+        results = self.call_simulate(
+            "--spins-space-hours=12",
+            "--award-engine=weighted",
+            "--seed=1",
+            f'--awards=[{{"id": {self.award.id}, "probability": 0.5}}, '
+            '{"name": "New", "probability": 0.5, "cost": 1}]',
+        )
+        self.assertEqual(results["spins_space_hours"], 12)
+        self.assertEqual(results["spins_per_day"]["mean"], 200)
+        self.assertEqual(results["award_rate"], 1)
+        self.assertEqual(
+            [award["name"] for award in results["awards"]], [self.award.name, "New"]
+        )
+        self.assertLess(results["awards"][1]["id"], 0)
+
+        # Removed award
+        results = self.call_simulate(
+            f'--awards=[{{"id": {self.award.id}, "active": false}}]'
+        )
+        self.assertEqual(results["awards"], [])
+
+        self.roulette.refresh_from_db()
+        self.award.refresh_from_db()
+        self.assertEqual(self.roulette.award_engine, "threshold")
+        self.assertEqual(self.award.probability, 0)
@@ -0,0 +1,98 @@
+import random
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from model_bakery import baker
+
+from roulette import models
+from roulette.engines import ThresholdEngine, WeightedEngine, get_award_engine
+from utils.sampling import AliasTable
+
+
+class AwardEngineTestCase(TestCase):
+    """Validate award engines and alias table sampling"""
+
+    def setUp(self):
+        cache.clear()
+        self.roulette = baker.make(models.Roulette, award_engine="weighted")
+        self.awards = [
+            baker.make(
+                models.Award, roulette=self.roulette, min_spins=0, probability=p
+            )
+            for p in [0.5, 0.3, 0.1]
+        ]
+        self.engine = WeightedEngine(rng=random.Random(7))
+
+    def test_alias_table_distribution(self):
+        """Validate samples follow the weights"""
+
+        weights = [5, 3, 1, 0, 1]
+        table = AliasTable(weights)
+        rng = random.Random(7)
+        samples = [table.sample(rng) for _ in range(20000)]
+        for index, weight in enumerate(weights):
+            frequency = samples.count(index) / len(samples)
+            self.assertAlmostEqual(frequency, weight / sum(weights), delta=0.01)
+
+        with self.assertRaises(ValueError):
+            AliasTable([0, 0])
+
+    def test_weighted_candidates(self):
+        """Validate weighted engine wins one award (or none) by probability,
+        with the seeded generator"""
+
+        wins = {award.id: 0 for award in self.awards}
+        losses = 0
+        for _ in range(5000):
+            candidates = self.engine.get_candidates(self.roulette, self.awards)
+            self.assertLessEqual(len(candidates), 1)
+            if candidates:
+                wins[candidates[0].id] += 1
+            else:
+                losses += 1
+        for award in self.awards:
+            frequency = wins[award.id] / 5000
+            self.assertAlmostEqual(frequency, award.probability, delta=0.02)
+        self.assertAlmostEqual(losses / 5000, 0.1, delta=0.02)
+
+        # Same seed, same results
+        results = [
+            WeightedEngine(rng=random.Random(1)).get_candidates(
+                self.roulette, self.awards
+            )
+            for _ in range(2)
+        ]
+        self.assertEqual(results[0], results[1])
+
+    def test_weighted_table_rebuilt(self):
+        """Validate alias table cached per roulette until the awards change"""
+
+        outcomes, table = self.engine.get_table(self.roulette)
+        self.assertEqual(len(table), 4)
+        self.assertIsNone(outcomes[-1])
+
+        # Cached: no award queries, table not built again
+        with patch("roulette.engines.AliasTable") as table_mock:
+            with self.assertNumQueries(0):
+                self.engine.get_candidates(self.roulette)
+        table_mock.assert_not_called()
+
+        # Award changed: table rebuilt (sure win, no losing outcome)
+        self.awards[0].probability = 0.6
+        self.awards[0].save()
+        outcomes, table = self.engine.get_table(self.roulette)
+        self.assertEqual(len(table), 3)
+        self.assertNotIn(None, outcomes)
+
+        # Given awards (e.g. simulations): not cached
+        outcomes, table = self.engine.build_table(self.awards[1:])
+        self.assertEqual(len(table), 3)
+        self.assertIsNone(outcomes[-1])
+
+    def test_get_award_engine(self):
+        """Validate engine selected by roulette"""
+
+        self.assertIsInstance(get_award_engine(self.roulette), WeightedEngine)
+        self.roulette.award_engine = "threshold"
+        self.assertIsInstance(get_award_engine(self.roulette), ThresholdEngine)
@@ -1,7 +1,17 @@
+import os
+import tempfile
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.test import TestCase
+from django.db import IntegrityError, transaction
 from model_bakery import baker
+from PIL import Image
 
+from project.storage_backends import get_cache_control
 from roulette import models
+from utils.images import get_srcset, schedule_image_variants, update_image_variants
 
 
 class RouletteTestCase(TestCase):
@@ -40,3 +50,180 @@ class ParticipantSpinTestCase(TestCase):
             is_extra_spin=False,
         )
         self.assertEqual(roulette.spins_counter, 1)
+
+
+class ParticipantTestCase(TestCase):
+
+    def setUp(self):
+        pass
+
+    def test_save_normalize_email(self):
+        """Validate email is stored stripped and lowercase"""
+
+        participant = baker.make(models.Participant, email=" Foo@Gmail.com ")
+        participant.refresh_from_db()
+        self.assertEqual(participant.email, "foo@gmail.com")
+
+    def test_email_unique_case_insensitive(self):
+        """Validate database rejects emails that only differ in case"""
+
+        baker.make(models.Participant, email="foo@gmail.com")
+
+        # Bypass save() normalization
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            models.Participant.objects.bulk_create(
+                [models.Participant(name="Foo", email="FOO@gmail.com")]
+            )
+
+    def test_filter_email(self):
+        """Validate participant lookup ignores email case and spaces"""
+
+        participant = baker.make(models.Participant, email="foo@gmail.com")
+        self.assertEqual(
+            models.Participant.objects.filter_email(" Foo@GMAIL.com").get(),
+            participant,
+        )
+
+
+class ImageVariantsTestCase(TestCase):
+
+    def setUp(self):
+        temp_folder = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_folder.cleanup)
+        self.media_root = temp_folder.name
+        settings = self.settings(
+            MEDIA_ROOT=self.media_root,
+            IMAGE_VARIANTS_ASYNC=False,
+            IMAGE_VARIANT_WIDTHS=[200, 400, 1200],
+            IMAGE_VARIANT_FORMATS=["avif", "webp"],
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def get_image_file(self, name: str, size: tuple = (800, 400)):
+        buffer = BytesIO()
+        Image.new("RGB", size, "red").save(buffer, format="PNG")
+        return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+    def create_award(self) -> models.Award:
+        with self.captureOnCommitCallbacks(execute=True):
+            award = baker.make(models.Award, image=self.get_image_file("cup.png"))
+        award.refresh_from_db()
+        return award
+
+    def get_variant_names(self, award: models.Award) -> list[str]:
+        return list(award.image_variants["image"]["variants"]["webp"].values())
+
+    def test_generate_variants(self):
+        """Validate webp variants by width (no upscaling) saved after upload"""
+
+        award = self.create_award()
+        variants = award.image_variants["image"]
+        self.assertEqual(variants["source"], award.image.name)
+        self.assertEqual(list(variants["variants"]["webp"]), ["200", "400"])
+        for name in self.get_variant_names(award):
+            with Image.open(os.path.join(self.media_root, name)) as image:
+                self.assertEqual(image.format, "WEBP")
+                self.assertIn(image.size, [(200, 100), (400, 200)])
+
+        # Validate srcset
+        srcset = get_srcset(award.image_variants, award.image.storage)
+        self.assertEqual(
+            srcset["image"]["webp"],
+            f"{settings.HOST}/media/{variants['variants']['webp']['200']} 200w, "
+            f"{settings.HOST}/media/{variants['variants']['webp']['400']} 400w",
+        )
+
+    def test_idempotent(self):
+        """Validate variants not generated again if image not changed"""
+
+        award = self.create_award()
+        paths = [
+            os.path.join(self.media_root, name)
+            for name in self.get_variant_names(award)
+        ]
+        modified_times = [os.path.getmtime(path) for path in paths]
+
+        # Save without image changes: generation not scheduled
+        with self.captureOnCommitCallbacks() as callbacks:
+            award.name = "New name"
+            award.save()
+        scheduled = [getattr(callback, "func", None) for callback in callbacks]
+        self.assertNotIn(schedule_image_variants, scheduled)
+
+        # Run generation again: same files
+        update_image_variants(models.Award, award.pk)
+        award.refresh_from_db()
+        self.assertEqual(
+            paths,
+            [
+                os.path.join(self.media_root, name)
+                for name in self.get_variant_names(award)
+            ],
+        )
+        self.assertEqual([os.path.getmtime(path) for path in paths], modified_times)
+
+    def test_shared_variants_kept(self):
+        """Validate variants shared by identical uploads not deleted"""
+
+        award = self.create_award()
+        other_award = self.create_award()
+        self.assertEqual(award.image.name, other_award.image.name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            award.image = self.get_image_file("cup-2.png", size=(300, 300))
+            award.save()
+        for name in self.get_variant_names(other_award):
+            self.assertTrue(os.path.exists(os.path.join(self.media_root, name)))
+
+    def test_replace_image(self):
+        """Validate variants of replaced images deleted"""
+
+        award = self.create_award()
+        old_names = self.get_variant_names(award)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            award.image = self.get_image_file("cup-2.png", size=(300, 300))
+            award.save()
+        award.refresh_from_db()
+
+        variants = award.image_variants["image"]["variants"]
+        self.assertEqual(list(variants["webp"]), ["200"])
+        for name in old_names:
+            self.assertFalse(os.path.exists(os.path.join(self.media_root, name)))
+
+
+class ContentHashedStorageTestCase(TestCase):
+
+    def setUp(self):
+        temp_folder = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_folder.cleanup)
+        self.media_root = temp_folder.name
+        settings = self.settings(MEDIA_ROOT=self.media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+
+    def create_award(self, name: str, content: bytes) -> models.Award:
+        image = SimpleUploadedFile(name, content, content_type="image/png")
+        return baker.make(models.Award, image=image)
+
+    def test_content_hashed_names(self):
+        """Validate names by content hash and identical uploads saved once"""
+
+        award = self.create_award("Cup.PNG", b"cup")
+        same_award = self.create_award("other-name.png", b"cup")
+        other_award = self.create_award("cup.png", b"other cup")
+
+        self.assertRegex(award.image.name, r"^awards/[0-9a-f]{32}\.png$")
+        self.assertEqual(award.image.name, same_award.image.name)
+        self.assertNotEqual(award.image.name, other_award.image.name)
+        self.assertEqual(len(os.listdir(os.path.join(self.media_root, "awards"))), 2)
+
+    def test_cache_control(self):
+        """Validate immutable cache headers only for content hashed names"""
+
+        award = self.create_award("cup.png", b"cup")
+        self.assertEqual(
+            get_cache_control(award.image.name), "public, max-age=31536000, immutable"
+        )
+        self.assertEqual(get_cache_control("awards/cup.png"), "no-cache")
@@ -1,13 +1,26 @@
 import os
+import json
+import asyncio
+import tempfile
+from datetime import datetime, timedelta
 from time import sleep
 
+from asgiref.sync import sync_to_async
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 from model_bakery import baker
 
 from core.tests_base.test_views import BaseTestApiViewsMethods
-from roulette import models
+from roulette import events, models, winners
+from roulette.awards import get_award_ladder
+from roulette.engines import get_award_engine
+from roulette.resolvers import roulette_resolver
 
 
 class TestRouletteViewsBaseTestCase(BaseTestApiViewsMethods):
@@ -74,11 +87,62 @@ class TestRouletteViewsBaseTestCase(BaseTestApiViewsMethods):
         response = self.client.get(self.endpoint)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-        # Validate results number
+        # Validate results number (cursor pagination, no count)
         json_data = response.json()["data"]
-        self.assertEqual(json_data["count"], 1)
+        self.assertNotIn("count", json_data)
+        self.assertIsNone(json_data["next"])
+        self.assertEqual(len(json_data["results"]), 1)
         self.assertEqual(json_data["results"][0]["id"], self.roulette.id)
 
+    def test_get_roulette_list_pages(self):
+        """Test roulette list cursor pages: newest first, same queries per page"""
+
+        baker.make(models.Roulette, _quantity=4)
+        roulette_ids = list(
+            models.Roulette.objects.order_by("-id").values_list("id", flat=True)
+        )
+
+        # Follow next links
+        ids = []
+        queries = []
+        endpoint = f"{self.endpoint}?page_size=2"
+        while endpoint:
+            with CaptureQueriesContext(connection) as context:
+                response = self.client.get(endpoint)
+            queries.append(len(context.captured_queries))
+            json_data = response.json()["data"]
+            ids += [roulette["id"] for roulette in json_data["results"]]
+            endpoint = json_data["next"]
+
+        self.assertEqual(ids, roulette_ids)
+        self.assertEqual(len(set(queries)), 1)
+
+    def test_filter_roulette_list(self):
+        """Test roulette list filtered by name prefix and active awards"""
+
+        baker.make(models.Roulette, name="Summer Roulette")
+        models.Award.objects.update(active=False)
+
+        # Validate name prefix filter
+        response = self.client.get(self.endpoint, {"name": "summ"})
+        json_data = response.json()["data"]
+        self.assertEqual(
+            [roulette["name"] for roulette in json_data["results"]],
+            ["Summer Roulette"],
+        )
+
+        # Validate active filter (roulettes with active awards)
+        response = self.client.get(self.endpoint, {"active": "true"})
+        self.assertEqual(response.json()["data"]["results"], [])
+        award = self.awards.first()
+        award.active = True
+        award.save()
+        response = self.client.get(self.endpoint, {"active": "true"})
+        json_data = response.json()["data"]
+        self.assertEqual(
+            [roulette["id"] for roulette in json_data["results"]], [self.roulette.id]
+        )
+
     def test_get_roulette_detail(self):
         """Test get roulette detail"""
 
@@ -108,12 +172,86 @@ class TestRouletteViewsBaseTestCase(BaseTestApiViewsMethods):
         self.assertEqual(json_data["color_spin_3"], self.roulette.color_spin_3)
         self.assertEqual(json_data["color_spin_4"], self.roulette.color_spin_4)
         self.assertEqual(json_data["google_ads_code"], self.roulette.google_ads_code)
+        self.assertEqual(json_data["srcset"], {})
+        self.assertNotIn("image_variants", json_data)
 
         # Validate awards data
         self.assertEqual(len(json_data["awards"]), 3)
         for award in json_data["awards"]:
             self.__validate_award_data(award)
 
+    def test_get_roulette_detail_cached(self):
+        """Test roulette detail cached until the roulette or awards change"""
+
+        endpoint = f"{self.endpoint}{self.roulette.slug}/"
+        with CaptureQueriesContext(connection) as cold_queries:
+            self.client.get(endpoint)
+        with CaptureQueriesContext(connection) as warm_queries:
+            response = self.client.get(endpoint)
+        self.assertLess(len(warm_queries), len(cold_queries))
+        self.assertEqual(response.json()["data"]["name"], self.roulette.name)
+
+        # Award changed
+        award = self.roulette.awards.first()
+        award.name = "Updated award"
+        award.save()
+        response = self.client.get(endpoint)
+        award_names = [item["name"] for item in response.json()["data"]["awards"]]
+        self.assertIn("Updated award", award_names)
+
+        # Roulette changed
+        self.roulette.subtitle = "Updated subtitle"
+        self.roulette.save()
+        response = self.client.get(endpoint)
+        self.assertEqual(response.json()["data"]["subtitle"], "Updated subtitle")
+
+        # Not found not cached
+        response = self.client.get(f"{self.endpoint}missing-roulette/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_endpoints_budget(self):
+        """Test roulette list and detail within their queries budget"""
+
+        with self.assert_endpoint_budget() as measured:
+            self.client.get(self.endpoint)
+            response = self.client.get(f"{self.endpoint}{self.roulette.slug}/")
+
+        self.assertIn("Server-Timing", response)
+        self.assertEqual(
+            [endpoint for endpoint, *_ in measured],
+            ["roulette-list", "roulette-detail"],
+        )
+
+    def test_get_roulette_winners(self):
+        """Test last winners served from cache and rebuilt after new awards"""
+
+        cache.clear()
+        participant = baker.make(models.Participant, name="Juan Perez")
+        award = self.awards.first()
+        for _ in range(settings.WINNERS_FEED_SIZE):
+            baker.make(models.ParticipantAward, participant=participant, award=award)
+        endpoint = f"{self.endpoint}{self.roulette.slug}/winners/"
+
+        # Validate winners rebuilt from db (miss) and then from cache
+        with self.assert_endpoint_budget():
+            queries_miss = self.get_queries_count(endpoint)
+            queries_hit = self.get_queries_count(endpoint)
+        self.assertEqual(queries_miss - queries_hit, 2)
+
+        # Validate cache cleared after the new winner (rebuilt from db)
+        new_participant = baker.make(models.Participant, name="Ana")
+        with self.captureOnCommitCallbacks(execute=True):
+            models.ParticipantAward.objects.create(
+                participant=new_participant, award=award
+            )
+        self.assertIsNone(cache.get(winners.get_winners_cache_key(self.roulette.slug)))
+        response = self.client.get(endpoint)
+        json_data = response.json()["data"]
+        self.assertEqual(len(json_data), settings.WINNERS_FEED_SIZE)
+        self.assertEqual(json_data[0]["participant"], "A***")
+        self.assertEqual(json_data[0]["award"], award.name)
+        self.assertEqual(json_data[1]["participant"], "Juan P.")
+
     def test_get_only_active_awards(self):
         """Test get roulette with only active awards"""
 
@@ -258,6 +396,59 @@ class ParticipantViewValidateTestCase(ParticipantBaseTestCase):
         self.assertEqual(participant.email, self.api_data["email"])
         self.assertEqual(participant.name, self.api_data["name"])
 
+    def test_email_case_insensitive(self):
+        """Test same participant (and spins) when email case changes"""
+
+        self.create_spin()
+
+        # Validate response with uppercase email
+        self.api_data["email"] = f" {self.api_data['email'].upper()} "
+        response = self.client.post(self.endpoint, data=self.api_data)
+        self.validate_response_data(response, can_spin=False, can_spin_ads=True)
+
+        # Validate no new participant created
+        self.assertEqual(models.Participant.objects.count(), 1)
+
+    def test_next_spin_time(self):
+        """Test next spin time, extra spins remaining and cache header"""
+
+        # Validate eligible participant: no next spin time and no cache
+        response = self.client.post(self.endpoint, data=self.api_data)
+        self.validate_response_data(response, can_spin=True, can_spin_ads=True)
+        json_data = response.json()["data"]
+        self.assertIsNone(json_data["next_spin_at"])
+        self.assertEqual(json_data["extra_spins_remaining"], 2)
+        self.assertIn("server_time", json_data)
+        self.assertEqual(response["Cache-Control"], "private, max-age=0")
+
+        # Validate after regular and extra spin
+        self.create_spin()
+        self.create_spin(is_extra_spin=True)
+        response = self.client.post(self.endpoint, data=self.api_data)
+        self.validate_response_data(response, can_spin=False, can_spin_ads=True)
+        json_data = response.json()["data"]
+        self.assertEqual(json_data["extra_spins_remaining"], 1)
+
+        # Validate next spin time after space time and cache until it
+        last_spin = models.ParticipantSpin.objects.filter(is_extra_spin=False).get()
+        next_spin_at = last_spin.created_at + timedelta(
+            hours=self.roulette.spins_space_hours
+        )
+        self.assertEqual(
+            datetime.fromisoformat(json_data["next_spin_at"].replace("Z", "+00:00")),
+            next_spin_at,
+        )
+        max_age = int(response["Cache-Control"].split("max-age=")[1])
+        self.assertTrue(0 < max_age <= self.roulette.spins_space_hours * 3600 + 1)
+
+    def test_endpoint_budget(self):
+        """Test validate within its queries budget"""
+
+        self.create_spin()
+        with self.assert_endpoint_budget():
+            response = self.client.post(self.endpoint, data=self.api_data)
+        self.validate_response_data(response, can_spin=False, can_spin_ads=True)
+
     def test_update_participant_name(self):
         """Test update participant name when validate (if exists)"""
 
@@ -369,6 +560,49 @@ class ParticipantSpinTestCase(ParticipantBaseTestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(response.json()["message"], "Invalid data")
 
+    def test_endpoint_budget(self):
+        """Test spin (with award) within its queries budget"""
+
+        self.roulette.spins_counter = 100
+        self.roulette.save()
+        self.create_spin()
+        self.wait_for_space_time()
+
+        with self.assert_endpoint_budget():
+            response = self.client.post(self.endpoint, data=self.api_data)
+        self.assertIsNotNone(response.json()["data"]["award"])
+
+    def test_roulette_resolved_once(self):
+        """Validate spin roulette query shared by serializers (rule fields
+        only), and cached for the next requests"""
+
+        roulette_resolver.clear()
+        table = models.Roulette._meta.db_table
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.endpoint, data=self.api_data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        roulette_queries = [
+            query["sql"]
+            for query in queries
+            if query["sql"].startswith("SELECT") and f'FROM "{table}"' in query["sql"]
+        ]
+        slug_queries = [sql for sql in roulette_queries if '"slug" =' in sql]
+        self.assertEqual(len(slug_queries), 1)
+        self.assertNotIn("google_ads_code", slug_queries[0])
+
+        # Next request: roulette from the resolver cache
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                self.endpoint, data={**self.api_data, "is_extra_spin": True}
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(
+            any(
+                '"slug" =' in query["sql"] and f'FROM "{table}"' in query["sql"]
+                for query in queries
+            )
+        )
+
     def test_spin_bypass_validation(self):
         """Validate success response when user bypass validation:
         - New user created
@@ -555,3 +789,268 @@ class ParticipantSpinTestCase(ParticipantBaseTestCase):
         # Validate roulette spins counter reset to 1 (only new spin created)
         self.roulette.refresh_from_db()
         self.assertEqual(self.roulette.spins_counter, 1)
+
+    def test_spin_award_out_of_stock(self):
+        """Validate awards out of stock are not granted: next award reached
+        is granted instead, and the award is removed from the roulette"""
+
+        awards = list(models.Award.objects.order_by("id"))
+        awards[0].stock = 1
+        awards[0].save()
+        self.roulette.spins_counter = 100
+        self.roulette.save()
+
+        # Last unit of the first award
+        response = self.client.post(self.endpoint, data=self.api_data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["data"]["award"]["id"], awards[0].id)
+        awards[0].refresh_from_db()
+        self.assertEqual(awards[0].stock, 0)
+
+        # First award out of stock: next one granted
+        self.api_data["is_extra_spin"] = True
+        response = self.client.post(self.endpoint, data=self.api_data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["data"]["award"]["id"], awards[1].id)
+        self.assertEqual(models.ParticipantAward.objects.count(), 2)
+
+        # Award removed from the roulette
+        response = self.client.get(f"/api/roulette/{self.roulette.slug}/")
+        awards_data = response.json()["data"]["awards"]
+        self.assertNotIn(awards[0].id, [award["id"] for award in awards_data])
+
+    def test_spin_award_deactivated(self):
+        """Validate spins read the current awards: awards deactivated in
+        another worker (cached award ladder still valid here) are not granted"""
+
+        awards = list(models.Award.objects.order_by("id"))
+        self.roulette.spins_counter = 100
+        self.roulette.save()
+        get_award_ladder(self.roulette)
+
+        # Deactivated without signals (cache of this process not invalidated)
+        models.Award.objects.filter(pk=awards[0].pk).update(active=False)
+        response = self.client.post(self.endpoint, data=self.api_data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["data"]["award"]["id"], awards[1].id)
+
+    def test_spin_weighted_engine(self):
+        """Validate spins of weighted roulettes win by award probability
+        (spins counter not reduced)"""
+
+        self.roulette.award_engine = "weighted"
+        self.roulette.spins_counter = 100
+        self.roulette.save()
+        roulette_resolver.clear()
+        awards = list(models.Award.objects.order_by("id"))
+
+        # No probabilities: always lose
+        response = self.client.post(self.endpoint, data=self.api_data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIsNone(response.json()["data"]["award"])
+
+        # Sure win of the second award
+        awards[1].probability = 1
+        awards[1].save()
+        self.api_data["is_extra_spin"] = True
+        response = self.client.post(self.endpoint, data=self.api_data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["data"]["award"]["id"], awards[1].id)
+        self.roulette.refresh_from_db()
+        self.assertEqual(self.roulette.spins_counter, 102)
+
+    def test_spin_counter_in_memory(self):
+        """Validate spins counter of resolved roulettes (counter not loaded)
+        after a weighted engine spin (counter not reduced)"""
+
+        self.roulette.award_engine = "weighted"
+        self.roulette.spins_counter = 100
+        self.roulette.save()
+        roulette_resolver.clear()
+
+        roulette = roulette_resolver.resolve(self.roulette.slug)
+        self.assertIn("spins_counter", roulette.get_deferred_fields())
+        models.ParticipantSpin.objects.create(
+            participant=self.participant, roulette=roulette
+        )
+        award = models.Award.objects.filter(roulette=self.roulette).first()
+        get_award_engine(roulette).award_granted(roulette, award)
+        self.assertEqual(roulette.spins_counter, 101)
+
+
+class ParticipantHistoryTestCase(ParticipantBaseTestCase):
+
+    def setUp(self):
+        super().setUp("/api/participant/history/")
+
+        # Dummy data
+        self.load_dummy_data()
+        self.params = {"email": self.participant.email, "roulette": self.roulette.slug}
+
+    def create_history(self) -> list[tuple]:
+        """Create spins and awards with known dates (including same dates)
+
+        Returns:
+            list[tuple]: expected history items (type, id), newest first
+        """
+
+        base_date = timezone.now() - timedelta(days=1)
+        award = models.Award.objects.first()
+        items = []
+        for index, minutes in enumerate([0, 1, 1, 2, 3, 3, 5]):
+            created_at = base_date + timedelta(minutes=minutes)
+            if index % 3 == 2:
+                item = models.ParticipantAward.objects.create(
+                    participant=self.participant, award=award
+                )
+                item_type = "award"
+            else:
+                item = models.ParticipantSpin.objects.create(
+                    participant=self.participant, roulette=self.roulette
+                )
+                item_type = "spin"
+            type(item).objects.filter(id=item.id).update(created_at=created_at)
+            items.append((created_at, item_type, item.id))
+
+        # Newest first, awards before spins at the same date
+        items.sort(key=lambda item: (item[0], item[1] == "award", item[2]))
+        return [(item_type, item_id) for _, item_type, item_id in reversed(items)]
+
+    def test_missing_data(self):
+        """Test missing data"""
+        response = self.client.get(self.endpoint)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_cursor(self):
+        """Test invalid cursor"""
+        self.params["cursor"] = "invalid"
+        response = self.client.get(self.endpoint, self.params)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_unknown_participant(self):
+        """Test empty history of participants without spins"""
+        self.params["email"] = "other@test.com"
+        response = self.client.get(self.endpoint, self.params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        json_data = response.json()["data"]
+        self.assertEqual(json_data, {"next": None, "results": []})
+
+    def test_history_pages(self):
+        """Test spins and awards merged in order through all pages"""
+
+        expected_items = self.create_history()
+
+        # Follow next links
+        items = []
+        endpoint = f"{self.endpoint}?limit=3&email={self.participant.email}"
+        endpoint += f"&roulette={self.roulette.slug}"
+        with self.assert_endpoint_budget():
+            while endpoint:
+                response = self.client.get(endpoint)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                json_data = response.json()["data"]
+                self.assertLessEqual(len(json_data["results"]), 3)
+                items += [(item["type"], item["id"]) for item in json_data["results"]]
+                endpoint = json_data["next"]
+
+        self.assertEqual(items, expected_items)
+        self.assertEqual(json_data["results"][-1]["type"], "spin")
+
+
+@override_settings(ROOT_URLCONF="project.urls_events", EVENTS_BROKER="local")
+class RouletteEventsTestCase(TestCase):
+    """Test roulette server-sent events stream"""
+
+    def setUp(self):
+        self.roulette = baker.make(models.Roulette, name="Test Roulette")
+        self.award = baker.make(models.Award, roulette=self.roulette, name="Cup")
+        self.participant = baker.make(models.Participant, name="Juan Perez")
+        self.endpoint = f"/api/roulette/{self.roulette.slug}/events/"
+
+    def create_participant_award(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            models.ParticipantAward.objects.create(
+                participant=self.participant, award=self.award
+            )
+
+    def update_roulette(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.roulette.message_win = "Congrats!"
+            self.roulette.save()
+
+    def test_invalid_roulette(self):
+        response = self.client.get("/api/roulette/invalid-roulette/events/")
+        self.assertEqual(response.status_code, 404)
+
+    async def test_stream_events(self):
+        """Validate winner and config events sent to connected clients"""
+
+        response = await self.async_client.get(self.endpoint)
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = aiter(response.streaming_content)
+
+        # Client subscribed after the first message
+        self.assertEqual(await anext(content), b"retry: 5000\n\n")
+        self.assertEqual(events.hub.count(self.roulette.slug), 1)
+
+        # Winner event with masked participant name
+        await sync_to_async(self.create_participant_award)()
+        message = (await anext(content)).decode()
+        self.assertTrue(message.startswith("event: winner\n"))
+        data = json.loads(message.split("data: ")[1])
+        self.assertEqual(data["participant"], "Juan P.")
+        self.assertEqual(data["award"], "Cup")
+
+        # Config event
+        await sync_to_async(self.update_roulette)()
+        message = (await anext(content)).decode()
+        self.assertTrue(message.startswith("event: config\n"))
+
+    async def test_keepalive(self):
+        """Validate keepalive comments and stream end"""
+
+        with self.settings(EVENTS_KEEPALIVE_SECONDS=0.1, EVENTS_STREAM_SECONDS=0.25):
+            response = await self.async_client.get(self.endpoint)
+            messages = [message async for message in response.streaming_content]
+        self.assertEqual(messages[1:], [b": keepalive\n\n"] * 3)
+
+        # Client unsubscribed when the stream ends
+        self.assertEqual(events.hub.count(self.roulette.slug), 0)
+
+    def test_spins_no_config_event(self):
+        """Validate spins counter updates are not config changes"""
+
+        with self.captureOnCommitCallbacks() as callbacks:
+            models.ParticipantSpin.objects.create(
+                participant=self.participant, roulette=self.roulette
+            )
+        self.assertEqual(callbacks, [])
+
+    def test_file_broker(self):
+        """Validate events delivered through the shared file"""
+
+        with tempfile.TemporaryDirectory() as temp_folder:
+            with self.settings(EVENTS_BROKER_DIR=temp_folder):
+                broker = events.FileBroker()
+                broker.publish({"roulette": "a", "type": "config", "data": {}})
+                broker.publish({"roulette": "b", "type": "winner", "data": {}})
+                with open(broker.get_file_path()) as file:
+                    lines = [json.loads(line) for line in file]
+        self.assertEqual([line["roulette"] for line in lines], ["a", "b"])
+
+    async def test_file_broker_delivery(self):
+        """Validate events published by other processes reach the clients"""
+
+        with tempfile.TemporaryDirectory() as temp_folder:
+            with self.settings(EVENTS_BROKER_DIR=temp_folder, EVENTS_POLL_SECONDS=0.01):
+                # Listener of this process, publisher of another one
+                events.FileBroker().start()
+                await asyncio.sleep(0.1)
+                content = aiter(events.stream_events(self.roulette.slug))
+                await anext(content)
+                events.FileBroker().publish(
+                    {"roulette": self.roulette.slug, "type": "config", "data": {}}
+                )
+                message = await asyncio.wait_for(anext(content), 5)
+                await content.aclose()
+        self.assertEqual(message, "event: config\ndata: {}\n\n")
@@ -1,33 +1,99 @@
+import math
+
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.utils.cache import patch_cache_control
+from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import viewsets
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import action
+from rest_framework.utils.urls import replace_query_param
 
-from roulette import models, serializers
+from project.db_routers import use_replica
+from roulette import caches, events, history, metrics, models, serializers, winners
+from roulette.filters import RouletteFilter
+from utils.instrumentation import timer
+from utils.paginators import IdCursorPagination
 
 
 class RouletteViewSet(viewsets.ReadOnlyModelViewSet):
-    queryset = models.Roulette.objects.all()
+    queryset = caches.get_roulettes_queryset()
     serializer_class = serializers.RouletteSerializer
     lookup_field = "slug"
+    pagination_class = IdCursorPagination
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = RouletteFilter
+
+    def dispatch(self, request, *args, **kwargs):
+        # Read-only config: served from the replicas (cached values are
+        # computed from the primary)
+        with use_replica():
+            return super().dispatch(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        with timer("serializer"):
+            return super().list(request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        slug = kwargs.get(self.lookup_field)
+        with timer("serializer"):
+            data = caches.get_roulette_data(slug)
+
+        # Only existing roulettes (labels bounded by the roulettes)
+        metrics.roulette_views_total.inc(roulette=data["slug"])
+        return Response(data)
+
+    @action(detail=True, methods=["get"])
+    def winners(self, request, slug=None):
+        """Return the last winners of the roulette (masked names)"""
+
+        # Served from the cache, rebuilt from db after new winners
+        roulette_winners = winners.get_cached_winners(slug)
+
+        return Response(
+            {
+                "status": "success",
+                "message": "Roulette winners",
+                "data": roulette_winners,
+            },
+            status=status.HTTP_200_OK,
+        )
 
 
 class ParticipantViewSet(viewsets.ViewSet):
     @action(detail=False, methods=["post"])
     def validate(self, request):
         """Create new participant, update and check if can spin"""
-        serializer = serializers.ParticipantValidateSerializer(data=request.data)
-        if serializer.is_valid():
-            validated_data = serializer.save()
-
+        serializer = serializers.ParticipantValidateSerializer(
+            data=request.data, context={"request": request}
+        )
+        with timer("serializer"):
+            is_valid = serializer.is_valid()
+            if is_valid:
+                validated_data = serializer.save()
+        if is_valid:
             # get response data
             response_data = {
                 "can_spin": validated_data["can_spin"],
                 "can_spin_ads": validated_data["can_spin_ads"],
+                "next_spin_at": validated_data["next_spin_at"],
+                "extra_spins_remaining": validated_data["extra_spins_remaining"],
+                "server_time": validated_data["server_time"],
             }
 
+            # Count validation result
+            result = "no_spins"
+            if response_data["can_spin"]:
+                result = "can_spin"
+            elif response_data["can_spin_ads"]:
+                result = "can_spin_ads"
+            metrics.validations_total.inc(
+                roulette=validated_data["roulette"].slug, result=result
+            )
+
             # Return success response
-            return Response(
+            response = Response(
                 {
                     "status": "success",
                     "message": "Participant validated",
@@ -36,7 +102,19 @@ class ParticipantViewSet(viewsets.ViewSet):
                 status=status.HTTP_200_OK,
             )
 
+            # Client can reuse the response until the next regular spin
+            max_age = 0
+            if validated_data["next_spin_at"]:
+                next_spin_delta = (
+                    validated_data["next_spin_at"] - validated_data["server_time"]
+                )
+                max_age = math.ceil(next_spin_delta.total_seconds())
+            patch_cache_control(response, private=True, max_age=max_age)
+
+            return response
+
         # Error response
+        metrics.validations_total.inc(roulette="", result="invalid")
         return Response(
             {
                 "status": "error",
@@ -46,13 +124,62 @@ class ParticipantViewSet(viewsets.ViewSet):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    @action(detail=False, methods=["get"])
+    def history(self, request):
+        """Return participant spins and awards in a roulette (keyset pages)"""
+
+        serializer = serializers.ParticipantHistorySerializer(
+            data=request.query_params, context={"request": request}
+        )
+        if not serializer.is_valid():
+            return Response(
+                {
+                    "status": "error",
+                    "message": "Invalid data",
+                    "data": serializer.errors,
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # Unknown participant: empty history
+        validated_data = serializer.validated_data
+        items, next_cursor = [], None
+        participant = models.Participant.objects.filter_email(
+            validated_data["email"]
+        ).first()
+        if participant:
+            items, next_cursor = history.get_history_page(
+                participant,
+                validated_data["roulette"],
+                validated_data.get("cursor"),
+                validated_data.get("limit", settings.HISTORY_PAGE_SIZE),
+            )
+
+        next_url = None
+        if next_cursor:
+            next_url = replace_query_param(
+                request.build_absolute_uri(), "cursor", next_cursor
+            )
+        return Response(
+            {
+                "status": "success",
+                "message": "Participant history",
+                "data": {"next": next_url, "results": items},
+            },
+            status=status.HTTP_200_OK,
+        )
+
     @action(detail=False, methods=["post"])
     def spin(self, request):
         """Create spin and return if user win a award"""
-        serializer = serializers.ParticipantSpinSerializer(data=request.data)
-        if serializer.is_valid():
-            validated_data = serializer.save()
-
+        serializer = serializers.ParticipantSpinSerializer(
+            data=request.data, context={"request": request}
+        )
+        with timer("serializer"):
+            is_valid = serializer.is_valid()
+            if is_valid:
+                validated_data = serializer.save()
+        if is_valid:
             # get response data
             response_data = {
                 "award": None,
@@ -62,6 +189,14 @@ class ParticipantViewSet(viewsets.ViewSet):
                     validated_data["award"]
                 ).data
 
+            # Count spin and award
+            roulette_slug = validated_data["roulette"].slug
+            metrics.spins_total.inc(
+                roulette=roulette_slug, extra=validated_data["is_extra_spin"]
+            )
+            if validated_data["award"]:
+                metrics.awards_total.inc(roulette=roulette_slug)
+
             return Response(
                 {
                     "status": "success",
@@ -71,6 +206,11 @@ class ParticipantViewSet(viewsets.ViewSet):
                 status=status.HTTP_200_OK,
             )
 
+        # Count rejection: no more spins or invalid data
+        errors = serializer.errors.get("non_field_errors", [])
+        reason = "no_spins" if errors else "invalid"
+        metrics.spin_rejections_total.inc(reason=reason)
+
         return Response(
             {
                 "status": "error",
@@ -79,3 +219,22 @@ class ParticipantViewSet(viewsets.ViewSet):
             },
             status=status.HTTP_400_BAD_REQUEST,
         )
+
+
+async def roulette_events(request, slug):
+    """Stream roulette events (server-sent events): config changes and winners
+
+    Public (EventSource can't send auth headers) and async: served by the
+    ASGI entry point (project.asgi), idle connections only wait on their
+    queue.
+    """
+
+    if not await models.Roulette.objects.filter(slug=slug).aexists():
+        raise Http404("Roulette not found")
+
+    response = StreamingHttpResponse(
+        events.stream_events(slug), content_type="text/event-stream"
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # disable nginx buffering
+    return response
@@ -0,0 +1,55 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.http import Http404
+
+from roulette import models
+from roulette.events import mask_name
+from roulette.resolvers import resolve_roulette
+from utils.cache import get_cache_key, get_or_compute
+
+
+def get_winners_cache_key(slug: str) -> str:
+    return get_cache_key("roulette-winners", slug)
+
+
+def get_winner_data(participant_award: models.ParticipantAward) -> dict:
+    """Return public data of a won award (participant name masked)"""
+    return {
+        "participant": mask_name(participant_award.participant.name),
+        "award": participant_award.award.name,
+        "created_at": participant_award.created_at.isoformat(),
+    }
+
+
+def get_winners(roulette: models.Roulette) -> list[dict]:
+    """Return the last winners of the roulette from the database, newest first"""
+
+    participant_awards = (
+        models.ParticipantAward.objects.filter(award__roulette=roulette)
+        .select_related("participant", "award")
+        .order_by("-created_at", "-id")[: settings.WINNERS_FEED_SIZE]
+    )
+    return [get_winner_data(item) for item in participant_awards]
+
+
+def get_cached_winners(slug: str) -> list[dict]:
+    """Return the last winners of the roulette, cached until a winner is
+    added or removed (the key is deleted, the next read rebuilds it)
+
+    Raises:
+        Http404: roulette not found (not cached)
+    """
+
+    def compute():
+        roulette = resolve_roulette(slug)
+        if roulette is None:
+            raise Http404("Roulette not found")
+        return get_winners(roulette)
+
+    return get_or_compute(
+        get_winners_cache_key(slug), compute, settings.WINNERS_CACHE_SECONDS
+    )
+
+
+def clear_winners(slug: str):
+    cache.delete(get_winners_cache_key(slug))
@@ -0,0 +1,47 @@
+from urllib.parse import urlencode
+
+from django.contrib import admin
+from django.urls import reverse
+
+
+class AutocompleteFilter(admin.RelatedFieldListFilter):
+    """Foreign key list filter that searches related objects on demand.
+
+    The default related filter renders every related object in the sidebar,
+    which does not scale for large tables (e.g. participants). This filter
+    only loads the selected object and delegates the search to the admin
+    autocomplete view, so the related admin must define `search_fields`.
+    """
+
+    template = "admin/filters/autocomplete.html"
+
+    def __init__(self, field, request, params, model, model_admin, field_path):
+        super().__init__(field, request, params, model, model_admin, field_path)
+
+        # Url of the admin autocomplete view for the filtered field
+        query = urlencode(
+            {
+                "app_label": model._meta.app_label,
+                "model_name": model._meta.model_name,
+                "field_name": field_path.split("__")[0],
+            }
+        )
+        autocomplete_url = reverse(f"{model_admin.admin_site.name}:autocomplete")
+        self.autocomplete_url = f"{autocomplete_url}?{query}"
+
+    def has_output(self):
+        return True
+
+    def field_choices(self, field, request, model_admin):
+        """Return only the selected object instead of the full table"""
+
+        if not self.lookup_val:
+            return []
+
+        related_model = field.remote_field.model
+        related_obj = related_model._default_manager.filter(
+            **{field.target_field.name: self.lookup_val}
+        ).first()
+        if related_obj is None:
+            return []
+        return [(self.lookup_val, str(related_obj))]
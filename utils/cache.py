@@ -0,0 +1,147 @@
+import hashlib
+import uuid
+from functools import partial
+from time import monotonic, perf_counter, sleep, time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from project.db_routers import use_primary
+from utils.metrics import (
+    cache_lock_waits_total,
+    cache_recompute_duration_seconds,
+    cache_recomputes_total,
+    cache_requests_total,
+)
+
+# Keys longer than this (or with spaces) are hashed: memcached limit is 250
+MAX_KEY_LENGTH = 200
+
+# Cached values can be None
+MISSING = object()
+
+
+def get_namespace(model_or_name) -> str:
+    """Return the cache namespace of a model (e.g. "roulette.roulette")
+    or the given name"""
+    if isinstance(model_or_name, str):
+        return model_or_name
+    return model_or_name._meta.label_lower
+
+
+def get_namespace_version(model_or_name) -> int:
+    """Return the current version of the model (or namespace) keys
+
+    New versions start from the current time, so keys of a version lost
+    (evicted) are never used again.
+    """
+
+    version_key = f"{get_namespace(model_or_name)}:version"
+    version = cache.get(version_key)
+    if version is None:
+        cache.add(version_key, int(time() * 1000), None)
+        version = cache.get(version_key, int(time() * 1000))
+    return version
+
+
+def bump_namespace(model_or_name):
+    """Invalidate all the keys of the namespace (new version, cache.incr:
+    atomic, concurrent bumps are not lost)"""
+
+    version_key = f"{get_namespace(model_or_name)}:version"
+    try:
+        cache.incr(version_key)
+    except ValueError:
+        cache.set(version_key, int(time() * 1000), None)
+
+
+def invalidate_namespace(model_or_name):
+    """Invalidate the namespace now and after commit (values computed
+    meanwhile with the old data are not used)"""
+    bump_namespace(model_or_name)
+    transaction.on_commit(partial(bump_namespace, model_or_name))
+
+
+def get_cache_key(model_or_name, *parts) -> str:
+    """Return a namespaced and versioned cache key
+
+    Args:
+        model_or_name (Model | str): model class or namespace name
+        *parts: key parts, e.g. slug
+
+    Returns:
+        str: key, e.g. "roulette.roulette:v1700000000000:my-roulette"
+    """
+
+    namespace = get_namespace(model_or_name)
+    prefix = f"{namespace}:v{get_namespace_version(namespace)}"
+    key = ":".join([prefix, *(str(part) for part in parts)])
+    if len(key) > MAX_KEY_LENGTH or any(char.isspace() for char in key):
+        key = f"{prefix}:{hashlib.md5(key.encode()).hexdigest()}"
+    return key
+
+
+def get_or_compute(key: str, compute, timeout: int = None):
+    """Return the cached value or compute and cache it (single-flight)
+
+    Only one worker computes an expired value (lock key added with
+    cache.add, atomic in the configured backends: memcached, redis, locmem
+    and project.cache_backends.FileCache): the others wait up to
+    CACHE_LOCK_WAIT_SECONDS for the new value instead of sending the
+    same queries to the database, and compute it themselves after that.
+    Values are computed from the primary database (not the replicas).
+    Exceptions of compute are raised and nothing is cached.
+
+    Args:
+        key (str): cache key (from get_cache_key)
+        compute (callable): function without arguments returning the value
+        timeout (int): value timeout seconds, CACHE_TIMEOUT by default
+
+    Returns:
+        any: cached or computed value
+    """
+
+    namespace = key.split(":", 1)[0]
+    timeout = settings.CACHE_TIMEOUT if timeout is None else timeout
+
+    value = cache.get(key, MISSING)
+    if value is not MISSING:
+        cache_requests_total.inc(namespace=namespace, result="hit")
+        return value
+    cache_requests_total.inc(namespace=namespace, result="miss")
+
+    # Other worker computing the value: wait for it
+    lock_key = f"{key}:lock"
+    token = uuid.uuid4().hex
+    if not cache.add(lock_key, token, settings.CACHE_LOCK_SECONDS):
+        deadline = monotonic() + settings.CACHE_LOCK_WAIT_SECONDS
+        while monotonic() < deadline:
+            sleep(settings.CACHE_LOCK_POLL_SECONDS)
+            value = cache.get(key, MISSING)
+            if value is not MISSING:
+                cache_lock_waits_total.inc(namespace=namespace, result="hit")
+                return value
+            if cache.add(lock_key, token, settings.CACHE_LOCK_SECONDS):
+                # Lock released without value (compute failed): retry here
+                break
+        else:
+            cache_lock_waits_total.inc(namespace=namespace, result="timeout")
+            token = None
+
+    try:
+        # From the primary: values are invalidated after commit, a lagging
+        # replica would cache old data with the new version
+        start = perf_counter()
+        with use_primary():
+            value = compute()
+        cache_recompute_duration_seconds.observe(
+            perf_counter() - start, namespace=namespace
+        )
+        cache_recomputes_total.inc(namespace=namespace)
+        cache.set(key, value, timeout)
+        return value
+    finally:
+        # Release only our own lock (it may have expired and been taken)
+        if token and cache.get(lock_key) == token:
+            cache.delete(lock_key)
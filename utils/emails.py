@@ -6,6 +6,52 @@ from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from django.utils.html import strip_tags
 
+from utils.metrics import emails_sent_total
+
+# Providers that ignore "+tag" suffixes (and dots, for gmail) in the local part
+EMAIL_PLUS_ALIAS_DOMAINS = {
+    "gmail.com",
+    "googlemail.com",
+    "outlook.com",
+    "hotmail.com",
+    "live.com",
+    "icloud.com",
+    "protonmail.com",
+    "proton.me",
+    "fastmail.com",
+}
+EMAIL_DOT_ALIAS_DOMAINS = {"gmail.com", "googlemail.com"}
+
+
+def normalize_email(email: str, canonicalize_aliases: bool = None) -> str:
+    """Return the normalized email used as participant identity
+
+    Args:
+        email (str): raw email
+        canonicalize_aliases (bool): remove provider aliases
+            (e.g. f.oo+promo@gmail.com -> foo@gmail.com).
+            Defaults to EMAIL_CANONICALIZE_ALIASES setting
+
+    Returns:
+        str: stripped and lowercase email
+    """
+
+    email = email.strip().lower()
+    if canonicalize_aliases is None:
+        canonicalize_aliases = settings.EMAIL_CANONICALIZE_ALIASES
+    if not canonicalize_aliases or "@" not in email:
+        return email
+
+    local, domain = email.rsplit("@", 1)
+    if domain == "googlemail.com":
+        domain = "gmail.com"
+    if domain in EMAIL_PLUS_ALIAS_DOMAINS:
+        local = local.split("+", 1)[0]
+    if domain in EMAIL_DOT_ALIAS_DOMAINS:
+        local = local.replace(".", "")
+
+    return f"{local}@{domain}"
+
 
 def render_email(
     name: str,
@@ -154,7 +200,12 @@ def send_email(
             image.add_header("Content-ID", "<image1>")
             message.attach(image)
 
-    message.send()
+    try:
+        message.send()
+    except Exception:
+        emails_sent_total.inc(result="error")
+        raise
+    emails_sent_total.inc(result="sent")
 
 
 def test_email_with_logo(to_email: str):
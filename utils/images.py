@@ -0,0 +1,180 @@
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import connections
+from django.db.models.fields.files import FieldFile
+from PIL import Image, ImageOps
+
+from utils.cache import bump_namespace
+from utils.media import get_file_url
+
+logger = logging.getLogger(__name__)
+
+# Background workers to generate variants out of the request thread
+executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_VARIANTS_WORKERS, thread_name_prefix="image-variants"
+)
+
+
+def get_variant_formats() -> list[str]:
+    """Return the IMAGE_VARIANT_FORMATS supported by the installed Pillow"""
+
+    Image.init()
+    return [
+        image_format
+        for image_format in settings.IMAGE_VARIANT_FORMATS
+        if image_format.upper() in Image.SAVE
+    ]
+
+
+def get_variant_widths(image_width: int) -> list[int]:
+    """Return the IMAGE_VARIANT_WIDTHS smaller than the image (no upscaling),
+    or the image width if it's smaller than all of them"""
+
+    widths = [width for width in settings.IMAGE_VARIANT_WIDTHS if width < image_width]
+    return widths or [image_width]
+
+
+def create_image_variants(field_file: FieldFile) -> dict:
+    """Save resized copies of the image next to it, in each variant format
+
+    Content hashed storages save identical variants once (the existing
+    name is returned).
+
+    Args:
+        field_file (FieldFile): image of a model ImageField
+
+    Returns:
+        dict: variants names by format and width,
+            e.g. {"webp": {"320": "awards/cup-320w.webp"}}
+    """
+
+    storage = field_file.storage
+    with field_file.open("rb"):
+        image = Image.open(field_file)
+        image.load()
+    image = ImageOps.exif_transpose(image)
+    if image.mode not in ("RGB", "RGBA"):
+        image = image.convert("RGBA")
+
+    base_name = os.path.splitext(field_file.name)[0]
+    variants = {image_format: {} for image_format in get_variant_formats()}
+    for width in get_variant_widths(image.width):
+        height = max(round(image.height * width / image.width), 1)
+        resized = image.resize((width, height), Image.LANCZOS)
+        for image_format in variants:
+            buffer = BytesIO()
+            resized.save(
+                buffer,
+                format=image_format.upper(),
+                quality=settings.IMAGE_VARIANT_QUALITY,
+            )
+            name = storage.save(
+                f"{base_name}-{width}w.{image_format}", ContentFile(buffer.getvalue())
+            )
+            variants[image_format][str(width)] = name
+    return variants
+
+
+def delete_image_variants(storage, variants: dict):
+    """Delete the variants files (e.g. of a replaced image)"""
+    for names in variants.values():
+        for name in names.values():
+            storage.delete(name)
+
+
+def update_image_variants(model, pk: int):
+    """Generate the variants of the instance images and save their names
+    in its "image_variants" field
+
+    Only images changed since the last run are processed, and the
+    variants of replaced images are deleted.
+
+    Args:
+        model (Model): model with "image_variant_fields" and "image_variants"
+        pk (int): instance id
+    """
+
+    instance = model.objects.filter(pk=pk).first()
+    if not instance:
+        return
+
+    image_variants = dict(instance.image_variants or {})
+    changed = False
+    for field_name in model.image_variant_fields:
+        field_file = getattr(instance, field_name)
+        current = image_variants.get(field_name)
+        if current and current["source"] == field_file.name:
+            continue
+
+        # Image replaced or removed (variants kept if shared: same content
+        # saved once by content hashed storages)
+        if current:
+            shared = (
+                model.objects.filter(
+                    **{f"image_variants__{field_name}__source": current["source"]}
+                )
+                .exclude(pk=pk)
+                .exists()
+            )
+            if not shared:
+                delete_image_variants(field_file.storage, current["variants"])
+            image_variants.pop(field_name)
+        if field_file:
+            image_variants[field_name] = {
+                "source": field_file.name,
+                "variants": create_image_variants(field_file),
+            }
+        changed = True
+
+    # Update without save() (no signals, no other fields overwritten)
+    if changed:
+        model.objects.filter(pk=pk).update(image_variants=image_variants)
+        bump_namespace(model)
+
+
+def run_image_variants_task(model, pk: int):
+    try:
+        update_image_variants(model, pk)
+    except Exception:
+        logger.exception(f"Image variants of {model.__name__} {pk} failed")
+    finally:
+        connections.close_all()
+
+
+def schedule_image_variants(instance):
+    """Generate the instance image variants in a background thread
+    (in the current thread if IMAGE_VARIANTS_ASYNC is disabled)"""
+
+    model = type(instance)
+    if not settings.IMAGE_VARIANTS_ASYNC:
+        update_image_variants(model, instance.pk)
+        return
+    executor.submit(run_image_variants_task, model, instance.pk)
+
+
+def get_srcset(image_variants: dict, storage) -> dict:
+    """Return the srcset of each image and format, with absolute urls
+
+    Args:
+        image_variants (dict): "image_variants" field of an instance
+        storage (Storage): images storage
+
+    Returns:
+        dict: srcset by image field and format,
+            e.g. {"logo": {"webp": "https://host/media/logo-320w.webp 320w, ..."}}
+    """
+
+    srcset = {}
+    for field_name, data in (image_variants or {}).items():
+        srcset[field_name] = {}
+        for image_format, names in data["variants"].items():
+            items = []
+            for width, name in sorted(names.items(), key=lambda item: int(item[0])):
+                items.append(f"{get_file_url(name, storage)} {width}w")
+            srcset[field_name][image_format] = ", ".join(items)
+    return srcset
@@ -0,0 +1,163 @@
+import json
+import logging
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.dispatch import Signal
+
+logger = logging.getLogger("instrumentation")
+
+# Metrics of the request being processed (None when not instrumented)
+current_metrics = ContextVar("current_metrics", default=None)
+
+# Sent after each instrumented request with: endpoint, metrics, exceeded
+request_measured = Signal()
+
+
+class RequestMetrics:
+    """Query count and timings (seconds) of a single request"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0
+        self.timers = {}
+        self.total_time = 0
+        self.start = perf_counter()
+
+    def add_time(self, name: str, seconds: float):
+        self.timers[name] = self.timers.get(name, 0) + seconds
+
+    def finish(self):
+        self.total_time = perf_counter() - self.start
+
+    def as_dict(self) -> dict:
+        """Return metrics in milliseconds"""
+        data = {
+            "queries": self.queries,
+            "db_ms": round(self.db_time * 1000, 2),
+            "total_ms": round(self.total_time * 1000, 2),
+        }
+        for name, seconds in self.timers.items():
+            data[f"{name}_ms"] = round(seconds * 1000, 2)
+        return data
+
+    def server_timing(self) -> str:
+        """Return metrics as Server-Timing header value"""
+        items = [f'db;dur={self.db_time * 1000:.2f};desc="{self.queries} queries"']
+        for name, seconds in self.timers.items():
+            items.append(f"{name};dur={seconds * 1000:.2f}")
+        items.append(f"total;dur={self.total_time * 1000:.2f}")
+        return ", ".join(items)
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """Database execute wrapper that counts queries and their time"""
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += perf_counter() - start
+
+
+@contextmanager
+def timer(name: str):
+    """Measure a block of code (e.g. serializer) in the current request
+
+    Args:
+        name (str): Server-Timing metric name
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        yield
+        return
+
+    start = perf_counter()
+    try:
+        yield
+    finally:
+        metrics.add_time(name, perf_counter() - start)
+
+
+def check_budget(endpoint: str, metrics: dict) -> dict:
+    """Return the metrics that exceed the endpoint budget
+
+    Args:
+        endpoint (str): endpoint (url) name, e.g. "participant-spin"
+        metrics (dict): request metrics (RequestMetrics.as_dict)
+
+    Returns:
+        dict: exceeded metrics: name, (value, limit)
+    """
+    budget = settings.INSTRUMENTATION_BUDGETS.get(endpoint, {})
+    return {
+        name: (metrics[name], limit)
+        for name, limit in budget.items()
+        if name in metrics and metrics[name] > limit
+    }
+
+
+class InstrumentationMiddleware:
+    """Record queries, db time, timers and total time of each request
+
+    Enabled with INSTRUMENTATION_ENABLED. Metrics are returned in the
+    Server-Timing header and logged as json, with a warning when the
+    endpoint budget (INSTRUMENTATION_BUDGETS) is exceeded.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.INSTRUMENTATION_ENABLED:
+            return self.get_response(request)
+
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(query_wrapper))
+                response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        metrics.finish()
+
+        # Report metrics
+        endpoint = self.get_endpoint(request)
+        metrics_data = metrics.as_dict()
+        exceeded = check_budget(endpoint, metrics_data)
+        response["Server-Timing"] = metrics.server_timing()
+        log_data = {
+            "endpoint": endpoint,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            **metrics_data,
+        }
+        if exceeded:
+            log_data["exceeded"] = exceeded
+            logger.warning(json.dumps(log_data))
+        else:
+            logger.info(json.dumps(log_data))
+
+        request_measured.send(
+            sender=self.__class__,
+            endpoint=endpoint,
+            metrics=metrics_data,
+            exceeded=exceeded,
+        )
+        return response
+
+    def get_endpoint(self, request) -> str:
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match and resolver_match.view_name:
+            return resolver_match.view_name
+        return request.path
@@ -1,7 +1,94 @@
+import mimetypes
 import os
+import re
+import threading
+from urllib.parse import quote, urlsplit
 
 from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
 from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from project.storage_backends import get_cache_control
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+# Precompressed files (e.g. "logo.svg.br"), by preference
+PRECOMPRESSED_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+# Resolved file urls, by storage and file name
+url_cache = {}
+url_cache_lock = threading.Lock()
+
+
+def get_absolute_url(url: str) -> str:
+    """Return the url with the HOST domain if it's relative (local storage)"""
+    if settings.HOST and not urlsplit(url).netloc:
+        return f"{settings.HOST}{url}"
+    return url
+
+
+def get_storage_key(storage) -> str:
+    """Return the cache name of the storage: class and location (or bucket)"""
+    storage_class = type(storage)
+    bucket = getattr(storage, "bucket_name", None) or ""
+    return (
+        f"{storage_class.__module__}.{storage_class.__qualname__}:"
+        f"{bucket}/{storage.location}"
+    )
+
+
+def get_file_url(name: str, storage) -> str:
+    """Return the absolute url of a storage file, resolved once per name
+
+    Local and s3 files share this code path. Content hashed names never
+    change their url, so it's cached in memory (MEDIA_URL_CACHE_SIZE urls)
+    until the settings change. Signed urls (querystring auth) expire, so
+    they are not cached.
+
+    Args:
+        name (str): file name in the storage, e.g. "awards/<hash>.webp"
+        storage (Storage): file storage
+
+    Returns:
+        str: absolute url of the file
+    """
+
+    signed = getattr(storage, "querystring_auth", False) and not getattr(
+        storage, "custom_domain", None
+    )
+    if signed:
+        return get_absolute_url(storage.url(name))
+
+    key = (get_storage_key(storage), name)
+    url = url_cache.get(key)
+    if url is not None:
+        return url
+
+    url = get_absolute_url(storage.url(name))
+    with url_cache_lock:
+        # Drop the oldest url when full
+        if len(url_cache) >= settings.MEDIA_URL_CACHE_SIZE:
+            url_cache.pop(next(iter(url_cache)), None)
+        url_cache[key] = url
+    return url
+
+
+def clear_url_cache():
+    with url_cache_lock:
+        url_cache.clear()
+
+
+@receiver(setting_changed)
+def clear_url_cache_on_setting_changed(setting, **kwargs):
+    if setting in ("HOST", "MEDIA_URL", "MEDIA_ROOT", "DEFAULT_FILE_STORAGE"):
+        clear_url_cache()
 
 
 def get_media_url(object_or_url: object) -> str:
@@ -13,17 +100,10 @@ def get_media_url(object_or_url: object) -> str:
     Returns:
         str: url of the image
     """
-        
-    # Get the url string
-    url_str = ""
-    if type(object_or_url) is str:
-        url_str = object_or_url
-    else:
-        url_str = object_or_url.url
-    
-    if "s3.amazonaws.com" not in url_str:
-        return f"{settings.HOST}{url_str}"
-    return url_str
+
+    if isinstance(object_or_url, str):
+        return get_absolute_url(object_or_url)
+    return get_file_url(object_or_url.name, object_or_url.storage)
 
 
 def get_test_image(image_name: str = "test.webp") -> SimpleUploadedFile:
@@ -38,4 +118,175 @@ def get_test_image(image_name: str = "test.webp") -> SimpleUploadedFile:
         content_type='image/webp'
     )
     
-    return image_file
\ No newline at end of file
+    return image_file
+
+
+def parse_range(header: str, size: int) -> tuple[int, int]:
+    """Return the requested byte range of the file
+
+    Only single ranges are supported, multiple ranges return the full
+    file (allowed by the http spec).
+
+    Args:
+        header (str): Range header, e.g. "bytes=0-99", "bytes=100-", "bytes=-100"
+        size (int): file size
+
+    Returns:
+        tuple[int, int]: first and last byte (included), None to return
+            the full file
+
+    Raises:
+        ValueError: range not satisfiable
+    """
+
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    start, end = match.groups()
+
+    # Suffix range: last bytes
+    if not start:
+        length = int(end)
+        if length == 0:
+            raise ValueError("Range not satisfiable")
+        return max(size - length, 0), size - 1
+
+    start = int(start)
+    end = min(int(end), size - 1) if end else size - 1
+    if start >= size or start > end:
+        raise ValueError("Range not satisfiable")
+    return start, end
+
+
+def iter_file_range(file, start: int, length: int, chunk_size: int = 64 * 1024):
+    """Yield the file bytes of the range and close it"""
+
+    try:
+        file.seek(start)
+        while length > 0:
+            data = file.read(min(chunk_size, length))
+            if not data:
+                break
+            length -= len(data)
+            yield data
+    finally:
+        file.close()
+
+
+def get_precompressed_path(request, full_path: str) -> tuple[str, str]:
+    """Return the precompressed file accepted by the client and its encoding
+
+    Returns:
+        tuple[str, str]: file path and encoding, ("", "") if not available
+    """
+
+    accept_encoding = request.headers.get("Accept-Encoding", "")
+    for encoding, extension in PRECOMPRESSED_ENCODINGS:
+        if encoding in accept_encoding and os.path.isfile(full_path + extension):
+            return full_path + extension, encoding
+    return "", ""
+
+
+def get_media_response(request, path: str, document_root: str):
+    """Return a media file response, served as configured in MEDIA_SERVE_MODE
+
+    - "x-accel": delegate the file to nginx (X-Accel-Redirect to
+      MEDIA_ACCEL_PREFIX, an internal location aliased to MEDIA_ROOT).
+    - "x-sendfile": delegate the file to apache / lighttpd (X-Sendfile).
+    - "file" (or "debug"): serve the file from python with sendfile
+      (wsgi.file_wrapper), precompressed versions and ranges.
+    All modes support ETag / Last-Modified conditional requests and set
+    long-lived cache headers (only content hashed names, other files are
+    revalidated).
+
+    Args:
+        request (HttpRequest): current request
+        path (str): file path inside document root
+        document_root (str): media folder
+
+    Returns:
+        HttpResponse: file response
+
+    Raises:
+        Http404: file not found or outside the document root
+    """
+
+    try:
+        full_path = safe_join(document_root, path)
+    except SuspiciousFileOperation:
+        raise Http404("File not found")
+    if not os.path.isfile(full_path):
+        raise Http404("File not found")
+
+    stat = os.stat(full_path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    headers = {
+        "ETag": etag,
+        "Last-Modified": http_date(stat.st_mtime),
+        "Cache-Control": get_cache_control(path),
+    }
+
+    # Not modified
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime)
+    )
+    if response is not None:
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    content_type, encoding = mimetypes.guess_type(full_path)
+    content_type = content_type or "application/octet-stream"
+
+    # Delegate to the front proxy
+    mode = settings.MEDIA_SERVE_MODE
+    if mode in ("x-accel", "x-sendfile"):
+        response = HttpResponse(content_type=content_type)
+        if mode == "x-accel":
+            response["X-Accel-Redirect"] = settings.MEDIA_ACCEL_PREFIX + quote(
+                os.path.relpath(full_path, document_root).replace(os.sep, "/")
+            )
+        else:
+            response["X-Sendfile"] = full_path
+        for name, value in headers.items():
+            response[name] = value
+        return response
+
+    # Range request (ignored if the file changed: If-Range)
+    headers["Accept-Ranges"] = "bytes"
+    range_header = request.headers.get("Range")
+    if_range = request.headers.get("If-Range")
+    if range_header and (not if_range or if_range == etag):
+        try:
+            byte_range = parse_range(range_header, stat.st_size)
+        except ValueError:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{stat.st_size}"
+            return response
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                iter_file_range(open(full_path, "rb"), start, length),
+                status=206,
+                content_type=content_type,
+            )
+            response["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+            response["Content-Length"] = str(length)
+            for name, value in headers.items():
+                response[name] = value
+            return response
+
+    # Full file, precompressed if available
+    file_path, content_encoding = get_precompressed_path(request, full_path)
+    response = FileResponse(open(file_path or full_path, "rb"))
+    response["Content-Type"] = content_type
+    response["Vary"] = "Accept-Encoding"
+    if content_encoding:
+        response["Content-Encoding"] = content_encoding
+        headers["ETag"] = f'{etag[:-1]}-{content_encoding}"'
+    elif encoding:
+        response["Content-Encoding"] = encoding
+    for name, value in headers.items():
+        response[name] = value
+    return response
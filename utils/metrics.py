@@ -0,0 +1,362 @@
+import atexit
+import glob
+import json
+import os
+import threading
+import uuid
+from contextlib import ExitStack
+from time import monotonic, perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Metric:
+    """Base metric: values by labels values (tuple)"""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+        registry.register(self)
+
+    def get_key(self, labels: dict) -> tuple:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def format_labels(self, key: tuple, extra: dict = None) -> str:
+        labels = dict(zip(self.labelnames, key))
+        labels.update(extra or {})
+        if not labels:
+            return ""
+        items = []
+        for name, value in labels.items():
+            value = str(value).replace("\\", "\\\\").replace('"', '\\"')
+            items.append(f'{name}="{value}"')
+        return "{" + ",".join(items) + "}"
+
+
+class Counter(Metric):
+    """Monotonic counter"""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        key = self.get_key(labels)
+        with registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+        registry.changed()
+
+    def merge(self, values: dict, other: dict):
+        for key, value in other.items():
+            values[key] = values.get(key, 0) + value
+
+    def render(self, values: dict) -> list[str]:
+        return [
+            f"{self.name}{self.format_labels(key)} {value}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(Metric):
+    """Histogram with cumulative buckets, sum and count"""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple = (),
+        buckets: tuple = DEFAULT_BUCKETS,
+    ):
+        self.buckets = tuple(buckets)
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value: float, **labels):
+        key = self.get_key(labels)
+        with registry.lock:
+            data = self.values.setdefault(
+                key, {"buckets": [0] * len(self.buckets), "sum": 0, "count": 0}
+            )
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data["buckets"][index] += 1
+            data["sum"] += value
+            data["count"] += 1
+        registry.changed()
+
+    def merge(self, values: dict, other: dict):
+        for key, data in other.items():
+            current = values.setdefault(
+                key, {"buckets": [0] * len(self.buckets), "sum": 0, "count": 0}
+            )
+            current["buckets"] = [
+                a + b for a, b in zip(current["buckets"], data["buckets"])
+            ]
+            current["sum"] += data["sum"]
+            current["count"] += data["count"]
+
+    def render(self, values: dict) -> list[str]:
+        lines = []
+        for key, data in sorted(values.items()):
+            for bound, count in zip(self.buckets, data["buckets"]):
+                labels = self.format_labels(key, {"le": bound})
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = self.format_labels(key, {"le": "+Inf"})
+            lines.append(f"{self.name}_bucket{labels} {data['count']}")
+            lines.append(f"{self.name}_sum{self.format_labels(key)} {data['sum']}")
+            lines.append(f"{self.name}_count{self.format_labels(key)} {data['count']}")
+        return lines
+
+
+class Registry:
+    """In-process metrics registry
+
+    With METRICS_MULTIPROC_DIR, each process (e.g. gunicorn worker) writes
+    its values to its own json file in the shared folder (at most every
+    METRICS_FLUSH_SECONDS), and render() sums the files of all processes.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.RLock()
+        self.pid = None
+        self.process_id = ""
+        self.last_flush = 0
+
+    def register(self, metric: Metric):
+        self.metrics[metric.name] = metric
+
+    def snapshot(self) -> dict:
+        """Return current process values: metric name, key, value"""
+        with self.lock:
+            return {
+                name: {json.dumps(key): value for key, value in metric.values.items()}
+                for name, metric in self.metrics.items()
+            }
+
+    def get_file_path(self) -> str:
+        # New file after fork (workers must not share the parent file)
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.process_id = f"{self.pid}-{uuid.uuid4().hex[:8]}"
+        return os.path.join(
+            settings.METRICS_MULTIPROC_DIR, f"metrics-{self.process_id}.json"
+        )
+
+    def changed(self):
+        """Flush values to the shared folder if the flush interval passed"""
+        if not settings.METRICS_MULTIPROC_DIR:
+            return
+        if monotonic() - self.last_flush >= settings.METRICS_FLUSH_SECONDS:
+            self.flush()
+
+    def flush(self):
+        """Write current process values to the shared folder"""
+        if not settings.METRICS_MULTIPROC_DIR:
+            return
+        self.last_flush = monotonic()
+        os.makedirs(settings.METRICS_MULTIPROC_DIR, exist_ok=True)
+
+        # Atomic replace, readers never see partial files
+        file_path = self.get_file_path()
+        temp_path = f"{file_path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temp_path, file_path)
+
+    def collect(self) -> dict:
+        """Return values of all processes: metric name, key, value"""
+
+        if not settings.METRICS_MULTIPROC_DIR:
+            snapshots = [self.snapshot()]
+        else:
+            self.flush()
+            snapshots = []
+            pattern = os.path.join(settings.METRICS_MULTIPROC_DIR, "metrics-*.json")
+            for file_path in glob.glob(pattern):
+                try:
+                    with open(file_path) as file:
+                        snapshots.append(json.load(file))
+                except (OSError, ValueError):
+                    continue
+
+        collected = {name: {} for name in self.metrics}
+        for snapshot in snapshots:
+            for name, values in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is None:
+                    continue
+                values = {
+                    tuple(json.loads(key)): value for key, value in values.items()
+                }
+                metric.merge(collected[name], values)
+        return collected
+
+    def render(self) -> str:
+        """Return all metrics in prometheus text exposition format"""
+
+        lines = []
+        for name, values in self.collect().items():
+            metric = self.metrics[name]
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.type}")
+            lines += metric.render(values)
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        """Clear current process values (testing)"""
+        with self.lock:
+            for metric in self.metrics.values():
+                metric.values.clear()
+
+
+def merge_snapshot(values: dict, other: dict):
+    """Add the values of other process snapshot (counters and histograms)
+    to the given one, without the metrics registry (e.g. server master)"""
+
+    for name, metric_values in other.items():
+        current_values = values.setdefault(name, {})
+        for key, value in metric_values.items():
+            current = current_values.get(key)
+            if current is None:
+                current_values[key] = value
+            elif isinstance(value, dict):
+                current["buckets"] = [
+                    a + b for a, b in zip(current["buckets"], value["buckets"])
+                ]
+                current["sum"] += value["sum"]
+                current["count"] += value["count"]
+            else:
+                current_values[key] = current + value
+
+
+def clear_multiproc_dir(folder: str):
+    """Remove the values files of previous runs (server start)"""
+
+    for file_path in glob.glob(os.path.join(folder, "metrics-*.json*")):
+        try:
+            os.remove(file_path)
+        except OSError:
+            continue
+
+
+def mark_process_dead(pid: int, folder: str):
+    """Move the values of a dead process (e.g. recycled worker) to the
+    archive file, so totals are kept and files don't grow with each worker
+
+    Not safe to run concurrently (run by the server master only).
+    """
+
+    file_paths = glob.glob(os.path.join(folder, f"metrics-{pid}-*.json*"))
+    if not file_paths:
+        return
+
+    archive_path = os.path.join(folder, "metrics-archive.json")
+    archive = {}
+    for file_path in [archive_path, *file_paths]:
+        if file_path.endswith(".tmp"):
+            continue
+        try:
+            with open(file_path) as file:
+                merge_snapshot(archive, json.load(file))
+        except (OSError, ValueError):
+            continue
+
+    temp_path = f"{archive_path}.tmp"
+    with open(temp_path, "w") as file:
+        json.dump(archive, file)
+    os.replace(temp_path, archive_path)
+    for file_path in file_paths:
+        os.remove(file_path)
+
+
+def flush_at_exit():
+    # Processes without django settings (e.g. server master) have no values
+    if settings.configured:
+        registry.flush()
+
+
+registry = Registry()
+atexit.register(flush_at_exit)
+
+# Generic metrics
+http_requests_total = Counter(
+    "http_requests_total", "Requests by endpoint", ("endpoint", "method", "status")
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "Request latency by endpoint", ("endpoint",)
+)
+db_queries_total = Counter("db_queries_total", "Sql queries by endpoint", ("endpoint",))
+db_query_duration_seconds = Histogram(
+    "db_query_duration_seconds",
+    "Sql query latency",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1),
+)
+emails_sent_total = Counter("emails_sent_total", "Emails sent by result", ("result",))
+cache_requests_total = Counter(
+    "cache_requests_total",
+    "Cache reads by namespace and result",
+    ("namespace", "result"),
+)
+cache_recomputes_total = Counter(
+    "cache_recomputes_total", "Cached values computed by namespace", ("namespace",)
+)
+cache_lock_waits_total = Counter(
+    "cache_lock_waits_total",
+    "Reads that waited for other worker computing the value, by result",
+    ("namespace", "result"),
+)
+cache_recompute_duration_seconds = Histogram(
+    "cache_recompute_duration_seconds",
+    "Cached values compute latency by namespace",
+    ("namespace",),
+)
+
+
+class MetricsMiddleware:
+    """Record request latency and sql queries of each endpoint
+
+    Enabled with METRICS_ENABLED (not loaded otherwise).
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        queries = [0]
+
+        def query_wrapper(execute, sql, params, many, context):
+            start = perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries[0] += 1
+                db_query_duration_seconds.observe(perf_counter() - start)
+
+        start = perf_counter()
+        with ExitStack() as stack:
+            # All databases (replica reads too)
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(query_wrapper))
+            response = self.get_response(request)
+        duration = perf_counter() - start
+
+        # Endpoint as url name (not path) to keep labels bounded
+        resolver_match = getattr(request, "resolver_match", None)
+        endpoint = resolver_match.view_name if resolver_match else "unknown"
+        http_requests_total.inc(
+            endpoint=endpoint, method=request.method, status=response.status_code
+        )
+        http_request_duration_seconds.observe(duration, endpoint=endpoint)
+        if queries[0]:
+            db_queries_total.inc(queries[0], endpoint=endpoint)
+        return response
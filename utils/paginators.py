@@ -0,0 +1,91 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import CursorPagination
+
+from project.db_routers import get_replica_db
+
+
+def get_table_estimate(queryset: QuerySet) -> int:
+    """Return the planner rows estimate of the queryset table (postgresql only)
+
+    Args:
+        queryset (QuerySet): queryset to estimate
+
+    Returns:
+        int: rows estimate, -1 if not available
+    """
+
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return -1
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+            [queryset.model._meta.db_table],
+        )
+        row = cursor.fetchone()
+
+    # reltuples is -1 (or 0) when the table has never been analyzed
+    return row[0] if row else -1
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator that avoids exact counts on large tables
+
+    Counts are exact up to ADMIN_EXACT_COUNT_LIMIT rows (the count query is
+    limited, so it never scans more rows than that). Above the limit, the
+    planner estimate is used for unfiltered postgresql tables, and a cached
+    exact count for everything else.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not isinstance(queryset, QuerySet):
+            return super().count
+
+        # Counts from a replica (reports)
+        database = queryset.db
+        queryset = queryset.using(get_replica_db())
+
+        # Exact count below the limit
+        limit = settings.ADMIN_EXACT_COUNT_LIMIT
+        bounded_count = queryset.order_by()[: limit + 1].count()
+        if bounded_count <= limit:
+            return bounded_count
+
+        # Planner estimate for the full table
+        if not queryset.query.has_filters():
+            estimate = get_table_estimate(queryset)
+            if estimate > limit:
+                return estimate
+
+        # Cached exact count
+        sql, params = queryset.order_by().query.sql_with_params()
+        query_hash = hashlib.md5(f"{sql}{params}".encode()).hexdigest()
+        cache_key = f"paginator-count:{database}:{query_hash}"
+        count = cache.get(cache_key)
+        if count is None:
+            count = queryset.count()
+            cache.set(cache_key, count, settings.ADMIN_COUNT_CACHE_SECONDS)
+        return count
+
+
+class IdCursorPagination(CursorPagination):
+    """Api cursor pagination by id (primary key index), newest first
+
+    No count query and no offset: every page costs the same whatever
+    its depth. Responses only have "next", "previous" and "results".
+    """
+
+    ordering = "-id"
+    page_size = settings.REST_FRAMEWORK_PAGE_SIZE
+    page_size_query_param = "page_size"
+    max_page_size = 100
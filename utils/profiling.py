@@ -0,0 +1,191 @@
+import cProfile
+import itertools
+import json
+import os
+import pstats
+import uuid
+from io import StringIO
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from django.utils import timezone
+
+
+def get_top_functions(profile: cProfile.Profile, limit: int) -> list[dict]:
+    """Return the functions with more cumulative time of the profile
+
+    Args:
+        profile (cProfile.Profile): finished profile
+        limit (int): max functions to return
+
+    Returns:
+        list[dict]: function, calls, total_ms (own time), cumulative_ms
+    """
+
+    stats = pstats.Stats(profile)
+    rows = []
+    for (file, line, name), (_, calls, total, cumulative, _) in stats.stats.items():
+        rows.append(
+            {
+                "function": f"{file}:{line}({name})",
+                "calls": calls,
+                "total_ms": round(total * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+        )
+    rows.sort(key=lambda row: row["cumulative_ms"], reverse=True)
+    return rows[:limit]
+
+
+def get_profile_path(profile_id: str, extension: str) -> str:
+    """Return the path of a stored profile file (.json report or .prof)"""
+    file_name = f"{os.path.basename(profile_id)}{extension}"
+    return os.path.join(settings.PROFILER_DIR, file_name)
+
+
+def get_profile_files() -> list[str]:
+    """Return stored profile ids, newest first"""
+
+    folder = settings.PROFILER_DIR
+    if not os.path.isdir(folder):
+        return []
+    files = [name[:-5] for name in os.listdir(folder) if name.endswith(".json")]
+    return sorted(files, reverse=True)
+
+
+def load_profile(profile_id: str) -> dict:
+    """Return the stored profile report, None if not found"""
+
+    file_path = get_profile_path(profile_id, ".json")
+    if not os.path.isfile(file_path):
+        return None
+    with open(file_path) as file:
+        return json.load(file)
+
+
+def get_profile_stats_text(profile_id: str) -> str:
+    """Return the full pstats output of a stored profile"""
+
+    file_path = get_profile_path(profile_id, ".prof")
+    if not os.path.isfile(file_path):
+        return ""
+    output = StringIO()
+    pstats.Stats(file_path, stream=output).sort_stats("cumulative").print_stats(100)
+    return output.getvalue()
+
+
+def render_profile(report: dict) -> str:
+    """Return the profile report as plain text"""
+
+    lines = [
+        f"{report['method']} {report['path']} - {report['duration_ms']} ms",
+        f"{len(report['queries'])} queries - {report['db_ms']} ms",
+        "",
+        f"{'cumulative ms':>14} {'own ms':>10} {'calls':>8}  function",
+    ]
+    for row in report["functions"]:
+        lines.append(
+            f"{row['cumulative_ms']:>14} {row['total_ms']:>10} "
+            f"{row['calls']:>8}  {row['function']}"
+        )
+    lines += ["", f"{'ms':>10}  sql"]
+    for query in report["queries"]:
+        lines.append(f"{query['ms']:>10}  {query['sql']}")
+    return "\n".join(lines)
+
+
+class ProfilerMiddleware:
+    """Profile requests with cProfile, including their sql queries
+
+    Enabled with PROFILER_ENABLED (not loaded otherwise, no cost). Profiles:
+    - superuser requests with the "X-Profile" header or "_profile" query
+      param. Use "return" as value to get the report as response, the
+      report is stored otherwise (id in the X-Profile-Id header).
+    - 1 in PROFILER_SAMPLE_RATE requests (if > 0), stored.
+    Stored reports rotate in PROFILER_DIR (PROFILER_MAX_FILES) and are
+    listed in the admin.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILER_ENABLED:
+            raise MiddlewareNotUsed()
+        self.get_response = get_response
+        self.counter = itertools.count(1)
+
+    def __call__(self, request):
+        profile_mode = self.get_profile_mode(request)
+        if not profile_mode:
+            return self.get_response(request)
+
+        # Profile request and sql queries
+        queries = []
+
+        def query_wrapper(execute, sql, params, many, context):
+            start = perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                queries.append(
+                    {"sql": sql, "ms": round((perf_counter() - start) * 1000, 3)}
+                )
+
+        profile = cProfile.Profile()
+        start = perf_counter()
+        with connections["default"].execute_wrapper(query_wrapper):
+            profile.enable()
+            try:
+                response = self.get_response(request)
+            finally:
+                profile.disable()
+        duration = perf_counter() - start
+
+        report = {
+            "id": f"{timezone.now():%Y%m%d-%H%M%S-%f}-{uuid.uuid4().hex[:6]}",
+            "created_at": timezone.now().isoformat(),
+            "method": request.method,
+            # No query string (e.g. participant emails)
+            "path": request.path,
+            "status": response.status_code,
+            "sampled": profile_mode == "sample",
+            "duration_ms": round(duration * 1000, 3),
+            "db_ms": round(sum(query["ms"] for query in queries), 3),
+            "functions": get_top_functions(profile, settings.PROFILER_TOP_FUNCTIONS),
+            "queries": queries,
+        }
+
+        if profile_mode == "return":
+            return HttpResponse(render_profile(report), content_type="text/plain")
+
+        self.save_profile(profile, report)
+        response["X-Profile-Id"] = report["id"]
+        return response
+
+    def get_profile_mode(self, request) -> str:
+        """Return "return", "store", "sample" or "" (no profile)"""
+
+        flag = request.headers.get("X-Profile") or request.GET.get("_profile")
+        user = getattr(request, "user", None)
+        if flag and user is not None and user.is_superuser:
+            return "return" if flag == "return" else "store"
+
+        sample_rate = settings.PROFILER_SAMPLE_RATE
+        if sample_rate > 0 and next(self.counter) % sample_rate == 0:
+            return "sample"
+        return ""
+
+    def save_profile(self, profile: cProfile.Profile, report: dict):
+        """Save pstats and json report, removing the oldest reports"""
+
+        os.makedirs(settings.PROFILER_DIR, exist_ok=True)
+        profile.dump_stats(get_profile_path(report["id"], ".prof"))
+        with open(get_profile_path(report["id"], ".json"), "w") as file:
+            json.dump(report, file)
+
+        for profile_id in get_profile_files()[settings.PROFILER_MAX_FILES:]:
+            for extension in (".json", ".prof"):
+                file_path = get_profile_path(profile_id, extension)
+                if os.path.exists(file_path):
+                    os.remove(file_path)
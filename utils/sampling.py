@@ -0,0 +1,62 @@
+import random
+
+
+class AliasTable:
+    """Walker alias table (Vose's method): sample weighted outcomes in O(1)
+
+    Built once in O(n), each sample draws a column and a coin flip between
+    the column outcome and its alias, regardless of the number of outcomes.
+    Picklable (cached).
+    """
+
+    def __init__(self, weights: list[float]):
+        """
+        Args:
+            weights (list[float]): non-negative weight of each outcome
+
+        Raises:
+            ValueError: no weights or all zero
+        """
+
+        total = sum(weights)
+        if not weights or total <= 0 or min(weights) < 0:
+            raise ValueError("Weights must be non-negative with a positive sum")
+
+        size = len(weights)
+        scaled = [weight * size / total for weight in weights]
+        self.prob = [1.0] * size
+        self.alias = list(range(size))
+
+        small = [index for index, value in enumerate(scaled) if value < 1]
+        large = [index for index, value in enumerate(scaled) if value >= 1]
+        while small and large:
+            less, more = small.pop(), large.pop()
+            self.prob[less] = scaled[less]
+            self.alias[less] = more
+
+            # Move the rest of the large column to the small one
+            scaled[more] += scaled[less] - 1
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+
+        # Left columns are full (up to rounding errors)
+
+    def __len__(self):
+        return len(self.prob)
+
+    def sample(self, rng: random.Random = random) -> int:
+        """Return the index of a random outcome (by weight)
+
+        Args:
+            rng (random.Random): random generator, e.g. seeded in tests
+
+        Returns:
+            int: outcome index
+        """
+
+        column = rng.randrange(len(self.prob))
+        if rng.random() < self.prob[column]:
+            return column
+        return self.alias[column]
@@ -0,0 +1,34 @@
+from django.db import models
+from rest_framework import serializers
+
+from utils.media import get_file_url
+
+
+class CachedUrlFieldMixin:
+    """Return the file absolute url from the urls cache (HOST domain for
+    local files), instead of resolving it in each serialization"""
+
+    def to_representation(self, value):
+        if not value:
+            return None
+        if not getattr(self, "use_url", True):
+            return value.name
+        return get_file_url(value.name, value.storage)
+
+
+class CachedFileField(CachedUrlFieldMixin, serializers.FileField):
+    pass
+
+
+class CachedImageField(CachedUrlFieldMixin, serializers.ImageField):
+    pass
+
+
+class MediaUrlModelSerializer(serializers.ModelSerializer):
+    """Model serializer with cached absolute urls in its file fields"""
+
+    serializer_field_mapping = {
+        **serializers.ModelSerializer.serializer_field_mapping,
+        models.FileField: CachedFileField,
+        models.ImageField: CachedImageField,
+    }
@@ -0,0 +1,81 @@
+import threading
+from time import sleep
+
+from django.core.cache import cache
+from django.http import Http404
+from django.test import TestCase
+
+from roulette import models
+from utils import cache as cache_utils
+from utils.metrics import registry
+
+
+class CacheTestCase(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+
+    def test_versioned_keys(self):
+        """Validate keys expired when the model version changes"""
+
+        key = cache_utils.get_cache_key(models.Roulette, "test")
+        self.assertTrue(key.startswith("roulette.roulette:v"))
+        self.assertEqual(cache_utils.get_cache_key(models.Roulette, "test"), key)
+
+        cache_utils.bump_namespace(models.Roulette)
+        self.assertNotEqual(cache_utils.get_cache_key(models.Roulette, "test"), key)
+
+        # Long keys hashed (memcached limit)
+        long_key = cache_utils.get_cache_key("test", "a" * 300)
+        self.assertLess(len(long_key), cache_utils.MAX_KEY_LENGTH)
+
+    def test_single_flight(self):
+        """Validate value computed once by concurrent misses"""
+
+        calls = []
+
+        def compute():
+            calls.append(1)
+            sleep(0.2)
+            return {"value": 1}
+
+        results = []
+        key = cache_utils.get_cache_key("test", "hot")
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(cache_utils.get_or_compute(key, compute))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{"value": 1}] * 5)
+
+        # Hits, misses, waits and recomputes counted
+        self.assertEqual(cache_utils.get_or_compute(key, compute), {"value": 1})
+        content = registry.render()
+        self.assertIn('cache_requests_total{namespace="test",result="hit"} 1', content)
+        self.assertIn('cache_requests_total{namespace="test",result="miss"} 5', content)
+        self.assertIn(
+            'cache_lock_waits_total{namespace="test",result="hit"} 4', content
+        )
+        self.assertIn('cache_recomputes_total{namespace="test"} 1', content)
+
+    def test_compute_error(self):
+        """Validate errors not cached and lock released"""
+
+        key = cache_utils.get_cache_key("test", "error")
+
+        def compute():
+            raise Http404()
+
+        with self.assertRaises(Http404):
+            cache_utils.get_or_compute(key, compute)
+        self.assertIsNone(cache.get(f"{key}:lock"))
+        self.assertEqual(cache_utils.get_or_compute(key, lambda: None), None)
+        self.assertEqual(cache_utils.get_or_compute(key, lambda: 1), None)
@@ -0,0 +1,60 @@
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.test import TestCase
+from model_bakery import baker
+
+from project.storage_backends import LocalMediaStorage
+from roulette import models
+from roulette.serializers import RouletteSerializer
+from utils.media import clear_url_cache, get_media_url
+
+
+class MediaUrlCacheTestCase(TestCase):
+
+    def setUp(self):
+        clear_url_cache()
+        self.roulette = baker.make(
+            models.Roulette,
+            logo="test/test-logo.webp",
+            bg_image="test/test-bg-image.webp",
+            wrong_icon="test/test-wrong-icon.webp",
+        )
+        baker.make(
+            models.Award, roulette=self.roulette, image="test/test.webp", _quantity=3
+        )
+
+    def test_absolute_urls(self):
+        """Validate roulette and awards images with HOST domain"""
+
+        data = RouletteSerializer(self.roulette).data
+        self.assertEqual(data["logo"], f"{settings.HOST}/media/test/test-logo.webp")
+        for award_data in data["awards"]:
+            self.assertEqual(
+                award_data["image"], f"{settings.HOST}/media/test/test.webp"
+            )
+
+        # s3 urls not changed
+        s3_url = "https://bucket.s3.amazonaws.com/media/test.webp"
+        self.assertEqual(get_media_url(s3_url), s3_url)
+
+    def test_cached_urls(self):
+        """Validate urls resolved once, and again after settings change"""
+
+        with patch.object(
+            LocalMediaStorage, "url", autospec=True, side_effect=FileSystemStorage.url
+        ) as url_mock:
+            RouletteSerializer(self.roulette).data
+            calls = url_mock.call_count
+            self.assertEqual(calls, 4)  # same award image, resolved once
+
+            RouletteSerializer(self.roulette).data
+            self.assertEqual(url_mock.call_count, calls)
+
+            with self.settings(HOST="https://cdn.example.com"):
+                data = RouletteSerializer(self.roulette).data
+            self.assertGreater(url_mock.call_count, calls)
+        self.assertEqual(
+            data["logo"], "https://cdn.example.com/media/test/test-logo.webp"
+        )
@@ -0,0 +1,184 @@
+import os
+import posixpath
+import uuid
+
+from botocore.exceptions import ClientError
+from django import forms
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.urls import reverse
+from storages.backends.s3boto3 import S3Boto3Storage
+
+from project.storage_backends import IMMUTABLE_CACHE_CONTROL
+
+
+def supports_direct_upload(model_field: models.FileField) -> bool:
+    """Return if the field files can be uploaded from the browser to s3"""
+    return settings.DIRECT_UPLOADS and isinstance(model_field.storage, S3Boto3Storage)
+
+
+def get_upload_prefix(model_field: models.FileField) -> str:
+    """Return the folder of the browser uploads of the field"""
+    upload_to = model_field.upload_to if isinstance(model_field.upload_to, str) else ""
+    return posixpath.join(upload_to, "uploads", "")
+
+
+def get_upload_name(model_field: models.FileField, filename: str) -> str:
+    """Return a new unique storage name for an upload of the field"""
+    extension = os.path.splitext(filename)[1].lower()
+    return f"{get_upload_prefix(model_field)}{uuid.uuid4().hex}{extension}"
+
+
+def create_presigned_post(
+    model_field: models.FileField, filename: str, content_type: str
+) -> dict:
+    """Return a presigned post to upload a file of the field to s3
+
+    The post only accepts images up to DIRECT_UPLOAD_MAX_BYTES, with the
+    given content type, under a new unique key (the bucket CORS must
+    allow POST from the admin domain).
+
+    Args:
+        model_field (FileField): model file field (s3 storage)
+        filename (str): original file name (only the extension is used)
+        content_type (str): file content type, e.g. "image/webp"
+
+    Returns:
+        dict: url and fields of the post form, and storage name of the
+            file (to submit in the admin form)
+
+    Raises:
+        ValidationError: invalid content type
+    """
+
+    if not content_type.startswith("image/"):
+        raise ValidationError("Only images can be uploaded")
+
+    storage = model_field.storage
+    name = get_upload_name(model_field, filename)
+    fields = {"Content-Type": content_type, "Cache-Control": IMMUTABLE_CACHE_CONTROL}
+    if storage.default_acl:
+        fields["acl"] = storage.default_acl
+    conditions = [{key: value} for key, value in fields.items()]
+    conditions.append(["content-length-range", 1, settings.DIRECT_UPLOAD_MAX_BYTES])
+
+    post = storage.connection.meta.client.generate_presigned_post(
+        storage.bucket_name,
+        storage._normalize_name(name),
+        Fields=fields,
+        Conditions=conditions,
+        ExpiresIn=settings.DIRECT_UPLOAD_EXPIRES_SECONDS,
+    )
+    return {"url": post["url"], "fields": post["fields"], "name": name}
+
+
+def validate_uploaded_file(model_field: models.FileField, name: str) -> dict:
+    """Validate a file uploaded from the browser, reading only its head
+
+    Args:
+        model_field (FileField): model file field (s3 storage)
+        name (str): storage name of the uploaded file
+
+    Returns:
+        dict: s3 object head
+
+    Raises:
+        ValidationError: invalid name, missing file, not an image or too big
+    """
+
+    prefix = get_upload_prefix(model_field)
+    if not name.startswith(prefix) or posixpath.normpath(name) != name:
+        raise ValidationError("Invalid uploaded file")
+
+    storage = model_field.storage
+    try:
+        head = storage.connection.meta.client.head_object(
+            Bucket=storage.bucket_name, Key=storage._normalize_name(name)
+        )
+    except ClientError:
+        raise ValidationError("Uploaded file not found")
+
+    if not head.get("ContentType", "").startswith("image/"):
+        raise ValidationError("Uploaded file is not an image")
+    if head["ContentLength"] > settings.DIRECT_UPLOAD_MAX_BYTES:
+        raise ValidationError("Uploaded file is too big")
+    return head
+
+
+class DirectUploadWidget(forms.ClearableFileInput):
+    """File input that uploads the file from the browser to s3 and only
+    submits its storage name (hidden "<name>_key" input)"""
+
+    template_name = "admin/widgets/direct_upload.html"
+
+    def __init__(self, field_path: str, attrs: dict = None):
+        super().__init__(attrs)
+        self.field_path = field_path
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context["widget"].update(
+            {
+                "key_name": f"{name}_key",
+                "presign_url": reverse("admin-presign-upload"),
+                "field_path": self.field_path,
+            }
+        )
+        return context
+
+    class Media:
+        js = ["core/js/direct_upload.js"]
+
+
+class DirectUploadFormMixin:
+    """Model form that receives its s3 images as already uploaded names
+
+    Enabled with DIRECT_UPLOADS (s3 storage only): the files are not
+    streamed through the server, the form only validates the object head.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for name, model_field in self.get_direct_upload_fields():
+            opts = self._meta.model._meta
+            self.fields[name].widget = DirectUploadWidget(
+                f"{opts.app_label}.{opts.model_name}.{name}"
+            )
+
+            # File already uploaded: file input is empty
+            if self.get_uploaded_name(name):
+                self.fields[name].required = False
+
+    def get_direct_upload_fields(self) -> list[tuple]:
+        """Return names and model fields of the direct upload files"""
+        return [
+            (model_field.name, model_field)
+            for model_field in self._meta.model._meta.fields
+            if isinstance(model_field, models.FileField)
+            and model_field.name in self.fields
+            and supports_direct_upload(model_field)
+        ]
+
+    def get_uploaded_name(self, name: str) -> str:
+        return self.data.get(self.add_prefix(f"{name}_key"), "")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        for name, model_field in self.get_direct_upload_fields():
+            uploaded_name = self.get_uploaded_name(name)
+            if not uploaded_name:
+                continue
+            try:
+                validate_uploaded_file(model_field, uploaded_name)
+            except ValidationError as error:
+                self.add_error(name, error)
+                continue
+
+            # Saved as the file name (already in storage)
+            cleaned_data[name] = uploaded_name
+        return cleaned_data
+
+
+class DirectUploadModelForm(DirectUploadFormMixin, forms.ModelForm):
+    pass